@@ -2,6 +2,9 @@ from flask import Flask
 import os
 from config import config
 from app.extensions import db, migrate, jwt, cors, mail
+from app.utils.cache import cache
+from app.utils.events import hub
+from app.utils.presence import presence
 
 def create_app(config_name='development'):
     """Application factory pattern"""
@@ -16,6 +19,9 @@ def create_app(config_name='development'):
     jwt.init_app(app)
     cors.init_app(app)
     mail.init_app(app)
+    cache.init_app(app)
+    hub.init_app(app)
+    presence.init_app(app)
     
     # Create upload folder if it doesn't exist
     upload_folder = app.config['UPLOAD_FOLDER']
@@ -49,6 +55,18 @@ def create_app(config_name='development'):
     from app.routes import reports
     app.register_blueprint(reports.bp)
     
+    from app.routes import search
+    app.register_blueprint(search.bp)
+    
+    from app.routes import metrics
+    app.register_blueprint(metrics.bp)
+    
+    from app.routes import events
+    app.register_blueprint(events.bp)
+    
+    from app.routes import home
+    app.register_blueprint(home.bp)
+    
     # Serve uploaded files
     from flask import send_from_directory
     @app.route('/uploads/<path:filename>')
@@ -59,4 +77,8 @@ def create_app(config_name='development'):
     from app.errors import handlers
     handlers.register_error_handlers(app)
     
+    # Register CLI maintenance commands
+    from app.utils.counters import register_commands
+    register_commands(app)
+    
     return app
@@ -5,6 +5,15 @@ from dotenv import load_dotenv
 # Load environment variables
 load_dotenv()
 
+# Connections per process. Budget: gunicorn --threads (16) request threads, plus
+# HOME_SECTION_WORKERS (4) home section threads, plus the background workers
+# (scheduler, outbox, flushers). Keep workers x (size + overflow) under MySQL's
+# max_connections (151 by default): 4 x 30 = 120.
+DB_POOL_OPTIONS = {
+    "pool_size": int(os.environ.get('DB_POOL_SIZE', 20)),
+    "max_overflow": int(os.environ.get('DB_MAX_OVERFLOW', 10)),
+}
+
 class Config:
     """Base configuration"""
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'dev-secret-key-change-in-production'
@@ -17,6 +26,7 @@ class Config:
     )
 
     SQLALCHEMY_ENGINE_OPTIONS = {
+        **DB_POOL_OPTIONS,
         "pool_pre_ping": True,
         "pool_recycle": 280,
         "connect_args": {
@@ -55,6 +65,91 @@ class Config:
     MAIL_PASSWORD = os.environ.get('MAIL_PASSWORD')
     MAIL_DEFAULT_SENDER = os.environ.get('MAIL_DEFAULT_SENDER', os.environ.get('MAIL_USERNAME'))
 
+    # Response Cache Configuration
+    # 'memory' is per worker; 'redis' shares entries and invalidations across workers
+    CACHE_BACKEND = os.environ.get('CACHE_BACKEND', 'memory')
+    CACHE_REDIS_URL = os.environ.get('CACHE_REDIS_URL', 'redis://localhost:6379/0')
+    CACHE_DEFAULT_TTL = int(os.environ.get('CACHE_DEFAULT_TTL', 30))
+
+    # Radio Scheduler Configuration (seconds)
+    # Probe: how quickly radio edits made in other workers are noticed
+    # Reconcile: full status pass as a safety net
+    SCHEDULER_PROBE_INTERVAL = int(os.environ.get('SCHEDULER_PROBE_INTERVAL', 5))
+    SCHEDULER_RECONCILE_INTERVAL = int(os.environ.get('SCHEDULER_RECONCILE_INTERVAL', 300))
+    # Only the worker holding the lease runs the scheduler; it renews every TTL/3
+    SCHEDULER_LEASE_TTL = int(os.environ.get('SCHEDULER_LEASE_TTL', 30))
+
+    # Bulk notification fan-out: recipients per multi-row INSERT
+    FANOUT_CHUNK_SIZE = int(os.environ.get('FANOUT_CHUNK_SIZE', 1000))
+
+    # Unread badge counters are rebuilt from source tables this often (seconds)
+    NOTIFICATION_BADGE_RECONCILE_INTERVAL = int(os.environ.get('NOTIFICATION_BADGE_RECONCILE_INTERVAL', 3600))
+
+    # Outbox workers (emails, push, fan-out): threads per process, messages per claim,
+    # delivery attempts and retry backoff in seconds (doubles per attempt, capped)
+    OUTBOX_CONCURRENCY = int(os.environ.get('OUTBOX_CONCURRENCY', 4))
+    OUTBOX_BATCH_SIZE = int(os.environ.get('OUTBOX_BATCH_SIZE', 20))
+    OUTBOX_POLL_INTERVAL = int(os.environ.get('OUTBOX_POLL_INTERVAL', 2))
+    OUTBOX_MAX_ATTEMPTS = int(os.environ.get('OUTBOX_MAX_ATTEMPTS', 5))
+    OUTBOX_RETRY_BASE = int(os.environ.get('OUTBOX_RETRY_BASE', 30))
+    OUTBOX_RETRY_MAX = int(os.environ.get('OUTBOX_RETRY_MAX', 3600))
+    OUTBOX_VISIBILITY_TIMEOUT = int(os.environ.get('OUTBOX_VISIBILITY_TIMEOUT', 300))
+
+    # Like/reaction toggles are buffered and written in batches this often (0 = write each one)
+    ENGAGEMENT_FLUSH_INTERVAL_MS = int(os.environ.get('ENGAGEMENT_FLUSH_INTERVAL_MS', 250))
+
+    # Listener presence: 'database' counts the rows the batched flush writes (shared, up to
+    # FLUSH_INTERVAL behind), 'redis' shares a live count across workers (falls back to the
+    # database count), 'memory' counts per worker and is only correct with one worker.
+    # A listener is active for TIMEOUT seconds after a heartbeat; radio_listeners and
+    # channel_presence are written in batches every FLUSH_INTERVAL seconds
+    PRESENCE_BACKEND = os.environ.get('PRESENCE_BACKEND', 'database')
+    PRESENCE_REDIS_URL = os.environ.get('PRESENCE_REDIS_URL', os.environ.get('CACHE_REDIS_URL', 'redis://localhost:6379/0'))
+    PRESENCE_TIMEOUT_SECONDS = int(os.environ.get('PRESENCE_TIMEOUT_SECONDS', 300))
+    PRESENCE_BUCKET_SECONDS = int(os.environ.get('PRESENCE_BUCKET_SECONDS', 10))
+    PRESENCE_FLUSH_INTERVAL = int(os.environ.get('PRESENCE_FLUSH_INTERVAL', 30))
+
+    # Listener samples: taken every SAMPLE_INTERVAL seconds by the scheduler leader;
+    # the per-minute series keeps the last SERIES_MINUTES minutes (older data: rollups)
+    LISTENER_SAMPLE_INTERVAL = int(os.environ.get('LISTENER_SAMPLE_INTERVAL', 60))
+    LISTENER_SERIES_MINUTES = int(os.environ.get('LISTENER_SERIES_MINUTES', 1440))
+
+    # Stale radio_listeners rows are deleted every REAP_INTERVAL seconds, at most
+    # MAX_BATCHES batches of BATCH_SIZE rows per run; ARCHIVE_SESSIONS keeps daily
+    # session totals (listener_session_days) before the rows go
+    LISTENER_REAP_INTERVAL = int(os.environ.get('LISTENER_REAP_INTERVAL', 300))
+    LISTENER_REAP_BATCH_SIZE = int(os.environ.get('LISTENER_REAP_BATCH_SIZE', 1000))
+    LISTENER_REAP_MAX_BATCHES = int(os.environ.get('LISTENER_REAP_MAX_BATCHES', 20))
+    LISTENER_ARCHIVE_SESSIONS = os.environ.get('LISTENER_ARCHIVE_SESSIONS', 'True').lower() in ['true', 'on', '1']
+
+    # /api/home: threads building the database-heavy sections, per-section time limit
+    # (seconds) and items in the updates/placements previews. Each pooled section holds
+    # its own DB connection, also after a timeout until it finishes, so the workers are
+    # part of the DB_POOL_OPTIONS budget above; extra sections wait in the queue.
+    HOME_SECTION_WORKERS = int(os.environ.get('HOME_SECTION_WORKERS', 4))
+    HOME_SECTION_TIMEOUT = float(os.environ.get('HOME_SECTION_TIMEOUT', 5))
+    HOME_UPDATES_LIMIT = int(os.environ.get('HOME_UPDATES_LIMIT', 10))
+    HOME_PLACEMENTS_LIMIT = int(os.environ.get('HOME_PLACEMENTS_LIMIT', 10))
+
+    # Server-Sent Events (/api/events): 'local' delivers within one worker, 'redis'
+    # fans events out to every worker. Clients reconnect every MAX_STREAM seconds
+    # and missed events are replayed from the last REPLAY_BUFFER events.
+    EVENTS_TRANSPORT = os.environ.get('EVENTS_TRANSPORT', 'local')
+    EVENTS_REDIS_URL = os.environ.get('EVENTS_REDIS_URL', os.environ.get('CACHE_REDIS_URL', 'redis://localhost:6379/0'))
+    EVENTS_REPLAY_BUFFER = int(os.environ.get('EVENTS_REPLAY_BUFFER', 500))
+    EVENTS_KEEPALIVE_SECONDS = int(os.environ.get('EVENTS_KEEPALIVE_SECONDS', 15))
+    EVENTS_MAX_STREAM_SECONDS = int(os.environ.get('EVENTS_MAX_STREAM_SECONDS', 300))
+    EVENTS_CLIENT_QUEUE = int(os.environ.get('EVENTS_CLIENT_QUEUE', 100))
+    # Each open stream holds a request thread (gthread) or greenlet (gevent): a
+    # process refuses streams beyond MAX_CONNECTIONS with 503. Keep it well below
+    # --threads on the web workers; the gevent 'events' process (Procfile) raises it.
+    EVENTS_MAX_CONNECTIONS = int(os.environ.get('EVENTS_MAX_CONNECTIONS', 8))
+    # Lifetime of the stream tokens EventSource passes in ?token=
+    EVENTS_TOKEN_SECONDS = int(os.environ.get('EVENTS_TOKEN_SECONDS', 300))
+
+    # Bearer token Prometheus uses to scrape /api/metrics/prometheus (admin JWT also works)
+    METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+
 class DevelopmentConfig(Config):
     """Development configuration"""
     DEBUG = True
@@ -65,6 +160,7 @@ class ProductionConfig(Config):
     DEBUG = False
     FLASK_ENV = 'production'
     SQLALCHEMY_ENGINE_OPTIONS = {
+        **DB_POOL_OPTIONS,
         "pool_pre_ping": True,
         "pool_recycle": 280,
         "connect_args": {
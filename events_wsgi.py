@@ -0,0 +1,34 @@
+"""
+Server-Sent Events WSGI Entry Point
+===================================
+Serves /api/events from async workers so open streams do not use up the
+request threads of the web process. Route /api/events here from the
+reverse proxy in front of both processes (see README, Production Deployment):
+
+    location /api/events {
+        proxy_pass http://127.0.0.1:5001;
+        proxy_buffering off;
+        proxy_read_timeout 3600s;
+    }
+
+Usage (gevent is listed in requirements.txt):
+    gunicorn -w 2 -k gevent --worker-connections 1000 -b 0.0.0.0:5001 events_wsgi:application
+
+Events are published by the web workers, so EVENTS_TRANSPORT must be redis.
+Background workers (scheduler, outbox, flushers) run in the web process only.
+"""
+import os
+from dotenv import load_dotenv
+from app import create_app
+
+# Load environment variables
+load_dotenv()
+
+# Create the event stream application
+application = create_app(os.getenv('FLASK_ENV', 'production'))
+
+if application.config.get('EVENTS_TRANSPORT') != 'redis':
+    print("[EVENTS] EVENTS_TRANSPORT is not 'redis'; this process will not see events published by the web workers")
+
+# Gunicorn compatibility - 'app' alias
+app = application
@@ -0,0 +1,56 @@
+import hashlib
+from datetime import timezone
+from functools import wraps
+from flask import request, make_response
+
+
+def _as_utc(value):
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.replace(microsecond=0)
+
+
+def conditional_response(stamp_fn):
+    """Decorator to answer conditional GETs with 304 before building the body.
+    
+    stamp_fn receives the view's keyword arguments and returns either None
+    (skip conditional handling) or a (version, last_modified) tuple. version
+    is any repr-able value that changes whenever the response would change.
+    last_modified may be None when the response depends on more than a
+    timestamp (e.g. live counts); only an ETag is sent then.
+    """
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            stamp = stamp_fn(**kwargs)
+            if stamp is None:
+                return fn(*args, **kwargs)
+            
+            version, last_modified = stamp
+            last_modified = _as_utc(last_modified)
+            
+            # Query string is part of the representation (filters, active_only...)
+            source = repr((request.path, request.query_string, version)).encode('utf-8')
+            etag = hashlib.sha1(source).hexdigest()
+            
+            not_modified = False
+            if request.if_none_match:
+                not_modified = request.if_none_match.contains_weak(etag)
+            elif last_modified and request.if_modified_since:
+                not_modified = last_modified <= request.if_modified_since
+            
+            if not_modified:
+                response = make_response('', 304)
+            else:
+                response = make_response(fn(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+            
+            response.set_etag(etag)
+            if last_modified:
+                response.last_modified = last_modified
+            return response
+        return wrapper
+    return decorator
@@ -20,9 +20,15 @@ from app.models.live_queue import LiveQueue
 from app.models.radio_listener import RadioListener
 from app.models.marquee import Marquee
 from app.models.live_podcast import LivePodcast, PodcastStatus
-from app.models.global_notification import GlobalNotification, UserNotificationStatus
-from app.models.update_reaction import UpdateReaction, ALLOWED_EMOJIS
+from app.models.global_notification import GlobalNotification, UserNotificationStatus, GlobalNotificationReadState
+from app.models.update_reaction import UpdateReaction, UpdateReactionCount, ALLOWED_EMOJIS
 from app.models.report import Report, ReportCategory, ReportPriority, ReportStatus
+from app.models.content_version import ContentVersion
+from app.models.scheduler_lease import SchedulerLease
+from app.models.notification_fanout import NotificationFanout
+from app.models.notification_badge import NotificationBadge
+from app.models.outbox import OutboxMessage
+from app.models.listener_stats import ListenerSeries, ListenerRollup, ListenerSketch, ListenerSessionDay, ChannelPresence
 
 __all__ = [
     'User', 'UserRole', 'Student', 'Admin', 'AdminRequest', 'RequestStatus',
@@ -33,8 +39,11 @@ __all__ = [
     'Update', 'UpdateComment', 'UpdateLike', 'Placement', 'Banner', 
     'LiveStream', 'LiveQueue', 'RadioListener', 'Marquee',
     'LivePodcast', 'PodcastStatus',
-    'GlobalNotification', 'UserNotificationStatus',
-    'UpdateReaction', 'ALLOWED_EMOJIS',
-    'Report', 'ReportCategory', 'ReportPriority', 'ReportStatus'
+    'GlobalNotification', 'UserNotificationStatus', 'GlobalNotificationReadState',
+    'UpdateReaction', 'UpdateReactionCount', 'ALLOWED_EMOJIS',
+    'Report', 'ReportCategory', 'ReportPriority', 'ReportStatus',
+    'ContentVersion', 'SchedulerLease', 'NotificationFanout',
+    'NotificationBadge', 'OutboxMessage', 'ListenerSeries', 'ListenerRollup',
+    'ListenerSketch', 'ListenerSessionDay', 'ChannelPresence'
 ]
 
@@ -5,6 +5,10 @@ from datetime import datetime
 class Comment(db.Model):
     """Radio comments/chat model"""
     __tablename__ = 'comments'
+    __table_args__ = (
+        # Serves the per-radio newest-first listing and its keyset seek
+        db.Index('ix_comments_radio_created', 'radio_id', 'created_at', 'id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     radio_id = db.Column(db.Integer, db.ForeignKey('radios.id'), nullable=False)
@@ -17,11 +21,14 @@ class Comment(db.Model):
     radio = db.relationship('Radio', backref=db.backref('comments', lazy='dynamic'))
     
     def to_dict(self):
+        from app.utils.loaders import user_loader
+        user = user_loader().get(self.user_id)
+        
         return {
             'id': self.id,
             'radio_id': self.radio_id,
             'user_id': self.user_id,
-            'user_name': self.user.name if self.user else 'Unknown',
+            'user_name': user.name if user else 'Unknown',
             'content': self.content,
             'created_at': self.created_at.isoformat() if self.created_at else None
         }
@@ -0,0 +1,49 @@
+from app.extensions import db
+from datetime import datetime
+from sqlalchemy.exc import IntegrityError
+
+
+class ContentVersion(db.Model):
+    """Change counter for read-mostly collections.
+
+    Writers bump the counter in the same transaction as their change, so every
+    worker sees a new version as soon as the change commits. Readers probe it
+    with a single primary-key lookup to build ETags.
+    """
+    __tablename__ = 'content_versions'
+    
+    key = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    @classmethod
+    def bump(cls, key):
+        """Increment the counter for key; the caller commits"""
+        now = datetime.utcnow()
+        updated = cls.query.filter_by(key=key).update(
+            {cls.version: cls.version + 1, cls.updated_at: now},
+            synchronize_session=False
+        )
+        if updated:
+            return
+        
+        # First write for this key - another worker may insert it concurrently
+        try:
+            with db.session.begin_nested():
+                db.session.add(cls(key=key, version=1, updated_at=now))
+        except IntegrityError:
+            cls.query.filter_by(key=key).update(
+                {cls.version: cls.version + 1, cls.updated_at: now},
+                synchronize_session=False
+            )
+    
+    @classmethod
+    def get(cls, key):
+        """Return (version, updated_at) for key, or (0, None) if never bumped"""
+        row = db.session.query(cls.version, cls.updated_at).filter_by(key=key).first()
+        if not row:
+            return 0, None
+        return row.version, row.updated_at
+    
+    def __repr__(self):
+        return f'<ContentVersion {self.key}={self.version}>'
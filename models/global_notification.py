@@ -1,4 +1,5 @@
 from datetime import datetime
+from sqlalchemy.exc import IntegrityError
 from app.extensions import db
 
 class GlobalNotification(db.Model):
@@ -9,12 +10,49 @@ class GlobalNotification(db.Model):
     message = db.Column(db.Text, nullable=False)
     image_url = db.Column(db.String(500))
     created_by = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
     
-    def to_dict(self, current_user_id=None):
-        from app.models.user import User
+    @classmethod
+    def visible_to(cls, user_id):
+        """Criterion for broadcasts a user can see (sent after they joined)"""
+        floor = db.session.query(GlobalNotificationReadState.floor_id)\
+            .filter(GlobalNotificationReadState.user_id == user_id)\
+            .scalar_subquery()
+        return cls.id > db.func.coalesce(floor, 0)
+    
+    @classmethod
+    def read_states(cls, user_id, notification_ids):
+        """Map notification id -> (is_read, read_at) for one user in two queries.
+        
+        A broadcast is read if it is at or below the user's read-all watermark,
+        or if the user marked it read individually (sparse status rows).
+        """
+        states = {notification_id: (False, None) for notification_id in notification_ids}
+        if not states:
+            return states
         
-        creator = User.query.get(self.created_by)
+        watermark = GlobalNotificationReadState.query.get(user_id)
+        if watermark and watermark.read_through_id:
+            for notification_id in states:
+                if notification_id <= watermark.read_through_id:
+                    states[notification_id] = (True, watermark.read_through_at)
+        
+        reads = db.session.query(UserNotificationStatus.notification_id, UserNotificationStatus.read_at)\
+            .filter(
+                UserNotificationStatus.user_id == user_id,
+                UserNotificationStatus.is_read == True,
+                UserNotificationStatus.notification_id.in_(list(states))
+            ).all()
+        for notification_id, read_at in reads:
+            states[notification_id] = (True, read_at)
+        
+        return states
+    
+    def to_dict(self, current_user_id=None, read_state=None):
+        """Serialize; read_state is (is_read, read_at) when already batch-loaded"""
+        from app.utils.loaders import user_loader
+        
+        creator = user_loader().get(self.created_by)
         
         # Handle image URL
         image_url_value = None
@@ -36,14 +74,13 @@ class GlobalNotification(db.Model):
         }
         
         # If current_user_id is provided, get read status
-        if current_user_id:
-            status = UserNotificationStatus.query.filter_by(
-                notification_id=self.id,
-                user_id=current_user_id
-            ).first()
-            
-            result['is_read'] = status.is_read if status else False
-            result['read_at'] = status.read_at.isoformat() if status and status.read_at else None
+        if read_state is None and current_user_id:
+            read_state = self.read_states(current_user_id, [self.id])[self.id]
+        
+        if read_state is not None:
+            is_read, read_at = read_state
+            result['is_read'] = is_read
+            result['read_at'] = read_at.isoformat() if read_at else None
         else:
             result['is_read'] = False
             result['read_at'] = None
@@ -55,7 +92,16 @@ class GlobalNotification(db.Model):
 
 
 class UserNotificationStatus(db.Model):
+    """Individual read of a broadcast above the user's read-all watermark.
+    
+    Rows are only written when a user reads a single broadcast, so the table
+    grows with reads rather than users x broadcasts. One row per user and
+    broadcast (unique index), so concurrent reads cannot both count.
+    """
     __tablename__ = 'user_notification_status'
+    __table_args__ = (
+        db.Index('ix_user_notification_status_user_notification', 'user_id', 'notification_id', unique=True),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     notification_id = db.Column(db.Integer, db.ForeignKey('global_notifications.id'), nullable=False)
@@ -66,3 +112,82 @@ class UserNotificationStatus(db.Model):
     
     def __repr__(self):
         return f'<UserNotificationStatus user={self.user_id} notification={self.notification_id} read={self.is_read}>'
+
+
+class GlobalNotificationReadState(db.Model):
+    """Per-user broadcast watermarks.
+    
+    floor_id: broadcasts with id <= floor_id predate the account and are hidden.
+    read_through_id: broadcasts with id <= read_through_id are read (read-all).
+    Users without a row see every broadcast and have read none of them.
+    """
+    __tablename__ = 'global_notification_read_state'
+    
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), primary_key=True)
+    floor_id = db.Column(db.Integer, nullable=False, default=0)
+    read_through_id = db.Column(db.Integer, nullable=False, default=0)
+    read_through_at = db.Column(db.DateTime)
+    
+    # Deleted with the user (unverified accounts are deleted on re-registration)
+    user = db.relationship('User', backref=db.backref(
+        'broadcast_read_state', uselist=False, cascade='all, delete-orphan'
+    ))
+    
+    @classmethod
+    def start(cls, user_id):
+        """Create the row for a new account so earlier broadcasts stay hidden; caller commits"""
+        latest = db.session.query(db.func.coalesce(db.func.max(GlobalNotification.id), 0)).scalar()
+        db.session.add(cls(user_id=user_id, floor_id=latest, read_through_id=latest))
+    
+    @classmethod
+    def mark_all_read(cls, user_id):
+        """Move the read-all watermark to the newest broadcast; caller commits"""
+        latest = db.session.query(db.func.coalesce(db.func.max(GlobalNotification.id), 0)).scalar()
+        now = datetime.utcnow()
+        updated = cls.query.filter(cls.user_id == user_id, cls.read_through_id < latest).update(
+            {cls.read_through_id: latest, cls.read_through_at: now},
+            synchronize_session=False
+        )
+        if updated or db.session.query(cls.user_id).filter_by(user_id=user_id).first():
+            return
+        
+        try:
+            with db.session.begin_nested():
+                db.session.add(cls(user_id=user_id, floor_id=0, read_through_id=latest, read_through_at=now))
+        except IntegrityError:
+            pass  # Concurrent read-all created it
+    
+    @classmethod
+    def backfill(cls):
+        """Derive watermarks from legacy one-row-per-user status rows.
+        
+        Each user's floor becomes the first broadcast they had a row for, so
+        older broadcasts stay hidden; unread legacy rows are then dropped.
+        Safe to re-run: users that already have a watermark are skipped.
+        """
+        has_state = db.session.query(cls.user_id)
+        db.session.execute(db.insert(cls).from_select(
+            ['user_id', 'floor_id', 'read_through_id'],
+            db.select(
+                UserNotificationStatus.user_id,
+                db.func.min(UserNotificationStatus.notification_id) - 1,
+                db.literal(0)
+            ).where(UserNotificationStatus.user_id.not_in(has_state))
+            .group_by(UserNotificationStatus.user_id)
+        ))
+        
+        # Users with no legacy rows joined after the last broadcast
+        from app.models.user import User
+        latest = db.session.query(db.func.coalesce(db.func.max(GlobalNotification.id), 0)).scalar()
+        db.session.execute(db.insert(cls).from_select(
+            ['user_id', 'floor_id', 'read_through_id'],
+            db.select(User.id, db.literal(latest), db.literal(latest))
+            .where(User.id.not_in(db.session.query(cls.user_id)))
+        ))
+        
+        UserNotificationStatus.query.filter(UserNotificationStatus.is_read == False)\
+            .delete(synchronize_session=False)
+        db.session.commit()
+    
+    def __repr__(self):
+        return f'<GlobalNotificationReadState user={self.user_id} read_through={self.read_through_id}>'
@@ -0,0 +1,325 @@
+from app.extensions import db
+from array import array
+from datetime import datetime
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from app.utils.hyperloglog import HyperLogLog
+
+
+class RingSeries:
+    """Fixed-size series of per-minute samples backed by an array('i').
+
+    Minute m lives in slot m % capacity, so recording never shifts data and
+    the whole series serializes to capacity * 4 bytes. Slots that were never
+    sampled (or were skipped over) hold EMPTY.
+    """
+
+    EMPTY = -1
+
+    def __init__(self, capacity, head=None, data=None):
+        self.capacity = capacity
+        self.head = head  # Newest minute recorded
+        self.values = array('i', [self.EMPTY]) * capacity
+        if data:
+            stored = array('i')
+            stored.frombytes(data)
+            if len(stored) == capacity:
+                self.values = stored
+            else:
+                self.head = None  # Capacity changed; start over
+
+    def get(self, minute):
+        if self.head is None or minute > self.head or minute <= self.head - self.capacity:
+            return None
+        value = self.values[minute % self.capacity]
+        return None if value == self.EMPTY else value
+
+    def record(self, minute, value):
+        """Store a sample; returns False if the minute is too old to keep"""
+        if self.head is not None and minute <= self.head - self.capacity:
+            return False
+        if self.head is None or minute > self.head:
+            if self.head is not None:
+                # Minutes skipped since the last sample still hold data from a lap ago
+                for skipped in range(max(self.head + 1, minute - self.capacity + 1), minute):
+                    self.values[skipped % self.capacity] = self.EMPTY
+            self.head = minute
+        self.values[minute % self.capacity] = value
+        return True
+
+    def range(self, start_minute, end_minute):
+        """[(minute, value)] for sampled minutes in [start_minute, end_minute]"""
+        if self.head is None:
+            return []
+        points = []
+        for minute in range(max(start_minute, self.head - self.capacity + 1), min(end_minute, self.head) + 1):
+            value = self.values[minute % self.capacity]
+            if value != self.EMPTY:
+                points.append((minute, value))
+        return points
+
+    def to_bytes(self):
+        return self.values.tobytes()
+
+
+class ListenerSeries(db.Model):
+    """Recent per-minute concurrent listener samples for one channel.
+
+    One row per presence channel ('stream', 'podcast:<id>') holding a
+    RingSeries blob, so any worker can serve a range with a single read.
+    """
+    __tablename__ = 'listener_series'
+
+    channel = db.Column(db.String(50), primary_key=True)
+    head_minute = db.Column(db.Integer)
+    capacity = db.Column(db.Integer, nullable=False)
+    samples = db.Column(db.LargeBinary, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def ring(self):
+        return RingSeries(self.capacity, self.head_minute, self.samples)
+
+    def store(self, ring):
+        self.capacity = ring.capacity
+        self.head_minute = ring.head
+        self.samples = ring.to_bytes()
+
+
+class ListenerRollup(db.Model):
+    """Hourly and daily listener aggregates per channel (one row per bucket)"""
+    __tablename__ = 'listener_rollups'
+
+    # Periods
+    HOUR = 'HOUR'
+    DAY = 'DAY'
+
+    channel = db.Column(db.String(50), primary_key=True)
+    period = db.Column(db.String(4), primary_key=True)
+    bucket_start = db.Column(db.DateTime, primary_key=True)
+    samples = db.Column(db.Integer, nullable=False, default=0)
+    total = db.Column(db.Integer, nullable=False, default=0)  # Sum of samples, for the average
+    peak = db.Column(db.Integer, nullable=False, default=0)
+    low = db.Column(db.Integer, nullable=False, default=0)
+
+    @staticmethod
+    def bucket_for(period, moment):
+        if period == ListenerRollup.HOUR:
+            return moment.replace(minute=0, second=0, microsecond=0)
+        return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+
+    @classmethod
+    def add_sample(cls, channel, moment, value):
+        """Fold one sample into the hour and day buckets; the caller commits"""
+        for period in (cls.HOUR, cls.DAY):
+            bucket_start = cls.bucket_for(period, moment)
+            values = {
+                cls.samples: cls.samples + 1,
+                cls.total: cls.total + value,
+                cls.peak: db.case((cls.peak < value, value), else_=cls.peak),
+                cls.low: db.case((cls.low > value, value), else_=cls.low)
+            }
+            updated = cls.query.filter_by(channel=channel, period=period, bucket_start=bucket_start)\
+                .update(values, synchronize_session=False)
+            if updated:
+                continue
+
+            try:
+                with db.session.begin_nested():
+                    db.session.add(cls(channel=channel, period=period, bucket_start=bucket_start,
+                                       samples=1, total=value, peak=value, low=value))
+            except IntegrityError:
+                cls.query.filter_by(channel=channel, period=period, bucket_start=bucket_start)\
+                    .update(values, synchronize_session=False)
+
+    def to_dict(self):
+        return {
+            'bucket_start': self.bucket_start.isoformat(),
+            'average': round(self.total / self.samples, 1) if self.samples else 0,
+            'peak': self.peak,
+            'low': self.low,
+            'samples': self.samples
+        }
+
+    def __repr__(self):
+        return f'<ListenerRollup {self.channel} {self.period} {self.bucket_start}>'
+
+
+class ListenerSketch(db.Model):
+    """Unique listeners for one channel and UTC day, as a HyperLogLog sketch.
+
+    Workers fold the sketches they build from heartbeats into these rows;
+    weekly or per-show figures are the union of the daily sketches.
+    """
+    __tablename__ = 'listener_sketches'
+
+    channel = db.Column(db.String(50), primary_key=True)
+    day = db.Column(db.Date, primary_key=True)
+    registers = db.Column(db.LargeBinary, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    @classmethod
+    def merge(cls, channel, day, sketch):
+        """Fold a sketch into the stored one; the caller commits"""
+        row = cls.query.filter_by(channel=channel, day=day).with_for_update().first()
+        if row is None:
+            try:
+                with db.session.begin_nested():
+                    db.session.add(cls(channel=channel, day=day, registers=sketch.to_bytes()))
+                return
+            except IntegrityError:
+                row = cls.query.filter_by(channel=channel, day=day).with_for_update().first()
+        row.registers = HyperLogLog.from_bytes(row.registers).merge(sketch).to_bytes()
+
+    @classmethod
+    def daily(cls, channels, start_day=None, end_day=None):
+        """{(channel, day): HyperLogLog} for days in [start_day, end_day], in one query"""
+        statement = select(cls.channel, cls.day, cls.registers).where(cls.channel.in_(channels))
+        if start_day:
+            statement = statement.where(cls.day >= start_day)
+        if end_day:
+            statement = statement.where(cls.day <= end_day)
+        return {
+            (channel, day): HyperLogLog.from_bytes(registers)
+            for channel, day, registers in db.session.execute(statement).all()
+        }
+
+    @staticmethod
+    def union(sketches):
+        """Unique count across several sketches (0 if there are none)"""
+        merged = None
+        for sketch in sketches:
+            merged = HyperLogLog(sketch.precision, sketch.registers) if merged is None else merged.merge(sketch)
+        return merged.count() if merged else 0
+
+    def __repr__(self):
+        return f'<ListenerSketch {self.channel} {self.day}>'
+
+
+class ListenerSessionDay(db.Model):
+    """Daily totals of finished stream listening sessions.
+
+    Filled by the stale-listener reaper just before it deletes rows from
+    radio_listeners, keyed by the day each session started (UTC).
+    """
+    __tablename__ = 'listener_session_days'
+
+    day = db.Column(db.Date, primary_key=True)
+    sessions = db.Column(db.Integer, nullable=False, default=0)
+    signed_in_sessions = db.Column(db.Integer, nullable=False, default=0)
+    total_seconds = db.Column(db.BigInteger, nullable=False, default=0)
+    longest_seconds = db.Column(db.Integer, nullable=False, default=0)
+
+    @classmethod
+    def add_sessions(cls, rows):
+        """Fold (user_id, joined_at, last_heartbeat) rows into their days; the caller commits"""
+        days = {}
+        for row in rows:
+            joined_at = row.joined_at or row.last_heartbeat
+            seconds = max(int((row.last_heartbeat - joined_at).total_seconds()), 0) if row.last_heartbeat else 0
+            totals = days.setdefault(joined_at.date(), [0, 0, 0, 0])
+            totals[0] += 1
+            totals[1] += 1 if row.user_id else 0
+            totals[2] += seconds
+            totals[3] = max(totals[3], seconds)
+
+        for day, (sessions, signed_in, seconds, longest) in days.items():
+            values = {
+                cls.sessions: cls.sessions + sessions,
+                cls.signed_in_sessions: cls.signed_in_sessions + signed_in,
+                cls.total_seconds: cls.total_seconds + seconds,
+                cls.longest_seconds: db.case((cls.longest_seconds < longest, longest), else_=cls.longest_seconds)
+            }
+            if cls.query.filter_by(day=day).update(values, synchronize_session=False):
+                continue
+
+            try:
+                with db.session.begin_nested():
+                    db.session.add(cls(day=day, sessions=sessions, signed_in_sessions=signed_in,
+                                       total_seconds=seconds, longest_seconds=longest))
+            except IntegrityError:
+                cls.query.filter_by(day=day).update(values, synchronize_session=False)
+
+    def to_dict(self):
+        return {
+            'sessions': self.sessions,
+            'signed_in_sessions': self.signed_in_sessions,
+            'average_seconds': round(self.total_seconds / self.sessions) if self.sessions else 0,
+            'longest_seconds': self.longest_seconds
+        }
+
+    def __repr__(self):
+        return f'<ListenerSessionDay {self.day}>'
+
+
+class ChannelPresence(db.Model):
+    """Last heartbeat per session on a podcast channel.
+
+    The podcast counterpart of radio_listeners: written by the presence
+    flush so every worker can count a podcast's listeners from the database.
+    """
+    __tablename__ = 'channel_presence'
+
+    channel = db.Column(db.String(50), primary_key=True)
+    session_id = db.Column(db.String(64), primary_key=True)
+    last_heartbeat = db.Column(db.DateTime, nullable=False, index=True)
+
+    @classmethod
+    def active_count(cls, channel, cutoff):
+        return db.session.scalar(
+            select(db.func.count()).select_from(cls)
+            .where(cls.channel == channel, cls.last_heartbeat >= cutoff)
+        )
+
+    @classmethod
+    def cleanup_stale(cls, cutoff, batch_size=1000, max_batches=None):
+        """Delete rows idle since before cutoff in batches; returns rows removed.
+        
+        MySQL deletes each batch with a single DELETE ... LIMIT; other
+        databases select the keys first and delete by key.
+        """
+        removed = 0
+        batches = 0
+        if db.engine.dialect.name == 'mysql':
+            stale = db.delete(cls).where(cls.last_heartbeat < cutoff)\
+                .with_dialect_options(mysql_limit=batch_size)\
+                .execution_options(synchronize_session=False)
+            while max_batches is None or batches < max_batches:
+                try:
+                    deleted = db.session.execute(stale).rowcount
+                    db.session.commit()
+                except Exception:
+                    db.session.rollback()
+                    raise
+                removed += deleted
+                batches += 1
+                if deleted < batch_size:
+                    break
+            return removed
+        
+        while max_batches is None or batches < max_batches:
+            keys = db.session.execute(
+                select(cls.channel, cls.session_id).where(cls.last_heartbeat < cutoff).limit(batch_size)
+            ).all()
+            if not keys:
+                break
+            try:
+                db.session.execute(db.delete(cls).where(
+                    db.tuple_(cls.channel, cls.session_id).in_([tuple(key) for key in keys])
+                ))
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                raise
+            removed += len(keys)
+            batches += 1
+            if len(keys) < batch_size:
+                break
+        return removed
+
+    @classmethod
+    def clear(cls, channel):
+        """Forget every session on a channel (the podcast ended); the caller commits"""
+        cls.query.filter_by(channel=channel).delete(synchronize_session=False)
+
+    def __repr__(self):
+        return f'<ChannelPresence {self.channel} {self.session_id}>'
@@ -20,13 +20,13 @@ class LivePodcast(db.Model):
     end_time = db.Column(db.DateTime)
     stream_url = db.Column(db.String(500))
     listener_peak_count = db.Column(db.Integer, default=0)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     def to_dict(self):
-        from app.models.user import User
+        from app.utils.loaders import user_loader
         
-        admin = User.query.get(self.admin_id)
+        admin = user_loader().get(self.admin_id)
         
         return {
             'id': self.id,
@@ -15,7 +15,14 @@ class LiveStream(db.Model):
 
     def to_dict(self):
         # Import here to avoid circular dependency
-        from app.models.radio_listener import RadioListener
+        from app.utils.presence import presence
+        
+        data = self.snapshot()
+        data['listener_count'] = presence.listener_count() if self.status == 'ONLINE' else 0
+        return data
+
+    def snapshot(self):
+        """to_dict() without the live listener count (cached by utils.stream_state)"""
         from app.models.radio import Radio
         
         data = {
@@ -25,8 +32,7 @@ class LiveStream(db.Model):
             'description': self.description,
             'started_at': self.started_at.isoformat() if self.started_at else None,
             'current_audio_id': self.current_audio_id,
-            'updated_at': self.updated_at.isoformat(),
-            'listener_count': RadioListener.get_active_count() if self.status == 'ONLINE' else 0
+            'updated_at': self.updated_at.isoformat()
         }
 
         # Include details of the currently playing audio
@@ -0,0 +1,152 @@
+from app.extensions import db
+from datetime import datetime
+from sqlalchemy.exc import IntegrityError
+
+# ContentVersion key counting every broadcast ever sent
+BROADCAST_SEQUENCE_KEY = 'broadcasts'
+
+
+class NotificationBadge(db.Model):
+    """Per-user unread notification counter for the app badge.
+
+    personal_unread counts unread personal notifications. Broadcasts are not
+    counted per user (that would make a broadcast O(users)); instead the
+    'broadcasts' content version counts every broadcast sent and
+    broadcast_base is the point this user's unread broadcasts start from:
+
+        unread = personal_unread + (broadcast sequence - broadcast_base)
+
+    Writers adjust these in the same transaction as the change they mirror;
+    reconcile() periodically recomputes them from the source tables.
+    """
+    __tablename__ = 'notification_badges'
+
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), primary_key=True)
+    personal_unread = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    broadcast_base = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    reconciled_at = db.Column(db.DateTime)
+
+    # Deleted with the user (unverified accounts are deleted on re-registration)
+    user = db.relationship('User', backref=db.backref(
+        'notification_badge', uselist=False, cascade='all, delete-orphan'
+    ))
+
+    @staticmethod
+    def _sequence():
+        from app.models.content_version import ContentVersion
+        return db.session.query(ContentVersion.version)\
+            .filter(ContentVersion.key == BROADCAST_SEQUENCE_KEY)\
+            .scalar_subquery()
+
+    @classmethod
+    def unread_count(cls, user_id):
+        """Badge value in one primary-key lookup; None if the user has no row yet"""
+        row = db.session.query(
+            cls.personal_unread,
+            db.func.coalesce(cls._sequence(), 0) - cls.broadcast_base
+        ).filter(cls.user_id == user_id).first()
+        if row is None:
+            return None
+        personal, broadcasts = row
+        return max(personal, 0) + max(broadcasts, 0)
+
+    @classmethod
+    def start(cls, user_id):
+        """Row for a new account: nothing unread, earlier broadcasts excluded; caller commits"""
+        db.session.add(cls(
+            user_id=user_id,
+            personal_unread=0,
+            broadcast_base=db.session.query(db.func.coalesce(cls._sequence(), 0)).scalar()
+        ))
+
+    @classmethod
+    def add_personal(cls, user_ids, delta=1):
+        """Adjust personal_unread for users that have a badge row; caller commits.
+
+        Users without a row are skipped - their row is computed from the
+        source tables on first read.
+        """
+        if not user_ids:
+            return
+        value = cls.personal_unread + delta
+        cls.query.filter(cls.user_id.in_(list(user_ids))).update(
+            {cls.personal_unread: db.case((value < 0, 0), else_=value)},
+            synchronize_session=False
+        )
+
+    @classmethod
+    def broadcast_read(cls, user_id):
+        """One broadcast became read; caller commits"""
+        cls.query.filter_by(user_id=user_id).update(
+            {cls.broadcast_base: cls.broadcast_base + 1}, synchronize_session=False
+        )
+
+    @classmethod
+    def all_read(cls, user_id):
+        """Everything is read (read-all); caller commits"""
+        cls.query.filter_by(user_id=user_id).update({
+            cls.personal_unread: 0,
+            cls.broadcast_base: db.func.coalesce(cls._sequence(), 0)
+        }, synchronize_session=False)
+
+    @classmethod
+    def reconcile(cls, user_id=None):
+        """Recompute badges from Notification.is_read and broadcast read state.
+
+        Creates missing rows first (for verified accounts only; anyone else
+        gets theirs on first read). Pass user_id to rebuild a single user.
+        Commits.
+        """
+        from app.models.user import User
+        from app.models.notification import Notification
+        from app.models.global_notification import (
+            GlobalNotification, UserNotificationStatus, GlobalNotificationReadState
+        )
+
+        missing = db.select(User.id, db.literal(0), db.literal(0))\
+            .where(User.id.not_in(db.select(cls.user_id)))
+        if user_id is not None:
+            missing = missing.where(User.id == user_id)
+        else:
+            missing = missing.where(User.is_verified == True)
+        try:
+            with db.session.begin_nested():
+                db.session.execute(db.insert(cls).from_select(
+                    ['user_id', 'personal_unread', 'broadcast_base'], missing
+                ))
+        except IntegrityError:
+            pass  # A concurrent reconcile or signup created it; the UPDATE below still applies
+
+        personal_unread = db.select(db.func.count(Notification.id)).where(
+            Notification.user_id == cls.user_id,
+            Notification.is_read == False
+        ).scalar_subquery()
+
+        # Broadcasts above both the visibility floor and the read-all watermark
+        # that have not been read individually
+        state = GlobalNotificationReadState
+        watermark = db.select(
+            db.case((state.floor_id > state.read_through_id, state.floor_id), else_=state.read_through_id)
+        ).where(state.user_id == cls.user_id).correlate_except(state).scalar_subquery()
+        read_individually = db.select(UserNotificationStatus.id).where(
+            UserNotificationStatus.user_id == cls.user_id,
+            UserNotificationStatus.notification_id == GlobalNotification.id,
+            UserNotificationStatus.is_read == True
+        ).correlate_except(UserNotificationStatus).exists()
+        broadcast_unread = db.select(db.func.count(GlobalNotification.id)).where(
+            GlobalNotification.id > db.func.coalesce(watermark, 0),
+            ~read_individually
+        ).scalar_subquery()
+
+        update = db.update(cls).values(
+            personal_unread=personal_unread,
+            broadcast_base=db.func.coalesce(cls._sequence(), 0) - broadcast_unread,
+            reconciled_at=datetime.utcnow()
+        )
+        if user_id is not None:
+            update = update.where(cls.user_id == user_id)
+        db.session.execute(update)
+        db.session.commit()
+
+    def __repr__(self):
+        return f'<NotificationBadge user={self.user_id} personal={self.personal_unread}>'
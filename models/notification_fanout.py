@@ -0,0 +1,59 @@
+from app.extensions import db
+from datetime import datetime
+
+
+class NotificationFanout(db.Model):
+    """A bulk notification job: one message delivered to an audience of users.
+
+    Created in the same transaction as the change that triggers it, then
+    written out in chunks by app.utils.fanout outside the request. sent/total
+    let admins follow progress; last_user_id is the checkpoint a retried or
+    reclaimed delivery resumes from.
+    """
+    __tablename__ = 'notification_fanouts'
+
+    # Audiences
+    STUDENTS = 'STUDENTS'
+    RADIO_SUBSCRIBERS = 'RADIO_SUBSCRIBERS'
+
+    # Statuses
+    PENDING = 'PENDING'
+    RUNNING = 'RUNNING'
+    COMPLETED = 'COMPLETED'
+    FAILED = 'FAILED'
+
+    id = db.Column(db.Integer, primary_key=True)
+    audience = db.Column(db.String(30), nullable=False)
+    audience_id = db.Column(db.Integer)  # e.g. radio id for RADIO_SUBSCRIBERS
+    title = db.Column(db.String(100), nullable=False)
+    message = db.Column(db.Text, nullable=False)
+    type = db.Column(db.String(50), nullable=False)
+    related_id = db.Column(db.Integer)
+    status = db.Column(db.String(20), nullable=False, default=PENDING)
+    total = db.Column(db.Integer)
+    sent = db.Column(db.Integer, nullable=False, default=0)
+    last_user_id = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.now)
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'audience': self.audience,
+            'audience_id': self.audience_id,
+            'type': self.type,
+            'related_id': self.related_id,
+            'status': self.status,
+            'total': self.total,
+            'sent': self.sent,
+            'progress': round(self.sent / self.total, 4) if self.total else (1.0 if self.status == self.COMPLETED else 0.0),
+            'error': self.error,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
+
+    def __repr__(self):
+        return f'<NotificationFanout {self.id} {self.audience} {self.status}>'
@@ -0,0 +1,38 @@
+from app.extensions import db
+from datetime import datetime
+
+
+class OutboxMessage(db.Model):
+    """A side effect (email, push, notification fan-out) waiting to be run.
+
+    Written in the same transaction as the change that triggers it and
+    drained by app.utils.outbox workers, so the side effect happens if and
+    only if the change commits. Delivered messages are deleted; messages that
+    exhaust their attempts stay as FAILED for inspection. Sensitive payloads
+    (verification codes) are redacted when they fail for good.
+    """
+    __tablename__ = 'outbox_messages'
+    __table_args__ = (
+        db.Index('ix_outbox_messages_status_available', 'status', 'available_at'),
+    )
+
+    # Statuses
+    PENDING = 'PENDING'
+    PROCESSING = 'PROCESSING'
+    FAILED = 'FAILED'
+
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(50), nullable=False)
+    payload = db.Column(db.Text, nullable=False)  # JSON
+    sensitive = db.Column(db.Boolean, nullable=False, default=False, server_default='0')
+    status = db.Column(db.String(20), nullable=False, default=PENDING)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    max_attempts = db.Column(db.Integer, nullable=False, default=5)
+    available_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    locked_by = db.Column(db.String(120))
+    locked_until = db.Column(db.DateTime)
+    last_error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<OutboxMessage {self.id} {self.kind} {self.status}>'
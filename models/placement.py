@@ -3,6 +3,9 @@ from datetime import datetime
 
 class Placement(db.Model):
     __tablename__ = 'placements'
+    __table_args__ = (
+        db.Index('ft_placements_search', 'company_name', 'position', 'description', mysql_prefix='FULLTEXT'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     company_name = db.Column(db.String(100), nullable=False)
@@ -12,7 +15,7 @@ class Placement(db.Model):
     image_url = db.Column(db.String(255), nullable=True)  # For company logos / posters / results
     deadline = db.Column(db.DateTime)
     created_by = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
-    created_at = db.Column(db.DateTime, default=datetime.now)
+    created_at = db.Column(db.DateTime, default=datetime.now, index=True)
     updated_at = db.Column(db.DateTime, default=datetime.now, onupdate=datetime.now)
     
     def to_dict(self):
@@ -28,6 +28,9 @@ radio_participants = db.Table('radio_participants',
 
 class Radio(db.Model):
     __tablename__ = 'radios'
+    __table_args__ = (
+        db.Index('ft_radios_title_description', 'title', 'description', mysql_prefix='FULLTEXT'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(200), nullable=False)
@@ -36,7 +39,7 @@ class Radio(db.Model):
     media_url = db.Column(db.String(255))  # For MP3/MP4 files
     recording_url = db.Column(db.String(255))  # For saved recordings
     location = db.Column(db.String(200))
-    start_time = db.Column(db.DateTime, nullable=False)
+    start_time = db.Column(db.DateTime, nullable=False, index=True)
     end_time = db.Column(db.DateTime, nullable=False)
     status = db.Column(db.Enum(RadioStatus), nullable=False, default=RadioStatus.UPCOMING)
     created_by = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
@@ -56,21 +59,90 @@ class Radio(db.Model):
     # Audio/Video duration in seconds
     duration = db.Column(db.Integer, nullable=True, default=0)
     
+    # Denormalized engagement counters, maintained with utils.counters.adjust_counter
+    # in the same transaction as the row change (rebuild: flask rebuild-counters)
+    favorites_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    participants_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    comments_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    
     # Relationships
     participants = db.relationship('User', secondary=radio_participants, backref='participated_radios', lazy='dynamic')
     
     @property
     def participant_count(self):
         """Get count of participants"""
-        return self.participants.count()
+        return self.participants_count or 0
     
     @property
     def favorite_count(self):
         """Get count of users who favorited this radio"""
-        return self.favorited_by.count() if hasattr(self, 'favorited_by') else 0
+        return self.favorites_count or 0
     
     def to_dict(self, user_id=None):
         """Convert to dictionary for JSON response"""
+        is_favorited = None
+        
+        # Check if user has favorited this radio
+        if user_id:
+            from app.models.favorite import Favorite
+            is_favorited = Favorite.query.filter_by(
+                user_id=user_id, radio_id=self.id
+            ).first() is not None
+        
+        return self._serialize(
+            participant_count=self.participant_count,
+            favorite_count=self.favorite_count,
+            category=self.category,
+            is_favorited=is_favorited
+        )
+    
+    @classmethod
+    def to_dict_many(cls, radios, user_id=None):
+        """Serialize a page of radios using a fixed number of grouped queries.
+        
+        Counts come from the denormalized counter columns; categories and
+        the caller's favorite flags are each fetched once for the whole page
+        instead of once per radio, so the query count does not grow with
+        page size.
+        """
+        from app.models.favorite import Favorite
+        from app.models.category import Category
+        
+        radios = list(radios)
+        if not radios:
+            return []
+        
+        radio_ids = [radio.id for radio in radios]
+        
+        category_ids = {radio.category_id for radio in radios if radio.category_id}
+        categories = {}
+        if category_ids:
+            categories = {
+                category.id: category
+                for category in Category.query.filter(Category.id.in_(category_ids)).all()
+            }
+        
+        favorited_ids = set()
+        if user_id:
+            favorited_ids = {
+                row.radio_id for row in db.session.query(Favorite.radio_id).filter(
+                    Favorite.user_id == user_id,
+                    Favorite.radio_id.in_(radio_ids)
+                ).all()
+            }
+        
+        return [
+            radio._serialize(
+                participant_count=radio.participant_count,
+                favorite_count=radio.favorite_count,
+                category=categories.get(radio.category_id),
+                is_favorited=(radio.id in favorited_ids) if user_id else None
+            )
+            for radio in radios
+        ]
+    
+    def _serialize(self, participant_count, favorite_count, category, is_favorited=None):
+        """Build the response dict from precomputed related values"""
         # Handle media_url - check for empty string as well as None
         media_url_value = None
         if self.media_url and len(self.media_url.strip()) > 0:
@@ -99,8 +171,9 @@ class Radio(db.Model):
             'end_time': self.end_time.isoformat() if self.end_time else None,
             'status': self.status.value,
             'created_by': self.created_by,
-            'participant_count': self.participant_count,
-            'favorite_count': self.favorite_count,
+            'participant_count': participant_count,
+            'favorite_count': favorite_count,
+            'comment_count': self.comments_count or 0,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None,
             'media_type': self.media_type.value if self.media_type else 'NONE',
@@ -108,16 +181,12 @@ class Radio(db.Model):
             'hosted_by': self.hosted_by,
             'stream_started_at': self.stream_started_at.isoformat() if self.stream_started_at else None,
             'category_id': self.category_id,
-            'category': self.category.to_dict() if self.category else None,
+            'category': category.to_dict() if category else None,
             'duration': self.duration or 0
         }
         
-        # Check if user has favorited this radio
-        if user_id:
-            from app.models.favorite import Favorite
-            result['is_favorited'] = Favorite.query.filter_by(
-                user_id=user_id, radio_id=self.id
-            ).first() is not None
+        if is_favorited is not None:
+            result['is_favorited'] = is_favorited
         
         return result
     
@@ -1,4 +1,5 @@
 from datetime import datetime
+from sqlalchemy import select, delete
 from app.extensions import db
 
 class RadioListener(db.Model):
@@ -9,7 +10,7 @@ class RadioListener(db.Model):
     session_id = db.Column(db.String(64), unique=True, nullable=False)  # Unique session identifier
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)  # NULL for anonymous
     joined_at = db.Column(db.DateTime, default=datetime.utcnow)
-    last_heartbeat = db.Column(db.DateTime, default=datetime.utcnow)
+    last_heartbeat = db.Column(db.DateTime, default=datetime.utcnow, index=True)
     ip_address = db.Column(db.String(45), nullable=True)  # IPv6 compatible
     device_info = db.Column(db.String(255), nullable=True)
     
@@ -34,12 +35,59 @@ class RadioListener(db.Model):
         return cls.query.filter(cls.last_heartbeat >= cutoff).count()
     
     @classmethod
-    def cleanup_stale(cls, timeout_minutes=5):
-        """Remove listeners who haven't sent a heartbeat recently"""
+    def cleanup_stale(cls, timeout_minutes=5, batch_size=1000, max_batches=None, archive=False):
+        """Remove listeners who haven't sent a heartbeat recently.
+        
+        Deletes in batches of batch_size, each batch in its own short
+        transaction, until no stale rows are left or max_batches is reached.
+        On MySQL each batch is a single DELETE ... LIMIT; with archive=True (or
+        on other databases) the rows are selected first and deleted by id, and
+        the selected sessions are added to ListenerSessionDay.
+        Returns the number of rows removed.
+        """
         from datetime import timedelta
+        from app.models.listener_stats import ListenerSessionDay
+        
         cutoff = datetime.utcnow() - timedelta(minutes=timeout_minutes)
-        stale = cls.query.filter(cls.last_heartbeat < cutoff).all()
-        for listener in stale:
-            db.session.delete(listener)
-        db.session.commit()
-        return len(stale)
+        removed = 0
+        batches = 0
+        if not archive and db.engine.dialect.name == 'mysql':
+            stale = delete(cls).where(cls.last_heartbeat < cutoff)\
+                .with_dialect_options(mysql_limit=batch_size)\
+                .execution_options(synchronize_session=False)
+            while max_batches is None or batches < max_batches:
+                try:
+                    deleted = db.session.execute(stale).rowcount
+                    db.session.commit()
+                except Exception:
+                    db.session.rollback()
+                    raise
+                
+                removed += deleted
+                batches += 1
+                if deleted < batch_size:
+                    break
+            return removed
+        
+        while max_batches is None or batches < max_batches:
+            rows = db.session.execute(
+                select(cls.id, cls.user_id, cls.joined_at, cls.last_heartbeat)
+                .where(cls.last_heartbeat < cutoff).order_by(cls.id).limit(batch_size)
+            ).all()
+            if not rows:
+                break
+            
+            try:
+                if archive:
+                    ListenerSessionDay.add_sessions(rows)
+                db.session.execute(delete(cls).where(cls.id.in_([row.id for row in rows])))
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                raise
+            
+            removed += len(rows)
+            batches += 1
+            if len(rows) < batch_size:
+                break
+        return removed
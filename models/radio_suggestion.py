@@ -9,6 +9,9 @@ class SuggestionStatus(enum.Enum):
 
 class RadioSuggestion(db.Model):
     __tablename__ = 'radio_suggestions'
+    __table_args__ = (
+        db.Index('ft_radio_suggestions_search', 'radio_title', 'description', mysql_prefix='FULLTEXT'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     radio_title = db.Column(db.String(200), nullable=False)
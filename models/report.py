@@ -32,7 +32,7 @@ class Report(db.Model):
     priority = db.Column(db.Enum(ReportPriority), default=ReportPriority.MEDIUM, nullable=False)
     status = db.Column(db.Enum(ReportStatus), default=ReportStatus.PENDING, nullable=False)
     admin_reply = db.Column(db.Text)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Relationships
@@ -40,9 +40,9 @@ class Report(db.Model):
     radio = db.relationship('Radio', backref='reports')
     
     def to_dict(self):
-        from app.models.user import User
+        from app.utils.loaders import user_loader
         
-        student = User.query.get(self.student_id)
+        student = user_loader().get(self.student_id)
         
         # Handle image URL
         image_url_value = None
@@ -0,0 +1,71 @@
+from app.extensions import db
+from datetime import datetime, timedelta
+from sqlalchemy.exc import IntegrityError
+
+
+class SchedulerLease(db.Model):
+    """Time-limited leadership lease for a background job.
+
+    One row per job name. The holder must renew before expires_at; once it
+    lapses any other process may take the lease over. Acquire and renew are a
+    single conditional UPDATE, so at most one process holds a lease at a time.
+    """
+    __tablename__ = 'scheduler_leases'
+
+    name = db.Column(db.String(50), primary_key=True)
+    holder = db.Column(db.String(120), nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False)
+    renewed_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    @classmethod
+    def acquire(cls, name, holder, ttl):
+        """Take or renew the lease for holder; True if holder now owns it.
+
+        Commits its own transaction so the lease is visible to other workers.
+        """
+        now = datetime.utcnow()
+        values = {
+            cls.holder: holder,
+            cls.expires_at: now + timedelta(seconds=ttl),
+            cls.renewed_at: now
+        }
+        try:
+            updated = cls.query.filter(
+                cls.name == name,
+                db.or_(cls.holder == holder, cls.expires_at < now)
+            ).update(values, synchronize_session=False)
+
+            if not updated:
+                if db.session.query(cls.name).filter_by(name=name).first():
+                    # Held by another live process
+                    db.session.rollback()
+                    return False
+                try:
+                    with db.session.begin_nested():
+                        db.session.add(cls(name=name, holder=holder,
+                                           expires_at=now + timedelta(seconds=ttl), renewed_at=now))
+                except IntegrityError:
+                    db.session.rollback()
+                    return False
+
+            db.session.commit()
+            return True
+        except Exception:
+            db.session.rollback()
+            raise
+
+    @classmethod
+    def release(cls, name, holder):
+        """Give up the lease early so a standby can take over immediately"""
+        try:
+            cls.query.filter_by(name=name, holder=holder).update(
+                {cls.expires_at: datetime.utcnow() - timedelta(seconds=1)},
+                synchronize_session=False
+            )
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+    def __repr__(self):
+        return f'<SchedulerLease {self.name} held by {self.holder}>'
@@ -14,6 +14,9 @@ class MediaType(enum.Enum):
 
 class Update(db.Model):
     __tablename__ = 'updates'
+    __table_args__ = (
+        db.Index('ft_updates_title_description', 'title', 'description', mysql_prefix='FULLTEXT'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(200), nullable=False)
@@ -23,16 +26,102 @@ class Update(db.Model):
     category = db.Column(db.Enum(UpdateCategory), nullable=False)
     is_pinned = db.Column(db.Boolean, default=False)
     created_by = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
-    created_at = db.Column(db.DateTime, default=datetime.now)
+    created_at = db.Column(db.DateTime, default=datetime.now, index=True)
     updated_at = db.Column(db.DateTime, default=datetime.now, onupdate=datetime.now)
     
+    # Denormalized like counter (per-emoji totals live in UpdateReactionCount)
+    likes_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    
     def to_dict(self, current_user_id=None):
         """Convert to dictionary for JSON response"""
-        from app.models.user import User
+        from app.utils.loaders import user_loader
+        from app.utils.engagement import engagement
         from app.models.update_like import UpdateLike
-        from app.models.update_reaction import UpdateReaction
+        from app.models.update_reaction import UpdateReaction, UpdateReactionCount
+        
+        # Likes logic
+        is_liked = False
+        user_reaction = None
+        if current_user_id:
+            is_liked = UpdateLike.query.filter_by(user_id=current_user_id, update_id=self.id).first() is not None
+            user_reaction_obj = UpdateReaction.query.filter_by(
+                user_id=current_user_id,
+                update_id=self.id
+            ).first()
+            if user_reaction_obj:
+                user_reaction = user_reaction_obj.emoji
+        
+        return self._serialize(
+            creator=user_loader().get(self.created_by),
+            is_liked=is_liked,
+            reactions=UpdateReactionCount.get_counts(self.id),
+            user_reaction=user_reaction,
+            pending=engagement.pending([self.id], current_user_id)
+        )
+    
+    @classmethod
+    def to_dict_many(cls, updates, current_user_id=None):
+        """Serialize a page of updates using a fixed number of grouped queries.
+        
+        Creators, per-emoji reaction totals and the caller's likes and
+        reactions are each fetched once for the whole page (at most four
+        queries) instead of once per update.
+        """
+        from app.utils.loaders import user_loader
+        from app.utils.engagement import engagement
+        from app.models.update_like import UpdateLike
+        from app.models.update_reaction import UpdateReaction, UpdateReactionCount
+        
+        updates = list(updates)
+        if not updates:
+            return []
+        
+        update_ids = [update.id for update in updates]
+        loader = user_loader().prime(update.created_by for update in updates)
+        loader.load()
+        reactions = UpdateReactionCount.get_counts_many(update_ids)
         
-        creator = User.query.get(self.created_by)
+        liked_ids = set()
+        user_reactions = {}
+        if current_user_id:
+            liked_ids = set(db.session.scalars(
+                db.select(UpdateLike.update_id).where(
+                    UpdateLike.user_id == current_user_id,
+                    UpdateLike.update_id.in_(update_ids)
+                )
+            ).all())
+            user_reactions = dict(db.session.query(UpdateReaction.update_id, UpdateReaction.emoji).filter(
+                UpdateReaction.user_id == current_user_id,
+                UpdateReaction.update_id.in_(update_ids)
+            ).all())
+        
+        pending = engagement.pending(update_ids, current_user_id)
+        return [
+            update._serialize(
+                creator=loader.get(update.created_by),
+                is_liked=update.id in liked_ids,
+                reactions=reactions[update.id],
+                user_reaction=user_reactions.get(update.id),
+                pending=pending
+            )
+            for update in updates
+        ]
+    
+    def _serialize(self, creator, is_liked, reactions, user_reaction, pending=None):
+        """Build the response dict from precomputed related values.
+        
+        pending is EngagementBuffer.pending() output; buffered likes and
+        reactions not yet flushed are applied on top of the stored values.
+        """
+        from app.utils.engagement import apply_reaction_deltas
+        
+        likes_count = self.likes_count or 0
+        if pending:
+            like_deltas, reaction_deltas, liked, user_reactions = pending
+            likes_count = max(likes_count + like_deltas.get(self.id, 0), 0)
+            reactions = apply_reaction_deltas(dict(reactions), reaction_deltas.get(self.id))
+            is_liked = liked.get(self.id, is_liked)
+            user_reaction = user_reactions.get(self.id, user_reaction)
         
         # Handle media_url
         media_url_value = None
@@ -50,23 +139,6 @@ class Update(db.Model):
             else:
                 creator_profile = f'/uploads/{creator.profile_picture}'
         
-        # Likes logic
-        likes_count = UpdateLike.query.filter_by(update_id=self.id).count()
-        is_liked = False
-        if current_user_id:
-            is_liked = UpdateLike.query.filter_by(user_id=current_user_id, update_id=self.id).first() is not None
-        
-        # Reactions (replacing comments)
-        reactions = UpdateReaction.get_reaction_counts(self.id)
-        user_reaction = None
-        if current_user_id:
-            user_reaction_obj = UpdateReaction.query.filter_by(
-                user_id=current_user_id,
-                update_id=self.id
-            ).first()
-            if user_reaction_obj:
-                user_reaction = user_reaction_obj.emoji
-        
         return {
             'id': self.id,
             'title': self.title,
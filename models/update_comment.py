@@ -12,8 +12,8 @@ class UpdateComment(db.Model):
     
     def to_dict(self):
         """Convert to dictionary for JSON response"""
-        from app.models.user import User
-        user = User.query.get(self.user_id)
+        from app.utils.loaders import user_loader
+        user = user_loader().get(self.user_id)
         
         return {
             'id': self.id,
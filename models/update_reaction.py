@@ -1,5 +1,6 @@
 from datetime import datetime
 from app.extensions import db
+from sqlalchemy.exc import IntegrityError
 
 # Allowed emoji reactions
 ALLOWED_EMOJIS = ['👍', '❤️', '😂', '😮', '😢', '🔥']
@@ -15,9 +16,9 @@ class UpdateReaction(db.Model):
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     def to_dict(self):
-        from app.models.user import User
+        from app.utils.loaders import user_loader
         
-        user = User.query.get(self.user_id)
+        user = user_loader().get(self.user_id)
         
         return {
             'id': self.id,
@@ -33,17 +34,52 @@ class UpdateReaction(db.Model):
         """Validate if emoji is allowed"""
         return emoji in ALLOWED_EMOJIS
     
-    @staticmethod
-    def get_reaction_counts(update_id):
-        """Get count of each emoji type for an update"""
-        reactions = UpdateReaction.query.filter_by(update_id=update_id).all()
-        
-        counts = {emoji: 0 for emoji in ALLOWED_EMOJIS}
-        for reaction in reactions:
-            if reaction.emoji in counts:
-                counts[reaction.emoji] += 1
+    def __repr__(self):
+        return f'<UpdateReaction update={self.update_id} user={self.user_id} emoji={self.emoji}>'
+
+
+class UpdateReactionCount(db.Model):
+    """Denormalized per-emoji reaction totals for an update"""
+    __tablename__ = 'update_reaction_counts'
+    
+    update_id = db.Column(db.Integer, db.ForeignKey('updates.id'), primary_key=True)
+    emoji = db.Column(db.String(10), primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
+    
+    @classmethod
+    def adjust(cls, update_id, emoji, delta):
+        """Atomically add delta to one emoji total; the caller commits"""
+        values = {cls.count: db.case((cls.count + delta < 0, 0), else_=cls.count + delta)}
+        updated = cls.query.filter_by(update_id=update_id, emoji=emoji)\
+            .update(values, synchronize_session=False)
+        if updated or delta <= 0:
+            return
         
+        # First reaction of this kind - another request may insert it concurrently
+        try:
+            with db.session.begin_nested():
+                db.session.add(cls(update_id=update_id, emoji=emoji, count=delta))
+        except IntegrityError:
+            cls.query.filter_by(update_id=update_id, emoji=emoji)\
+                .update(values, synchronize_session=False)
+    
+    @classmethod
+    def get_counts(cls, update_id):
+        """Get count of each emoji type for an update"""
+        return cls.get_counts_many([update_id])[update_id]
+    
+    @classmethod
+    def get_counts_many(cls, update_ids):
+        """Get {update_id: {emoji: count}} for many updates in one query"""
+        counts = {update_id: {emoji: 0 for emoji in ALLOWED_EMOJIS} for update_id in update_ids}
+        if not counts:
+            return counts
+        rows = db.session.query(cls.update_id, cls.emoji, cls.count)\
+            .filter(cls.update_id.in_(list(counts))).all()
+        for update_id, emoji, count in rows:
+            if emoji in counts[update_id]:
+                counts[update_id][emoji] = count
         return counts
     
     def __repr__(self):
-        return f'<UpdateReaction update={self.update_id} user={self.user_id} emoji={self.emoji}>'
+        return f'<UpdateReactionCount update={self.update_id} {self.emoji}={self.count}>'
@@ -1,4 +1,4 @@
-from flask import Blueprint, jsonify
+from flask import Blueprint, jsonify, request
 from flask_jwt_extended import jwt_required
 from datetime import datetime, timedelta
 from sqlalchemy import func
@@ -8,6 +8,8 @@ from app.models.user import User, UserRole
 from app.models.comment import Comment
 from app.models.favorite import Favorite
 from app.models.category import Category
+from app.models.live_podcast import LivePodcast, PodcastStatus
+from app.models.listener_stats import ListenerSketch, ListenerSessionDay
 from app.middleware.auth import admin_required
 
 bp = Blueprint('analytics', __name__, url_prefix='/api/analytics')
@@ -150,3 +152,95 @@ def get_trends():
         'daily_radios': list(reversed(daily_radios)),
         'daily_users': list(reversed(daily_users))
     }), 200
+
+
+@bp.route('/listeners', methods=['GET'])
+@admin_required
+def get_listener_analytics():
+    """Unique 24/7 stream listeners per day and week (approximate, ~2% error)
+
+    Daily entries also carry totals of finished sessions, once the
+    stale-listener reaper has archived them.
+
+    Query params:
+        days: Number of UTC days to report, ending today (default: 28, max: 366)
+    """
+    from app.utils.presence import STREAM_CHANNEL
+    
+    days = min(max(request.args.get('days', 28, type=int), 1), 366)
+    end_day = datetime.utcnow().date()
+    start_day = end_day - timedelta(days=days - 1)
+    sketches = ListenerSketch.daily([STREAM_CHANNEL], start_day, end_day)
+    sessions = {
+        row.day: row for row in ListenerSessionDay.query.filter(
+            ListenerSessionDay.day >= start_day, ListenerSessionDay.day <= end_day
+        ).all()
+    }
+    
+    daily = []
+    weeks = {}
+    for i in range(days):
+        day = start_day + timedelta(days=i)
+        sketch = sketches.get((STREAM_CHANNEL, day))
+        daily.append({
+            'date': day.isoformat(),
+            'unique_listeners': sketch.count() if sketch else 0,
+            'sessions': sessions[day].to_dict() if day in sessions else None
+        })
+        if sketch:
+            weeks.setdefault(day - timedelta(days=day.weekday()), []).append(sketch)
+    
+    # Weeks start on Monday; the first and last may be partial
+    weekly = []
+    week_start = start_day - timedelta(days=start_day.weekday())
+    while week_start <= end_day:
+        weekly.append({
+            'week_start': week_start.isoformat(),
+            'unique_listeners': ListenerSketch.union(weeks.get(week_start, []))
+        })
+        week_start += timedelta(days=7)
+    
+    return jsonify({
+        'from': start_day.isoformat(),
+        'to': end_day.isoformat(),
+        'unique_listeners': ListenerSketch.union(sketches.values()),
+        'daily': daily,
+        'weekly': weekly
+    }), 200
+
+
+@bp.route('/shows', methods=['GET'])
+@admin_required
+def get_show_analytics():
+    """Unique listeners (approximate) and peak listeners per live podcast
+
+    Query params:
+        limit: Most recent podcasts to include (default: 20, max: 100)
+    """
+    from app.utils.presence import podcast_channel
+    
+    limit = min(max(request.args.get('limit', 20, type=int), 1), 100)
+    podcasts = LivePodcast.query.filter(
+        LivePodcast.status.in_([PodcastStatus.LIVE, PodcastStatus.ENDED])
+    ).order_by(LivePodcast.actual_start_time.desc()).limit(limit).all()
+    
+    channels = {podcast.id: podcast_channel(podcast.id) for podcast in podcasts}
+    by_channel = {}
+    if channels:
+        for (channel, _), sketch in ListenerSketch.daily(list(channels.values())).items():
+            by_channel.setdefault(channel, []).append(sketch)
+    
+    return jsonify({
+        'shows': [
+            {
+                'id': podcast.id,
+                'title': podcast.title,
+                'status': podcast.status.value,
+                'actual_start_time': podcast.actual_start_time.isoformat() if podcast.actual_start_time else None,
+                'end_time': podcast.end_time.isoformat() if podcast.end_time else None,
+                'listener_peak_count': podcast.listener_peak_count or 0,
+                'unique_listeners': ListenerSketch.union(by_channel.get(channels[podcast.id], []))
+            }
+            for podcast in podcasts
+        ]
+    }), 200
@@ -5,6 +5,8 @@ from app.models.user import User, UserRole
 from app.models.student import Student
 from app.models.admin import Admin
 from app.models.admin_request import AdminRequest, RequestStatus
+from app.models.global_notification import GlobalNotificationReadState
+from app.models.notification_badge import NotificationBadge
 from app.utils.email import send_otp_email
 from app.utils.password_validator import validate_password
 from werkzeug.security import generate_password_hash
@@ -79,6 +81,10 @@ def register():
     )
     
     db.session.add(profile)
+    
+    # Broadcasts sent before this account existed stay hidden
+    GlobalNotificationReadState.start(user.id)
+    NotificationBadge.start(user.id)
     db.session.commit()
     
     # Generate OTP
@@ -92,10 +98,10 @@ def register():
     otp = OTP(identifier=user.email, expires_at=expires_at)
     otp.set_otp(otp_code)
     db.session.add(otp)
-    db.session.commit()
     
-    # SEND GMAIL OTP
+    # SEND GMAIL OTP (queued in the outbox with the OTP itself)
     send_otp_email(user.email, otp_code)
+    db.session.commit()
     
     return jsonify({
         'message': 'Registration successful. Please verify your OTP.',
@@ -231,10 +237,10 @@ def resend_otp():
     otp = OTP(identifier=user.email, expires_at=expires_at)
     otp.set_otp(otp_code)
     db.session.add(otp)
-    db.session.commit()
     
-    # SEND GMAIL OTP
+    # SEND GMAIL OTP (queued in the outbox with the OTP itself)
     send_otp_email(user.email, otp_code)
+    db.session.commit()
     
     return jsonify({
         'message': 'OTP resent successfully'
@@ -268,10 +274,10 @@ def forgot_password():
     otp = OTP(identifier=user.email, expires_at=expires_at)
     otp.set_otp(otp_code)
     db.session.add(otp)
-    db.session.commit()
     
-    # Send Email
+    # Send Email (queued in the outbox with the OTP itself)
     send_otp_email(user.email, otp_code)
+    db.session.commit()
     
     return jsonify({
         'message': 'OTP sent to your email for password reset'
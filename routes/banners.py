@@ -2,12 +2,18 @@ from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.extensions import db
 from app.models.banner import Banner
+from app.models.content_version import ContentVersion
 from app.middleware.auth import admin_required
+from app.middleware.conditional import conditional_response
 from app.utils.upload import save_upload, allowed_file, delete_file
 
 bp = Blueprint('banners', __name__, url_prefix='/api/banners')
 
+def _banners_stamp():
+    return ContentVersion.get('banners')
+
 @bp.route('', methods=['GET'])
+@conditional_response(_banners_stamp)
 def get_banners():
     """Get all active banners ordered by sequence"""
     active_only = request.args.get('active_only', 'true').lower() == 'true'
@@ -46,6 +52,7 @@ def create_banner():
     )
     
     db.session.add(banner)
+    ContentVersion.bump('banners')
     db.session.commit()
     
     return jsonify(banner.to_dict()), 201
@@ -69,6 +76,7 @@ def update_banner(banner_id):
     if 'is_active' in data:
         banner.is_active = data['is_active']
         
+    ContentVersion.bump('banners')
     db.session.commit()
     
     return jsonify(banner.to_dict()), 200
@@ -87,6 +95,7 @@ def delete_banner(banner_id):
         delete_file(filename)
         
     db.session.delete(banner)
+    ContentVersion.bump('banners')
     db.session.commit()
     
     return jsonify({'message': 'Banner deleted successfully'}), 200
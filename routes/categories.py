@@ -2,12 +2,19 @@ from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.extensions import db
 from app.models.category import Category
+from app.models.content_version import ContentVersion
 from app.middleware.auth import admin_required
+from app.middleware.conditional import conditional_response
 
 bp = Blueprint('categories', __name__, url_prefix='/api/categories')
 
 
+def _categories_stamp():
+    return ContentVersion.get('categories')
+
+
 @bp.route('', methods=['GET'])
+@conditional_response(_categories_stamp)
 def get_categories():
     """Get all categories"""
     categories = Category.query.all()
@@ -44,6 +51,7 @@ def create_category():
     )
     
     db.session.add(category)
+    ContentVersion.bump('categories')
     db.session.commit()
     
     return jsonify(category.to_dict()), 201
@@ -66,6 +74,7 @@ def update_category(category_id):
     if 'icon' in data:
         category.icon = data['icon']
     
+    ContentVersion.bump('categories')
     db.session.commit()
     
     return jsonify(category.to_dict()), 200
@@ -80,6 +89,7 @@ def delete_category(category_id):
         return jsonify({'error': 'Category not found'}), 404
     
     db.session.delete(category)
+    ContentVersion.bump('categories')
     db.session.commit()
     
     return jsonify({'message': 'Category deleted'}), 200
@@ -108,6 +118,8 @@ def seed_categories():
             db.session.add(category)
             created.append(cat_data['name'])
     
+    if created:
+        ContentVersion.bump('categories')
     db.session.commit()
     
     return jsonify({
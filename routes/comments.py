@@ -5,6 +5,10 @@ from app.extensions import db
 from app.models.comment import Comment
 from app.models.radio import Radio
 from app.middleware.auth import admin_required
+from app.utils.counters import adjust_counter
+from app.utils.pagination import keyset_paginate, InvalidCursor
+from app.utils.loaders import user_loader
+from app.utils.events import publish_on_commit, comments_topic
 
 bp = Blueprint('comments', __name__, url_prefix='/api')
 
@@ -19,10 +23,31 @@ def get_comments(radio_id):
     page = request.args.get('page', 1, type=int)
     limit = request.args.get('limit', 50, type=int)
     
+    # Keyset pagination (opt-in with ?cursor=, empty for the first page)
+    cursor = request.args.get('cursor', type=str)
+    if cursor is not None:
+        try:
+            page_data = keyset_paginate(
+                Comment.query.filter_by(radio_id=radio_id),
+                [(Comment.created_at, True, None), (Comment.id, True, None)],
+                cursor=cursor,
+                limit=limit,
+                with_total=request.args.get('include_total', 'false').lower() == 'true'
+            )
+        except InvalidCursor:
+            return jsonify({'error': 'Invalid cursor'}), 400
+        
+        user_loader().prime(c.user_id for c in page_data.items)
+        return jsonify({
+            'comments': [c.to_dict() for c in page_data.items],
+            **page_data.meta()
+        }), 200
+    
     comments = Comment.query.filter_by(radio_id=radio_id)\
         .order_by(Comment.created_at.desc())\
         .paginate(page=page, per_page=limit, error_out=False)
     
+    user_loader().prime(c.user_id for c in comments.items)
     return jsonify({
         'comments': [c.to_dict() for c in comments.items],
         'total': comments.total,
@@ -57,9 +82,14 @@ def add_comment(radio_id):
     )
     
     db.session.add(comment)
+    adjust_counter(Radio, radio_id, 'comments_count', 1)
+    db.session.flush()
+    
+    data = comment.to_dict()
+    publish_on_commit(comments_topic(radio_id), 'comment.created', data)
     db.session.commit()
     
-    return jsonify(comment.to_dict()), 201
+    return jsonify(data), 201
 
 
 @bp.route('/comments/<int:comment_id>', methods=['DELETE'])
@@ -80,6 +110,10 @@ def delete_comment(comment_id):
         return jsonify({'error': 'Unauthorized'}), 403
     
     db.session.delete(comment)
+    adjust_counter(Radio, comment.radio_id, 'comments_count', -1)
+    publish_on_commit(comments_topic(comment.radio_id), 'comment.deleted', {
+        'id': comment.id, 'radio_id': comment.radio_id
+    })
     db.session.commit()
     
     return jsonify({'message': 'Comment deleted'}), 200
@@ -107,4 +141,5 @@ def get_recent_comments(radio_id):
     
     comments = query.order_by(Comment.created_at.asc()).limit(limit).all()
     
+    user_loader().prime(c.user_id for c in comments)
     return jsonify([c.to_dict() for c in comments]), 200
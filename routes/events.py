@@ -0,0 +1,144 @@
+import queue
+import time
+from datetime import timedelta
+from flask import Blueprint, Response, current_app, jsonify, request
+from flask_jwt_extended import (
+    create_access_token, decode_token, get_jwt_identity, jwt_required, verify_jwt_in_request
+)
+from app.extensions import jwt
+from app.utils.events import (
+    hub, format_sse, LIVE_TOPIC, RADIOS_TOPIC, QUEUE_TOPIC, NOTIFICATIONS_TOPIC, COMMENTS_TOPIC_PREFIX
+)
+
+bp = Blueprint('events', __name__, url_prefix='/api/events')
+
+PUBLIC_TOPICS = {LIVE_TOPIC, RADIOS_TOPIC, QUEUE_TOPIC}
+
+# Scope claim of the short-lived tokens EventSource clients put in ?token=
+STREAM_TOKEN_SCOPE = 'events'
+
+
+@jwt.token_verification_loader
+def _reject_stream_tokens(jwt_header, jwt_data):
+    """Stream tokens end up in URLs (and so in access logs); they only open streams"""
+    return jwt_data.get('scope') != STREAM_TOKEN_SCOPE
+
+
+def _current_user_id():
+    """JWT from the Authorization header, or a stream token in ?token=
+
+    EventSource cannot set headers, but a full access token in the query
+    string would be logged by proxies, so ?token= only accepts the
+    short-lived tokens issued by POST /api/events/token.
+    """
+    try:
+        verify_jwt_in_request(optional=True)
+        identity = get_jwt_identity()
+        if identity is None and request.args.get('token'):
+            claims = decode_token(request.args['token'])
+            if claims.get('scope') == STREAM_TOKEN_SCOPE:
+                identity = claims['sub']
+        return int(identity) if identity is not None else None
+    except Exception:
+        return None
+
+
+def _parse_topics(raw, user_id):
+    """Validate requested topics; returns (topics, error, status_code)"""
+    topics = set()
+    for topic in (t.strip() for t in raw.split(',')):
+        if not topic:
+            continue
+        if topic in PUBLIC_TOPICS:
+            topics.add(topic)
+        elif topic.startswith(COMMENTS_TOPIC_PREFIX) and topic[len(COMMENTS_TOPIC_PREFIX):].isdigit():
+            topics.add(topic)
+        elif topic == NOTIFICATIONS_TOPIC:
+            if user_id is None:
+                return None, 'Authentication required for notifications topic', 401
+            topics.add(topic)
+        else:
+            return None, f'Unknown topic: {topic}', 400
+    if not topics:
+        return None, 'At least one topic is required', 400
+    return topics, None, None
+
+
+@bp.route('/token', methods=['POST'])
+@jwt_required()
+def stream_token():
+    """Short-lived token for ?token= on the event stream
+
+    It is only accepted by GET /api/events. Fetch a new one when the stream
+    answers 401 (e.g. on reconnect after it expired).
+    """
+    expires_in = current_app.config.get('EVENTS_TOKEN_SECONDS', 300)
+    token = create_access_token(
+        identity=get_jwt_identity(),
+        expires_delta=timedelta(seconds=expires_in),
+        additional_claims={'scope': STREAM_TOKEN_SCOPE}
+    )
+    return jsonify({'token': token, 'expires_in': expires_in}), 200
+
+
+@bp.route('', methods=['GET'])
+def stream_events():
+    """Server-Sent Events stream
+
+    Query params:
+        topics: Comma-separated list of live, radios, queue, notifications,
+            comments:radio:<id>
+        token: Stream token from POST /api/events/token, for clients that
+            cannot send an Authorization header
+
+    Each connection lasts at most EVENTS_MAX_STREAM_SECONDS; EventSource
+    reconnects with Last-Event-ID and missed events are replayed. Every open
+    stream holds a worker thread or greenlet, so each process accepts at most
+    EVENTS_MAX_CONNECTIONS and answers 503 beyond that.
+    """
+    user_id = _current_user_id()
+    topics, error, status_code = _parse_topics(request.args.get('topics', ''), user_id)
+    if error:
+        return jsonify({'error': error}), status_code
+    if request.args.get('token') and user_id is None:
+        return jsonify({'error': 'Invalid or expired stream token'}), 401
+
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    try:
+        last_event_id = int(last_event_id) if last_event_id else None
+    except ValueError:
+        last_event_id = None
+
+    keepalive = current_app.config.get('EVENTS_KEEPALIVE_SECONDS', 15)
+    max_seconds = current_app.config.get('EVENTS_MAX_STREAM_SECONDS', 300)
+    max_queue = current_app.config.get('EVENTS_CLIENT_QUEUE', 100)
+    max_connections = current_app.config.get('EVENTS_MAX_CONNECTIONS', 8)
+
+    subscription = hub.subscribe(
+        topics, user_id=user_id, last_event_id=last_event_id, max_queue=max_queue,
+        max_subscribers=max_connections
+    )
+    if subscription is None:
+        return jsonify({'error': 'Too many open event streams, retry later'}), 503, {'Retry-After': '5'}
+
+    def generate():
+        deadline = time.monotonic() + max_seconds
+        try:
+            yield "retry: 3000\n\n"
+            while time.monotonic() < deadline:
+                try:
+                    envelope = subscription.queue.get(timeout=keepalive)
+                except queue.Empty:
+                    yield ": keepalive\n\n"
+                    continue
+                yield format_sse(envelope)
+        finally:
+            hub.unsubscribe(subscription)
+
+    response = Response(generate(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'  # Nginx must not buffer the stream
+    })
+    # Also runs when the client goes away before the generator starts
+    response.call_on_close(lambda: hub.unsubscribe(subscription))
+    return response
@@ -3,6 +3,7 @@ from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.extensions import db
 from app.models.favorite import Favorite
 from app.models.radio import Radio
+from app.utils.counters import adjust_counter
 
 bp = Blueprint('favorites', __name__, url_prefix='/api')
 
@@ -13,11 +14,13 @@ def get_favorites():
     """Get user's favorite radio sessions"""
     user_id = int(get_jwt_identity())
     
-    favorites = Favorite.query.filter_by(user_id=user_id).all()
-    radios = [Radio.query.get(fav.radio_id) for fav in favorites]
-    radios = [r for r in radios if r is not None]  # Filter out deleted radios
+    # Join instead of one lookup per favorite; deleted radios drop out naturally
+    radios = Radio.query.join(Favorite, Favorite.radio_id == Radio.id)\
+        .filter(Favorite.user_id == user_id)\
+        .order_by(Favorite.id.asc())\
+        .all()
     
-    return jsonify([radio.to_dict(user_id=user_id) for radio in radios]), 200
+    return jsonify(Radio.to_dict_many(radios, user_id=user_id)), 200
 
 
 @bp.route('/radios/<int:radio_id>/favorite', methods=['POST'])
@@ -37,6 +40,7 @@ def add_favorite(radio_id):
     
     favorite = Favorite(user_id=user_id, radio_id=radio_id)
     db.session.add(favorite)
+    adjust_counter(Radio, radio_id, 'favorites_count', 1)
     db.session.commit()
     
     return jsonify({
@@ -56,6 +60,7 @@ def remove_favorite(radio_id):
         return jsonify({'error': 'Not in favorites'}), 404
     
     db.session.delete(favorite)
+    adjust_counter(Radio, radio_id, 'favorites_count', -1)
     db.session.commit()
     
     return jsonify({'message': 'Removed from favorites'}), 200
@@ -75,6 +80,7 @@ def toggle_favorite(radio_id):
     
     if existing:
         db.session.delete(existing)
+        adjust_counter(Radio, radio_id, 'favorites_count', -1)
         db.session.commit()
         return jsonify({
             'message': 'Removed from favorites',
@@ -83,6 +89,7 @@ def toggle_favorite(radio_id):
     else:
         favorite = Favorite(user_id=user_id, radio_id=radio_id)
         db.session.add(favorite)
+        adjust_counter(Radio, radio_id, 'favorites_count', 1)
         db.session.commit()
         return jsonify({
             'message': 'Added to favorites',
@@ -0,0 +1,193 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from flask import Blueprint, current_app, jsonify, request
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from app.extensions import db
+from app.models.banner import Banner
+from app.models.marquee import Marquee
+from app.models.update import Update
+from app.models.placement import Placement
+from app.models.content_version import ContentVersion
+from app.utils.cache import cache
+from app.utils.stream_state import stream_state
+from app.utils.metrics import registry
+
+bp = Blueprint('home', __name__, url_prefix='/api/home')
+
+SECTION_SECONDS = registry.histogram(
+    'campuswave_home_section_seconds', 'Time to build one /api/home section')
+SECTION_ERRORS = registry.counter(
+    'campuswave_home_section_errors_total', 'Failed or timed out /api/home sections')
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor(app):
+    """Process-wide pool shared by all /api/home requests"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=app.config.get('HOME_SECTION_WORKERS', 4),
+                thread_name_prefix='HomeSection'
+            )
+        return _executor
+
+
+def _cached(key, loader, ttl, version=None):
+    """cache.get_or_set that can also cache an empty (None) section"""
+    if version is not None:
+        return cache.get_or_set(key, loader, ttl, version=version)
+    return cache.get_or_set(key, lambda: {'value': loader()}, ttl)['value']
+
+
+def _banners(user_id):
+    version, _ = ContentVersion.get('banners')
+    return _cached('home:banners', lambda: [
+        banner.to_dict() for banner in Banner.query.filter_by(is_active=True)
+        .order_by(Banner.order.asc(), Banner.created_at.desc()).all()
+    ], ttl=300, version=version)
+
+
+def _marquee(user_id):
+    def load():
+        marquee = Marquee.query.filter_by(is_active=True).first()
+        return marquee.to_dict() if marquee else None
+
+    version, _ = ContentVersion.get('marquees')
+    return _cached('home:marquee', load, ttl=300, version=version)
+
+
+def _live_stream(user_id):
+    # Versioned per-process snapshot plus the live listener count
+    return stream_state.payload()
+
+
+def _live_radios(user_id):
+    from app.routes.radios import live_radios_payload
+    return live_radios_payload()
+
+
+def _upcoming_radios(user_id):
+    from app.routes.radios import upcoming_radios_payload
+    return upcoming_radios_payload(user_id)
+
+
+def _updates(user_id):
+    def load():
+        updates = Update.query.order_by(Update.is_pinned.desc(), Update.created_at.desc())\
+            .limit(current_app.config.get('HOME_UPDATES_LIMIT', 10)).all()
+        return Update.to_dict_many(updates, current_user_id=user_id)
+
+    # Like/reaction state is per user, so only the anonymous feed is shared
+    if user_id:
+        return load()
+    return _cached('home:updates', load, ttl=15)
+
+
+def _placements(user_id):
+    return _cached('home:placements', lambda: [
+        placement.to_dict() for placement in Placement.query.order_by(Placement.created_at.desc())
+        .limit(current_app.config.get('HOME_PLACEMENTS_LIMIT', 10)).all()
+    ], ttl=120)
+
+
+# Section name -> builder(user_id)
+SECTIONS = {
+    'banners': _banners,
+    'marquee': _marquee,
+    'live_stream': _live_stream,
+    'live_radios': _live_radios,
+    'upcoming_radios': _upcoming_radios,
+    'updates': _updates,
+    'placements': _placements,
+}
+
+# Sections that query the database per user; these run in the pool, each in its
+# own app context and DB session. The rest are a version probe plus a cache hit
+# and are built in the request thread while the pooled ones run.
+POOLED_SECTIONS = {'upcoming_radios', 'updates'}
+
+
+def _timed(name, builder, user_id):
+    started = time.perf_counter()
+    try:
+        return builder(user_id)
+    finally:
+        SECTION_SECONDS.observe(time.perf_counter() - started, section=name)
+
+
+def _build_section(app, name, builder, user_id):
+    with app.app_context():
+        return _timed(name, builder, user_id)
+
+
+@bp.route('', methods=['GET'])
+@jwt_required(optional=True)
+def get_home():
+    """Everything the home screen shows, in one response
+
+    Query params:
+        sections: Comma-separated subset of sections (default: all)
+
+    Database-heavy sections are built concurrently. A section that fails or
+    takes longer than HOME_SECTION_TIMEOUT is returned as null and listed in
+    'errors'; the rest of the response is unaffected.
+    """
+    user_id = get_jwt_identity()
+    user_id = int(user_id) if user_id else None
+
+    names = list(SECTIONS)
+    if request.args.get('sections'):
+        names = [name.strip() for name in request.args['sections'].split(',') if name.strip()]
+        unknown = [name for name in names if name not in SECTIONS]
+        if unknown:
+            return jsonify({'error': f"Unknown section(s): {', '.join(unknown)}"}), 400
+
+    app = current_app._get_current_object()
+    deadline = time.monotonic() + app.config.get('HOME_SECTION_TIMEOUT', 5)
+    pooled = [name for name in names if name in POOLED_SECTIONS]
+    futures = {}
+    if pooled:
+        executor = _get_executor(app)
+        futures = {
+            name: executor.submit(_build_section, app, name, SECTIONS[name], user_id)
+            for name in pooled
+        }
+
+    sections = {}
+    errors = {}
+    for name in names:
+        if name in futures:
+            continue
+        try:
+            sections[name] = _timed(name, SECTIONS[name], user_id)
+        except Exception as e:
+            db.session.rollback()
+            print(f"[HOME] Section '{name}' failed: {str(e)}")
+            sections[name] = None
+            errors[name] = 'Unavailable'
+            SECTION_ERRORS.inc(section=name)
+
+    wait(futures.values(), timeout=max(deadline - time.monotonic(), 0))
+    for name, future in futures.items():
+        if not future.done():
+            # Drops it if still queued; a running builder cannot be interrupted
+            future.cancel()
+            sections[name] = None
+            errors[name] = 'Timed out'
+        elif future.exception() is not None:
+            print(f"[HOME] Section '{name}' failed: {future.exception()}")
+            sections[name] = None
+            errors[name] = 'Unavailable'
+        else:
+            sections[name] = future.result()
+            continue
+        SECTION_ERRORS.inc(section=name)
+
+    return jsonify({
+        'sections': sections,
+        'errors': errors
+    }), 200
@@ -12,6 +12,10 @@ from app.extensions import db
 from app.models.live_podcast import LivePodcast, PodcastStatus
 from app.models.user import User, UserRole
 from app.middleware.auth import admin_required
+from app.utils.pagination import keyset_paginate, InvalidCursor
+from app.utils.loaders import user_loader
+from app.utils.events import publish_on_commit, LIVE_TOPIC
+from app.utils.presence import presence, podcast_channel
 
 bp = Blueprint('live_podcasts', __name__, url_prefix='/api/live-podcasts')
 
@@ -102,6 +106,7 @@ def start_podcast(current_user_id, podcast_id):
     # Generate stream URL (in production, this would be a real WebRTC/HLS URL)
     # For now, using a placeholder
     podcast.stream_url = f'/api/live-podcasts/{podcast_id}/stream'
+    publish_on_commit(LIVE_TOPIC, 'podcast.status', podcast.to_dict())
     
     db.session.commit()
     
@@ -129,6 +134,8 @@ def stop_podcast(current_user_id, podcast_id):
     # Stop the podcast
     podcast.status = PodcastStatus.ENDED
     podcast.end_time = datetime.utcnow()
+    presence.end_channel(podcast_channel(podcast_id))
+    publish_on_commit(LIVE_TOPIC, 'podcast.status', podcast.to_dict())
     
     db.session.commit()
     
@@ -155,6 +162,32 @@ def get_current_podcast():
     }), 200
 
 
+@bp.route('/<int:podcast_id>/heartbeat', methods=['POST'])
+@jwt_required(optional=True)
+def podcast_heartbeat(podcast_id):
+    """Heartbeat from a listener of a live podcast (public)"""
+    import uuid
+    
+    podcast = db.session.get(LivePodcast, podcast_id)
+    
+    if not podcast:
+        return jsonify({'error': 'Podcast not found'}), 404
+    
+    if podcast.status != PodcastStatus.LIVE:
+        return jsonify({'error': 'Podcast is not live'}), 400
+    
+    session_id = (request.get_json(silent=True) or {}).get('session_id') or str(uuid.uuid4())
+    identity = get_jwt_identity()
+    
+    channel = podcast_channel(podcast_id)
+    presence.heartbeat(session_id, user_id=int(identity) if identity else None, channel=channel)
+    
+    return jsonify({
+        'session_id': session_id,
+        'listener_count': presence.listener_count(channel)
+    }), 200
+
+
 @bp.route('', methods=['GET'])
 @jwt_required()
 def get_podcasts():
@@ -183,10 +216,31 @@ def get_podcasts():
         except KeyError:
             return jsonify({'error': 'Invalid status value'}), 400
     
+    # Keyset pagination (opt-in with ?cursor=, empty for the first page)
+    cursor = request.args.get('cursor', type=str)
+    if cursor is not None:
+        try:
+            page_data = keyset_paginate(
+                query,
+                [(LivePodcast.created_at, True, None), (LivePodcast.id, True, None)],
+                cursor=cursor,
+                limit=limit,
+                with_total=request.args.get('include_total', 'false').lower() == 'true'
+            )
+        except InvalidCursor:
+            return jsonify({'error': 'Invalid cursor'}), 400
+        
+        user_loader().prime(p.admin_id for p in page_data.items)
+        return jsonify({
+            'podcasts': [p.to_dict() for p in page_data.items],
+            **page_data.meta()
+        }), 200
+    
     pagination = query.order_by(LivePodcast.created_at.desc()).paginate(
         page=page, per_page=limit, error_out=False
     )
     
+    user_loader().prime(p.admin_id for p in pagination.items)
     return jsonify({
         'podcasts': [p.to_dict() for p in pagination.items],
         'total': pagination.total,
@@ -1,24 +1,57 @@
-from flask import Blueprint, request, jsonify
-from datetime import datetime, timezone
+from flask import Blueprint, g, request, jsonify
+from datetime import datetime, timedelta, timezone
 from app.extensions import db
 from app.models.live_stream import LiveStream
 from app.models.live_queue import LiveQueue
 from app.models.radio import Radio
+from app.models.content_version import ContentVersion
 from app.middleware.auth import admin_required
+from app.middleware.conditional import conditional_response
+from app.utils.events import publish_live_stream, publish_queue_changed
+from app.utils.presence import presence, podcast_channel, STREAM_CHANNEL
+from app.utils.stream_state import stream_state, bump_live_stream_version
 
 bp = Blueprint('live_stream', __name__, url_prefix='/api/live-stream')
 
+def _live_stream_snapshot():
+    """stream_state.get(), probed once per request"""
+    snapshot = g.get('_live_stream_snapshot')
+    if snapshot is None:
+        snapshot = g._live_stream_snapshot = stream_state.get()
+    return snapshot
+
+def _live_stream_stamp():
+    version, snapshot = _live_stream_snapshot()
+    if not snapshot:
+        return None
+    
+    # listener_count is part of the body, so it has to be part of the version
+    listener_count = presence.listener_count() if snapshot['status'] == 'ONLINE' else 0
+    return (version, listener_count), None
+
+def _queue_stamp():
+    version, changed_at = ContentVersion.get('live_queue')
+    
+    # Queue items embed radio title/media/duration, so radio edits count too
+    radio_changed_at = db.session.query(db.func.max(Radio.updated_at))\
+        .join(LiveQueue, LiveQueue.radio_id == Radio.id).scalar()
+    
+    timestamps = [t for t in (changed_at, radio_changed_at) if t]
+    return (version, radio_changed_at), max(timestamps) if timestamps else None
+
 @bp.route('', methods=['GET'])
+@conditional_response(_live_stream_stamp)
 def get_live_stream_status():
     """Get current live stream status and config"""
-    stream = LiveStream.query.first()
-    if not stream:
+    _, snapshot = _live_stream_snapshot()
+    if not snapshot:
         # Emergency initialization if seed wasn't run
         stream = LiveStream()
         db.session.add(stream)
+        bump_live_stream_version()
         db.session.commit()
     
-    return jsonify(stream.to_dict())
+    return jsonify(stream_state.payload(snapshot))
 
 @bp.route('/toggle', methods=['POST'])
 @admin_required
@@ -41,8 +74,10 @@ def toggle_live_stream():
         stream.started_at = None
         stream.current_audio_id = None
         
+    bump_live_stream_version()
+    publish_live_stream(stream)
     db.session.commit()
-    return jsonify(stream.to_dict())
+    return jsonify(stream_state.payload())
 
 @bp.route('/config', methods=['PUT'])
 @admin_required
@@ -56,10 +91,13 @@ def update_live_stream_config():
     stream.title = data.get('title', stream.title)
     stream.description = data.get('description', stream.description)
     
+    bump_live_stream_version()
+    publish_live_stream(stream)
     db.session.commit()
-    return jsonify(stream.to_dict())
+    return jsonify(stream_state.payload())
 
 @bp.route('/queue', methods=['GET'])
+@conditional_response(_queue_stamp)
 def get_queue():
     """Get current live stream queue"""
     items = LiveQueue.query.order_by(LiveQueue.position.asc()).all()
@@ -85,6 +123,8 @@ def add_to_queue():
     
     item = LiveQueue(radio_id=radio_id, position=next_pos)
     db.session.add(item)
+    ContentVersion.bump('live_queue')
+    publish_queue_changed()
     db.session.commit()
     
     return jsonify(item.to_dict()), 201
@@ -98,6 +138,8 @@ def remove_from_queue(item_id):
         return jsonify({'message': 'Queue item not found'}), 404
         
     db.session.delete(item)
+    ContentVersion.bump('live_queue')
+    publish_queue_changed()
     db.session.commit()
     
     return jsonify({'message': 'Item removed from queue'})
@@ -115,6 +157,8 @@ def reorder_queue():
         if item:
             item.position = entry.get('position', 0)
             
+    ContentVersion.bump('live_queue')
+    publish_queue_changed()
     db.session.commit()
     return jsonify({'message': 'Queue reordered'})
 
@@ -142,8 +186,10 @@ def skip_to_next():
         
     if next_item:
         stream.current_audio_id = next_item.radio_id
+        bump_live_stream_version()
+        publish_live_stream(stream)
         db.session.commit()
-        return jsonify(stream.to_dict())
+        return jsonify(stream_state.payload())
     else:
         return jsonify({'message': 'Queue is empty'}), 400
 
@@ -331,6 +377,8 @@ def upload_to_queue():
             
             queue_item = LiveQueue(radio_id=radio.id, position=next_pos)
             db.session.add(queue_item)
+            ContentVersion.bump('live_queue')
+            publish_queue_changed()
             
             db.session.commit()
             current_app.logger.info(f"Database records created: Radio ID={radio.id}, Queue ID={queue_item.id}")
@@ -375,7 +423,6 @@ def upload_to_queue():
 @bp.route('/heartbeat', methods=['POST'])
 def listener_heartbeat():
     """Send heartbeat to indicate listener is active"""
-    from app.models.radio_listener import RadioListener
     from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
     import uuid
     
@@ -396,57 +443,123 @@ def listener_heartbeat():
     except:
         pass
     
-    # Get or create listener entry
-    listener = RadioListener.query.filter_by(session_id=session_id).first()
-    if not listener:
-        listener = RadioListener(
-            session_id=session_id,
-            user_id=user_id,
-            ip_address=request.remote_addr,
-            device_info=request.headers.get('User-Agent', '')[:255]
-        )
-        db.session.add(listener)
-    else:
-        listener.last_heartbeat = datetime.now()
-        if user_id and not listener.user_id:
-            listener.user_id = user_id
-    
-    db.session.commit()
+    # In-memory presence; radio_listeners is written in periodic batches
+    presence.heartbeat(
+        session_id,
+        user_id=user_id,
+        ip_address=request.remote_addr,
+        device_info=request.headers.get('User-Agent', '')[:255]
+    )
     
     # Get current stream info
-    stream = LiveStream.query.first()
-    listener_count = RadioListener.get_active_count()
+    _, stream = stream_state.get()
+    listener_count = presence.listener_count()
     
     return jsonify({
         'session_id': session_id,
         'listener_count': listener_count,
-        'stream_status': stream.status if stream else 'OFFLINE',
-        'current_audio_id': stream.current_audio_id if stream else None
+        'stream_status': stream['status'] if stream else 'OFFLINE',
+        'current_audio_id': stream['current_audio_id'] if stream else None
     })
 
 
 @bp.route('/listeners', methods=['GET'])
 def get_listener_count():
     """Get current listener count"""
-    from app.models.radio_listener import RadioListener
+    return jsonify({
+        'count': presence.listener_count(),
+        'active_timeout_minutes': presence.timeout_minutes
+    })
+
+
+# resolution -> default window when 'from' is not given
+HISTORY_WINDOWS = {
+    'minute': timedelta(hours=3),
+    'hour': timedelta(days=7),
+    'day': timedelta(days=90)
+}
+
+
+def _parse_time(value, default):
+    """ISO 8601 query param as naive UTC; raises ValueError"""
+    if not value:
+        return default
+    moment = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if moment.tzinfo:
+        moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return moment
+
+
+@bp.route('/listeners/history', methods=['GET'])
+@admin_required
+def get_listener_history():
+    """Concurrent listener history (admin only)
+
+    Query params:
+        podcast_id: Live podcast to report on (default: the 24/7 stream)
+        resolution: minute, hour or day (default: minute)
+        from, to: ISO 8601 UTC bounds (default: a window ending now)
+
+    Minute points come from the recent per-minute series; hour and day
+    points are rollups with average, peak and low.
+    """
+    from app.models.listener_stats import ListenerSeries, ListenerRollup
     
-    count = RadioListener.get_active_count()
+    resolution = request.args.get('resolution', 'minute')
+    if resolution not in HISTORY_WINDOWS:
+        return jsonify({'error': 'resolution must be minute, hour or day'}), 400
+    
+    podcast_id = request.args.get('podcast_id', type=int)
+    channel = podcast_channel(podcast_id) if podcast_id else STREAM_CHANNEL
+    
+    try:
+        end = _parse_time(request.args.get('to'), datetime.utcnow())
+        start = _parse_time(request.args.get('from'), end - HISTORY_WINDOWS[resolution])
+    except ValueError:
+        return jsonify({'error': 'from and to must be ISO 8601 timestamps'}), 400
+    if start > end:
+        return jsonify({'error': 'from must be before to'}), 400
+    
+    if resolution == 'minute':
+        epoch = datetime(1970, 1, 1)
+        series = db.session.get(ListenerSeries, channel)
+        points = [
+            {'t': (epoch + timedelta(minutes=minute)).isoformat(), 'listeners': value}
+            for minute, value in (series.ring().range(
+                int((start - epoch).total_seconds() // 60), int((end - epoch).total_seconds() // 60)
+            ) if series else [])
+        ]
+    else:
+        period = ListenerRollup.HOUR if resolution == 'hour' else ListenerRollup.DAY
+        points = [rollup.to_dict() for rollup in ListenerRollup.query.filter(
+            ListenerRollup.channel == channel,
+            ListenerRollup.period == period,
+            ListenerRollup.bucket_start >= ListenerRollup.bucket_for(period, start),
+            ListenerRollup.bucket_start <= end
+        ).order_by(ListenerRollup.bucket_start).all()]
     
     return jsonify({
-        'count': count,
-        'active_timeout_minutes': 5
-    })
+        'channel': channel,
+        'resolution': resolution,
+        'from': start.isoformat(),
+        'to': end.isoformat(),
+        'points': points
+    }), 200
 
 
 @bp.route('/listeners/cleanup', methods=['POST'])
 @admin_required
 def cleanup_stale_listeners():
-    """Manually cleanup stale listener entries"""
-    from app.models.radio_listener import RadioListener
+    """Manually cleanup stale listener entries (also done by the scheduler)"""
+    from flask import current_app
+    from app.utils.presence import reap_stale_listeners
     
-    removed = RadioListener.cleanup_stale()
+    removed = reap_stale_listeners(
+        batch_size=current_app.config.get('LISTENER_REAP_BATCH_SIZE', 1000),
+        archive=current_app.config.get('LISTENER_ARCHIVE_SESSIONS', True)
+    )
     
     return jsonify({
         'message': f'Removed {removed} stale listeners',
-        'current_count': RadioListener.get_active_count()
+        'current_count': presence.listener_count()
     })
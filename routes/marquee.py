@@ -1,8 +1,9 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import get_jwt_identity
-from app.models import Marquee
+from app.models import Marquee, ContentVersion
 from app.extensions import db
 from app.middleware.auth import admin_required
+from app.middleware.conditional import conditional_response
 
 marquee_bp = Blueprint('marquee', __name__)
 
@@ -40,6 +41,7 @@ def create_or_update_marquee():
         
         print(f"[MARQUEE] Created marquee object: {marquee.text}")
         db.session.add(marquee)
+        ContentVersion.bump('marquees')
         db.session.commit()
         print(f"[MARQUEE] Successfully saved to database")
         
@@ -52,7 +54,11 @@ def create_or_update_marquee():
         db.session.rollback()
         return jsonify({'error': f'{type(e).__name__}: {str(e)}'}), 500
 
+def _marquees_stamp():
+    return ContentVersion.get('marquees')
+
 @marquee_bp.route('/active', methods=['GET'])
+@conditional_response(_marquees_stamp)
 def get_active_marquee():
     """Get the currently active marquee"""
     try:
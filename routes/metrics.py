@@ -0,0 +1,38 @@
+import hmac
+from flask import Blueprint, Response, current_app, jsonify, request
+from app.middleware.auth import admin_required
+from app.utils.metrics import registry
+
+bp = Blueprint('metrics', __name__, url_prefix='/api/metrics')
+
+
+def _scrape_token_ok():
+    """True if the request carries the configured METRICS_TOKEN as a bearer token"""
+    expected = current_app.config.get('METRICS_TOKEN')
+    if not expected:
+        return False
+    return hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {expected}')
+
+
+def _prometheus_response():
+    return Response(registry.render_prometheus(), mimetype='text/plain; version=0.0.4')
+
+
+@bp.route('', methods=['GET'])
+@admin_required
+def get_metrics():
+    """Get this worker's metrics as JSON (admin only)
+
+    Query params:
+        prefix: Only metrics whose name starts with this, e.g. campuswave_scheduler
+    """
+    prefix = request.args.get('prefix', '')
+    return jsonify({'metrics': registry.snapshot(prefix)}), 200
+
+
+@bp.route('/prometheus', methods=['GET'])
+def get_prometheus_metrics():
+    """Prometheus scrape endpoint (METRICS_TOKEN bearer token or admin JWT)"""
+    if _scrape_token_ok():
+        return _prometheus_response()
+    return admin_required(_prometheus_response)()
@@ -1,12 +1,19 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from datetime import datetime
+from sqlalchemy.exc import IntegrityError
 from app.extensions import db
 from app.models.notification import Notification
-from app.models.global_notification import GlobalNotification, UserNotificationStatus
+from app.models.global_notification import GlobalNotification, UserNotificationStatus, GlobalNotificationReadState
+from app.models.notification_fanout import NotificationFanout
+from app.models.notification_badge import NotificationBadge, BROADCAST_SEQUENCE_KEY
+from app.models.content_version import ContentVersion
 from app.models.user import User, UserRole
 from app.middleware.auth import admin_required
 from app.utils.upload import save_upload, allowed_file
+from app.utils.pagination import keyset_paginate, decode_cursor, InvalidCursor
+from app.utils.loaders import user_loader
+from app.utils.events import publish_on_commit, NOTIFICATIONS_TOPIC
 import os
 
 bp = Blueprint('notifications', __name__, url_prefix='/api/notifications')
@@ -14,8 +21,9 @@ bp = Blueprint('notifications', __name__, url_prefix='/api/notifications')
 
 @bp.route('/broadcast', methods=['POST'])
 @admin_required
-def broadcast_notification(current_user_id):
+def broadcast_notification():
     """Send a global notification to all users (admin only)"""
+    current_user_id = int(get_jwt_identity())
     data = request.get_json()
     
     title = data.get('title', '').strip()
@@ -36,27 +44,32 @@ def broadcast_notification(current_user_id):
         created_by=current_user_id
     )
     
+    # One row reaches every user: visibility and read state come from
+    # per-user watermarks, not per-user status rows
     db.session.add(global_notif)
+    ContentVersion.bump(BROADCAST_SEQUENCE_KEY)  # +1 unread on every badge
+    db.session.flush()
+    publish_on_commit(NOTIFICATIONS_TOPIC, 'notification.global', global_notif.to_dict())
     db.session.commit()
     
-    # Create status entries for all users
-    all_users = User.query.all()
-    for user in all_users:
-        status = UserNotificationStatus(
-            notification_id=global_notif.id,
-            user_id=user.id,
-            is_read=False
-        )
-        db.session.add(status)
-    
-    db.session.commit()
-    
+    # No per-user work (not even a count): every account sees it via its watermark
     return jsonify({
-        'message': f'Notification broadcast to {len(all_users)} users',
+        'message': 'Notification broadcast to all users',
         'notification': global_notif.to_dict(current_user_id)
     }), 201
 
 
+@bp.route('/fanouts/<int:fanout_id>', methods=['GET'])
+@admin_required
+def get_fanout_progress(fanout_id):
+    """Get delivery progress of a bulk notification job (admin only)"""
+    fanout = NotificationFanout.query.get(fanout_id)
+    if not fanout:
+        return jsonify({'error': 'Fan-out job not found'}), 404
+    
+    return jsonify(fanout.to_dict()), 200
+
+
 @bp.route('/upload-image', methods=['POST'])
 @admin_required
 def upload_notification_image(current_user_id):
@@ -85,56 +98,151 @@ def upload_notification_image(current_user_id):
         return jsonify({'error': f'Upload failed: {str(e)}'}), 500
 
 
+def _notification_stream(user_id, limit, after=None):
+    """Personal and visible global notifications as one UNION ALL subquery
+    of (id, created_at, source) rows, so merging and paging happen in SQL.
+    
+    Each branch seeks past after, the (created_at, source, id) key of the
+    last row already returned, and keeps only its newest limit rows before
+    the union, so a page never reads the user's whole history.
+    """
+    branches = []
+    for source, model, criterion in (
+        ('personal', Notification, Notification.user_id == user_id),
+        ('global', GlobalNotification, GlobalNotification.visible_to(user_id))
+    ):
+        branch = db.select(
+            model.id,
+            model.created_at,
+            db.literal(source, type_=db.String(10)).label('source')
+        ).where(criterion)
+        
+        if after is not None:
+            created_at, after_source, after_id = after
+            # Ties on created_at are ordered by source, then id (all descending)
+            if source == after_source:
+                tie = model.id < after_id
+            else:
+                tie = db.true() if source < after_source else db.false()
+            branch = branch.where(db.or_(
+                model.created_at < created_at,
+                db.and_(model.created_at == created_at, tie)
+            ))
+        
+        branch = branch.order_by(model.created_at.desc(), model.id.desc()).limit(limit)
+        # Wrapped so the per-branch ORDER BY/LIMIT is valid inside UNION ALL on every backend
+        branches.append(db.select(branch.subquery()))
+    
+    return db.union_all(*branches).subquery('notification_stream')
+
+
+def _decode_stream_cursor(cursor):
+    """(created_at, source, id) from a notifications cursor; raises InvalidCursor"""
+    created_at, source, notification_id = decode_cursor(cursor, 3)
+    if not isinstance(created_at, datetime) or source not in ('personal', 'global') \
+            or not isinstance(notification_id, int):
+        raise InvalidCursor('Invalid cursor')
+    return created_at, source, notification_id
+
+
+def _count_notifications(user_id):
+    """Total of both streams from two index-only counts (no union, no sort)"""
+    personal = db.session.query(db.func.count(Notification.id))\
+        .filter(Notification.user_id == user_id).scalar()
+    global_ = db.session.query(db.func.count(GlobalNotification.id))\
+        .filter(GlobalNotification.visible_to(user_id)).scalar()
+    return personal + global_
+
+
+def _serialize_stream(user_id, rows):
+    """Load one page of (id, created_at, source) rows, preserving their order"""
+    personal_ids = [row.id for row in rows if row.source == 'personal']
+    global_ids = [row.id for row in rows if row.source == 'global']
+    
+    personal = {n.id: n for n in Notification.query.filter(Notification.id.in_(personal_ids))} if personal_ids else {}
+    globals_ = {n.id: n for n in GlobalNotification.query.filter(GlobalNotification.id.in_(global_ids))} if global_ids else {}
+    read_states = GlobalNotification.read_states(user_id, global_ids)
+    user_loader().prime(n.created_by for n in globals_.values())
+    
+    notifications = []
+    for row in rows:
+        if row.source == 'personal':
+            notif_dict = personal[row.id].to_dict()
+            notif_dict['type'] = 'PERSONAL'
+            notif_dict['notification_type'] = 'personal'  # For client compatibility
+        else:
+            notif_dict = globals_[row.id].to_dict(user_id, read_state=read_states[row.id])
+            notif_dict['notification_type'] = 'global'  # For client compatibility
+        notifications.append(notif_dict)
+    return notifications
+
+
 @bp.route('', methods=['GET'])
 @jwt_required()
 def get_notifications():
-    """Get user notifications (both personal and global)"""
+    """Get user notifications (both personal and global), newest first"""
     user_id = int(get_jwt_identity())
     page = request.args.get('page', 1, type=int)
     limit = request.args.get('limit', 20, type=int)
     
-    # Get personal notifications
-    personal_notifs = Notification.query.filter_by(user_id=user_id)\
-        .order_by(Notification.created_at.desc())\
-        .all()
-    
-    # Get global notifications for this user
-    global_notifs_query = db.session.query(GlobalNotification)\
-        .join(UserNotificationStatus, GlobalNotification.id == UserNotificationStatus.notification_id)\
-        .filter(UserNotificationStatus.user_id == user_id)\
-        .order_by(GlobalNotification.created_at.desc())\
-        .all()
-    
-    # Combine and sort by created_at
-    all_notifications = []
-    
-    for notif in personal_notifs:
-        notif_dict = notif.to_dict()
-        notif_dict['type'] = 'PERSONAL'
-        notif_dict['notification_type'] = 'personal'  # For client compatibility
-        all_notifications.append(notif_dict)
-    
-    for notif in global_notifs_query:
-        notif_dict = notif.to_dict(user_id)
-        notif_dict['notification_type'] = 'global'  # For client compatibility
-        all_notifications.append(notif_dict)
-    
-    # Sort by created_at descending
-    all_notifications.sort(key=lambda x: x['created_at'], reverse=True)
+    # Keyset pagination (opt-in with ?cursor=, empty for the first page)
+    cursor = request.args.get('cursor', type=str)
+    if cursor is not None:
+        limit = max(limit, 1)
+        try:
+            after = _decode_stream_cursor(cursor) if cursor else None
+        except InvalidCursor:
+            return jsonify({'error': 'Invalid cursor'}), 400
+        
+        # The seek is already applied inside each branch
+        stream = _notification_stream(user_id, limit + 1, after=after)
+        query = db.session.query(stream.c.id, stream.c.created_at, stream.c.source)
+        page_data = keyset_paginate(query, [
+            (stream.c.created_at, True, None),
+            (stream.c.source, True, None),
+            (stream.c.id, True, None)
+        ], limit=limit)
+        
+        if request.args.get('include_total', 'false').lower() == 'true':
+            page_data.total = _count_notifications(user_id)
+        
+        return jsonify({
+            'notifications': _serialize_stream(user_id, page_data.items),
+            **page_data.meta()
+        }), 200
     
-    # Manual pagination
-    start = (page - 1) * limit
-    end = start + limit
-    paginated = all_notifications[start:end]
+    page = max(page, 1)
+    limit = max(limit, 1)
+    # Neither branch can contribute more than the rows up to the end of this page
+    stream = _notification_stream(user_id, page * limit)
+    rows = db.session.query(stream.c.id, stream.c.created_at, stream.c.source)\
+        .order_by(stream.c.created_at.desc(), stream.c.source.desc(), stream.c.id.desc())\
+        .offset((page - 1) * limit).limit(limit).all()
+    total = _count_notifications(user_id)
     
     return jsonify({
-        'notifications': paginated,
-        'total': len(all_notifications),
+        'notifications': _serialize_stream(user_id, rows),
+        'total': total,
         'page': page,
-        'pages': (len(all_notifications) + limit - 1) // limit
+        'pages': (total + limit - 1) // limit
     }), 200
 
 
+@bp.route('/unread-count', methods=['GET'])
+@jwt_required()
+def get_unread_count():
+    """Get the unread badge count (personal + global)"""
+    user_id = int(get_jwt_identity())
+    
+    count = NotificationBadge.unread_count(user_id)
+    if count is None:
+        # First read for this user: build the counter from the source tables
+        NotificationBadge.reconcile(user_id)
+        count = NotificationBadge.unread_count(user_id) or 0
+    
+    return jsonify({'unread_count': count}), 200
+
+
 @bp.route('/<int:notification_id>/read', methods=['PUT'])
 @jwt_required()
 def mark_as_read(notification_id):
@@ -144,22 +252,45 @@ def mark_as_read(notification_id):
     # Check if it's a personal notification
     notification = Notification.query.get(notification_id)
     if notification and notification.user_id == user_id:
-        notification.is_read = True
+        # Conditional so that of two concurrent reads only one lowers the badge
+        changed = Notification.query.filter_by(id=notification_id, is_read=False)\
+            .update({Notification.is_read: True}, synchronize_session=False)
+        if changed:
+            NotificationBadge.add_personal([user_id], -1)
         db.session.commit()
         return jsonify(notification.to_dict()), 200
     
     # Check if it's a global notification
-    status = UserNotificationStatus.query.filter_by(
-        notification_id=notification_id,
-        user_id=user_id
+    global_notif = GlobalNotification.query.filter(
+        GlobalNotification.id == notification_id,
+        GlobalNotification.visible_to(user_id)
     ).first()
     
-    if status:
-        status.is_read = True
-        status.read_at = datetime.utcnow()
-        db.session.commit()
+    if global_notif:
+        is_read, _ = GlobalNotification.read_states(user_id, [notification_id])[notification_id]
+        if not is_read:
+            # Record the individual read (sparse; read-all moves the watermark instead).
+            # Only the request that actually flips the row lowers the badge.
+            now = datetime.utcnow()
+            changed = UserNotificationStatus.query.filter_by(
+                notification_id=notification_id,
+                user_id=user_id,
+                is_read=False
+            ).update({UserNotificationStatus.is_read: True, UserNotificationStatus.read_at: now},
+                     synchronize_session=False)
+            if not changed:
+                try:
+                    with db.session.begin_nested():
+                        db.session.add(UserNotificationStatus(
+                            notification_id=notification_id, user_id=user_id, is_read=True, read_at=now
+                        ))
+                    changed = 1
+                except IntegrityError:
+                    pass  # Already read, or a concurrent request recorded it first
+            if changed:
+                NotificationBadge.broadcast_read(user_id)
+            db.session.commit()
         
-        global_notif = GlobalNotification.query.get(notification_id)
         return jsonify(global_notif.to_dict(user_id)), 200
     
     return jsonify({'error': 'Notification not found'}), 404
@@ -176,11 +307,8 @@ def mark_all_as_read():
         .update({Notification.is_read: True})
     
     # Mark all global notifications as read
-    UserNotificationStatus.query.filter_by(user_id=user_id, is_read=False)\
-        .update({
-            UserNotificationStatus.is_read: True,
-            UserNotificationStatus.read_at: datetime.utcnow()
-        })
+    GlobalNotificationReadState.mark_all_read(user_id)
+    NotificationBadge.all_read(user_id)
     
     db.session.commit()
     
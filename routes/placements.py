@@ -5,6 +5,7 @@ from app.models.placement import Placement
 from app.models.user import User, UserRole
 from app.middleware.auth import admin_required
 from app.utils.upload import save_upload, allowed_file, delete_file
+from app.utils.pagination import keyset_paginate, InvalidCursor
 from datetime import datetime
 import os
 
@@ -26,6 +27,25 @@ def get_placements():
     page = request.args.get('page', 1, type=int)
     limit = request.args.get('limit', 20, type=int)
     
+    # Keyset pagination (opt-in with ?cursor=, empty for the first page)
+    cursor = request.args.get('cursor', type=str)
+    if cursor is not None:
+        try:
+            page_data = keyset_paginate(
+                Placement.query,
+                [(Placement.created_at, True, None), (Placement.id, True, None)],
+                cursor=cursor,
+                limit=limit,
+                with_total=request.args.get('include_total', 'false').lower() == 'true'
+            )
+        except InvalidCursor:
+            return jsonify({'error': 'Invalid cursor'}), 400
+        
+        return jsonify({
+            'placements': [placement.to_dict() for placement in page_data.items],
+            **page_data.meta()
+        }), 200
+    
     query = Placement.query.order_by(Placement.created_at.desc())
     
     pagination = query.paginate(page=page, per_page=limit, error_out=False)
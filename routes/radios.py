@@ -5,13 +5,26 @@ from app.extensions import db
 from app.models.radio import Radio, RadioStatus, MediaType, HostStatus
 from app.models.user import User
 from app.models.radio_subscription import RadioSubscription
-from app.models.notification import Notification
+from app.models.notification_fanout import NotificationFanout
 from app.models.favorite import Favorite
+from app.models.content_version import ContentVersion
 from app.middleware.auth import admin_required
+from app.middleware.conditional import conditional_response
 from app.utils.upload import save_upload, allowed_file
+from app.utils.pagination import keyset_paginate, InvalidCursor
+from app.utils.search import build_search
+from app.utils.cache import cache, bump_radio_lists, radio_lists_version, LIVE_RADIOS_KEY, UPCOMING_RADIOS_KEY
+from app.utils.scheduler import wake_scheduler
+from app.utils.fanout import queue_fanout
+from app.utils.notifications import queue_topic_notification, radio_topic
+from app.utils.events import publish_live_stream, publish_radio_status
+from app.utils.stream_state import bump_live_stream_version, bump_if_playing
 
 bp = Blueprint('radios', __name__, url_prefix='/api/radios')
 
+# Always-populated columns that can be used as a keyset pagination sort key
+CURSOR_SORT_COLUMNS = {'start_time', 'end_time', 'created_at', 'title', 'id'}
+
 
 # ==================== Server Time Sync ====================
 
@@ -53,15 +66,12 @@ def get_radios():
     if category_id:
         query = query.filter_by(category_id=category_id)
     
-    # Search by title or description
+    # Search by title or description (FULLTEXT index on MySQL)
+    relevance = None
     if search:
-        search_term = f'%{search}%'
-        query = query.filter(
-            db.or_(
-                Radio.title.ilike(search_term),
-                Radio.description.ilike(search_term)
-            )
-        )
+        criterion, relevance = build_search((Radio.title, Radio.description), search)
+        if criterion is not None:
+            query = query.filter(criterion)
     
     # Date range filter
     if date_from:
@@ -78,9 +88,31 @@ def get_radios():
         except:
             pass
     
-    # Sorting
+    # Keyset pagination (opt-in with ?cursor=, empty for the first page)
+    cursor = request.args.get('cursor', type=str)
+    if cursor is not None:
+        seek_column = getattr(Radio, sort_by) if sort_by in CURSOR_SORT_COLUMNS else Radio.start_time
+        try:
+            page_data = keyset_paginate(
+                query,
+                [(seek_column, sort_order != 'asc', None), (Radio.id, sort_order != 'asc', None)],
+                cursor=cursor,
+                limit=limit,
+                with_total=request.args.get('include_total', 'false').lower() == 'true'
+            )
+        except InvalidCursor:
+            return jsonify({'error': 'Invalid cursor'}), 400
+        
+        return jsonify({
+            'radios': Radio.to_dict_many(page_data.items),
+            **page_data.meta()
+        }), 200
+    
+    # Sorting - best matches first when searching without an explicit sort
     sort_column = getattr(Radio, sort_by, Radio.start_time)
-    if sort_order == 'asc':
+    if relevance is not None and 'sort_by' not in request.args:
+        query = query.order_by(relevance.desc(), sort_column.desc())
+    elif sort_order == 'asc':
         query = query.order_by(sort_column.asc())
     else:
         query = query.order_by(sort_column.desc())
@@ -89,37 +121,52 @@ def get_radios():
     pagination = query.paginate(page=page, per_page=limit, error_out=False)
     
     return jsonify({
-        'radios': [radio.to_dict() for radio in pagination.items],
+        'radios': Radio.to_dict_many(pagination.items),
         'total': pagination.total,
         'page': page,
         'pages': pagination.pages
     }), 200
 
-@bp.route('/live', methods=['GET'])
-def get_live_radios():
-    """Get currently live radios"""
+def _load_live_radios():
     now = datetime.now()  # Use local time to match Android app
     radios = Radio.query.filter(
         Radio.status == RadioStatus.LIVE,
         # Remove strict start_time check so early starts work
         Radio.end_time >= now
     ).all()
-    
-    return jsonify([radio.to_dict() for radio in radios]), 200
+    return Radio.to_dict_many(radios)
 
-@bp.route('/upcoming', methods=['GET'])
-@jwt_required(optional=True)
-def get_upcoming_radios():
-    """Get upcoming radios"""
-    user_id = get_jwt_identity()
-    user_id = int(user_id) if user_id else None
-    
+def _load_upcoming_radios():
     now = datetime.now()  # Use local time to match Android app
     radios = Radio.query.filter(
         Radio.status == RadioStatus.UPCOMING,
         # Allow radios that have started but not yet hosted (late start) to appear
         Radio.end_time > now
     ).order_by(Radio.start_time).all()
+    return Radio.to_dict_many(radios)
+
+def _favorite_counts(radios):
+    """Current favorites_count per radio id. Favorites change too often to
+    invalidate the cached lists, so the count is read per request."""
+    if not radios:
+        return {}
+    return dict(db.session.query(Radio.id, Radio.favorites_count)
+                .filter(Radio.id.in_([r['id'] for r in radios])).all())
+
+def live_radios_payload():
+    """Live radio list from the shared cache, minus radios that ended since"""
+    radios = cache.get_or_set(LIVE_RADIOS_KEY, _load_live_radios, version=radio_lists_version())
+    
+    # Drop entries that ended since the list was cached
+    now = datetime.now()
+    radios = [r for r in radios if datetime.fromisoformat(r['end_time']) >= now]
+    favorite_counts = _favorite_counts(radios)
+    return [dict(r, favorite_count=favorite_counts.get(r['id'], r['favorite_count'])) for r in radios]
+
+def upcoming_radios_payload(user_id=None):
+    """Upcoming radio list from the shared cache with the user's fields added"""
+    # Shared payload only; per-user fields are added below
+    radios = cache.get_or_set(UPCOMING_RADIOS_KEY, _load_upcoming_radios, version=radio_lists_version())
     
     # Get user subscriptions if logged in
     subscribed_ids = set()
@@ -127,19 +174,40 @@ def get_upcoming_radios():
         subscriptions = RadioSubscription.query.filter_by(user_id=user_id).all()
         subscribed_ids = {sub.radio_id for sub in subscriptions}
     
+    favorite_counts = _favorite_counts(radios)
     result = []
     now = datetime.now()
-    for radio in radios:
-        data = radio.to_dict()
-        data['is_subscribed'] = radio.id in subscribed_ids
+    for data in radios:
+        # Drop entries that ended since the list was cached
+        if datetime.fromisoformat(data['end_time']) <= now:
+            continue
+        # Per-user fields go on a copy, never on the cached entry
+        data = dict(data)
+        data['favorite_count'] = favorite_counts.get(data['id'], data['favorite_count'])
+        start_time = datetime.fromisoformat(data['start_time'])
+        data['is_subscribed'] = data['id'] in subscribed_ids
         # Add seconds until start for countdown timer
-        if radio.start_time > now:
-            data['seconds_until_start'] = int((radio.start_time - now).total_seconds())
+        if start_time > now:
+            data['seconds_until_start'] = int((start_time - now).total_seconds())
         else:
             data['seconds_until_start'] = 0
         result.append(data)
     
-    return jsonify(result), 200
+    return result
+
+@bp.route('/live', methods=['GET'])
+def get_live_radios():
+    """Get currently live radios"""
+    return jsonify(live_radios_payload()), 200
+
+@bp.route('/upcoming', methods=['GET'])
+@jwt_required(optional=True)
+def get_upcoming_radios():
+    """Get upcoming radios"""
+    user_id = get_jwt_identity()
+    user_id = int(user_id) if user_id else None
+    
+    return jsonify(upcoming_radios_payload(user_id)), 200
 
 @bp.route('/missed', methods=['GET'])
 def get_missed_radios():
@@ -150,14 +218,34 @@ def get_missed_radios():
     ).order_by(Radio.end_time.desc()).limit(50).all()
     
     # Also update status to COMPLETED if not already
+    changed = False
     for radio in radios:
         if radio.status != RadioStatus.COMPLETED:
             radio.status = RadioStatus.COMPLETED
+            changed = True
+    if changed:
+        bump_radio_lists()
     db.session.commit()
+    if changed:
+        wake_scheduler()
     
-    return jsonify([radio.to_dict() for radio in radios]), 200
+    return jsonify(Radio.to_dict_many(radios)), 200
+
+def _radio_stamp(radio_id):
+    # The embedded category is edited separately, so its version joins the stamp
+    row = db.session.query(
+        Radio.updated_at, Radio.favorites_count, Radio.participants_count, Radio.comments_count,
+        ContentVersion.version
+    ).outerjoin(ContentVersion, ContentVersion.key == 'categories')\
+        .filter(Radio.id == radio_id).first()
+    if not row:
+        return None
+    
+    # Counts change without touching updated_at, so only an ETag is reliable
+    return tuple(row), None
 
 @bp.route('/<int:radio_id>', methods=['GET'])
+@conditional_response(_radio_stamp)
 def get_radio(radio_id):
     """Get single radio session details"""
     radio = Radio.query.get(radio_id)
@@ -198,7 +286,9 @@ def create_radio():
     )
     
     db.session.add(radio)
+    bump_radio_lists()
     db.session.commit()
+    wake_scheduler()
     
     return jsonify(radio.to_dict()), 201
 
@@ -227,8 +317,12 @@ def update_radio(radio_id):
         radio.end_time = datetime.fromisoformat(data['end_time'].replace('Z', '+00:00'))
     if 'status' in data:
         radio.status = RadioStatus[data['status'].upper()]
+        publish_radio_status(radio)
     
+    bump_if_playing(radio.id)
+    bump_radio_lists()
     db.session.commit()
+    wake_scheduler()
     
     return jsonify(radio.to_dict()), 200
 
@@ -252,6 +346,7 @@ def delete_radio(radio_id):
         # Optional tables - wrap in try/pass to be safe, but use raw SQL
         try:
             db.session.execute(db.text('DELETE FROM live_queue WHERE radio_id = :rid'), {'rid': radio_id_val})
+            ContentVersion.bump('live_queue')
         except:
             pass
             
@@ -266,8 +361,11 @@ def delete_radio(radio_id):
             pass
         
         # Now safe to delete radio using RAW SQL
+        bump_if_playing(radio_id_val)
         db.session.execute(db.text('DELETE FROM radios WHERE id = :rid'), {'rid': radio_id_val})
+        bump_radio_lists()
         db.session.commit()
+        wake_scheduler()
         
         return jsonify({'message': 'Radio session deleted successfully'}), 200
     
@@ -303,6 +401,8 @@ def upload_banner(radio_id):
     
     # Update radio
     radio.banner_image = filename
+    bump_if_playing(radio.id)
+    bump_radio_lists()
     db.session.commit()
     
     return jsonify({
@@ -336,7 +436,10 @@ def upload_media(radio_id):
     
     # Update radio
     radio.media_url = f'/uploads/{filename}'
+    bump_if_playing(radio.id)
+    bump_radio_lists()
     db.session.commit()
+    wake_scheduler()
     
     return jsonify({
         'message': 'Media uploaded successfully',
@@ -419,22 +522,25 @@ def start_hosting(radio_id):
     radio.hosted_by = user_id
     radio.stream_started_at = datetime.now()  # Use local time
     
-    db.session.commit()
+    # Notify subscribers (delivered in bulk once this commits)
+    queue_fanout(
+        NotificationFanout.RADIO_SUBSCRIBERS,
+        title=f"Radio Live: {radio.title}",
+        message=f"{radio.title} is now live! Join the {media_type_str.lower()} stream.",
+        type="RADIO_LIVE",
+        related_id=radio.id,
+        audience_id=radio.id
+    )
+    queue_topic_notification(
+        radio_topic(radio.id),
+        title=f"Radio Live: {radio.title}",
+        body=f"{radio.title} is now live! Join the {media_type_str.lower()} stream."
+    )
     
-    # Notify subscribers
-    subscribers = RadioSubscription.query.filter_by(radio_id=radio_id).all()
-    for sub in subscribers:
-        notification = Notification(
-            user_id=sub.user_id,
-            title=f"Radio Live: {radio.title}",
-            message=f"{radio.title} is now live! Join the {media_type_str.lower()} stream.",
-            type="RADIO_LIVE",
-            related_id=radio.id
-        )
-        db.session.add(notification)
-    
-    if subscribers:
-        db.session.commit()
+    publish_radio_status(radio)
+    bump_radio_lists()
+    db.session.commit()
+    wake_scheduler()
     
     # CRITICAL: Update Global LiveStream for Student Player
     from app.models.live_stream import LiveStream
@@ -448,6 +554,8 @@ def start_hosting(radio_id):
     stream.started_at = datetime.now()
     stream.title = radio.title
     stream.description = radio.description
+    bump_live_stream_version()
+    publish_live_stream(stream)
     db.session.commit()
 
     
@@ -470,6 +578,8 @@ def pause_hosting(radio_id):
         return jsonify({'error': 'Radio session is not currently being hosted'}), 400
     
     radio.host_status = HostStatus.PAUSED
+    publish_radio_status(radio)
+    bump_radio_lists()
     db.session.commit()
     
     return jsonify({
@@ -491,6 +601,8 @@ def resume_hosting(radio_id):
         return jsonify({'error': 'Radio session is not paused'}), 400
     
     radio.host_status = HostStatus.HOSTING
+    publish_radio_status(radio)
+    bump_radio_lists()
     db.session.commit()
     
     return jsonify({
@@ -514,8 +626,11 @@ def end_hosting(radio_id):
     radio.status = RadioStatus.COMPLETED
     radio.host_status = HostStatus.ENDED
     radio.end_time = datetime.now()  # Use local time for immediate sync
+    publish_radio_status(radio)
     
+    bump_radio_lists()
     db.session.commit()
+    wake_scheduler()
     
     return jsonify({
         'message': 'Radio session ended successfully',
@@ -563,8 +678,13 @@ def mark_radio_completed(radio_id):
         stream = LiveStream.query.first()
         if stream and stream.current_audio_id == radio.id:
             stream.status = 'OFFLINE'
+            bump_live_stream_version()
+            publish_live_stream(stream)
         
+        publish_radio_status(radio)
+        bump_radio_lists()
         db.session.commit()
+        wake_scheduler()
         
         return jsonify({
             'message': 'Radio marked as completed',
@@ -14,9 +14,18 @@ from app.models.radio import Radio
 from app.models.user import User, UserRole
 from app.middleware.auth import admin_required
 from app.utils.upload import save_upload, allowed_file
+from app.utils.pagination import keyset_paginate, InvalidCursor
+from app.utils.loaders import user_loader
 
 bp = Blueprint('reports', __name__, url_prefix='/api/reports')
 
+# Sort rank for each priority (HIGH first)
+PRIORITY_RANK = {
+    ReportPriority.HIGH: 1,
+    ReportPriority.MEDIUM: 2,
+    ReportPriority.LOW: 3
+}
+
 
 @bp.route('', methods=['POST'])
 @jwt_required()
@@ -173,16 +182,39 @@ def get_reports():
     
     # Order by priority (HIGH first) then by created_at descending
     priority_order = db.case(
-        (Report.priority == ReportPriority.HIGH, 1),
-        (Report.priority == ReportPriority.MEDIUM, 2),
-        (Report.priority == ReportPriority.LOW, 3),
+        *[(Report.priority == priority, rank) for priority, rank in PRIORITY_RANK.items()],
         else_=4
     )
     
+    # Keyset pagination (opt-in with ?cursor=, empty for the first page)
+    cursor = request.args.get('cursor', type=str)
+    if cursor is not None:
+        try:
+            page_data = keyset_paginate(
+                query,
+                [
+                    (priority_order, False, lambda r: PRIORITY_RANK.get(r.priority, 4)),
+                    (Report.created_at, True, None),
+                    (Report.id, True, None)
+                ],
+                cursor=cursor,
+                limit=limit,
+                with_total=request.args.get('include_total', 'false').lower() == 'true'
+            )
+        except InvalidCursor:
+            return jsonify({'error': 'Invalid cursor'}), 400
+        
+        user_loader().prime(r.student_id for r in page_data.items)
+        return jsonify({
+            'reports': [r.to_dict() for r in page_data.items],
+            **page_data.meta()
+        }), 200
+    
     query = query.order_by(priority_order, Report.created_at.desc())
     
     pagination = query.paginate(page=page, per_page=limit, error_out=False)
     
+    user_loader().prime(r.student_id for r in pagination.items)
     return jsonify({
         'reports': [r.to_dict() for r in pagination.items],
         'total': pagination.total,
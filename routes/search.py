@@ -0,0 +1,81 @@
+"""
+API routes for cross-content search.
+
+Searches radios, updates, placements and (for admins) radio suggestions
+through their FULLTEXT indexes and returns ranked results per type.
+"""
+
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from app.models.radio import Radio
+from app.models.update import Update
+from app.models.placement import Placement
+from app.models.radio_suggestion import RadioSuggestion
+from app.models.user import User, UserRole
+from app.utils.search import build_search
+
+bp = Blueprint('search', __name__, url_prefix='/api/search')
+
+# Content type -> (model, columns covered by its FULLTEXT index, admin only)
+SEARCH_TYPES = {
+    'radios': (Radio, (Radio.title, Radio.description), False),
+    'updates': (Update, (Update.title, Update.description), False),
+    'placements': (Placement, (Placement.company_name, Placement.position, Placement.description), False),
+    'suggestions': (RadioSuggestion, (RadioSuggestion.radio_title, RadioSuggestion.description), True)
+}
+
+MAX_LIMIT = 50
+
+
+@bp.route('', methods=['GET'])
+@jwt_required(optional=True)
+def search():
+    """Search all content types, best matches first"""
+    term = request.args.get('q', '', type=str).strip()
+    limit = min(max(request.args.get('limit', 10, type=int), 1), MAX_LIMIT)
+    requested = request.args.get('types', type=str)
+    
+    if not term:
+        return jsonify({'error': 'Search query is required'}), 400
+    
+    types = list(SEARCH_TYPES.keys())
+    if requested:
+        types = [t.strip().lower() for t in requested.split(',') if t.strip().lower() in SEARCH_TYPES]
+        if not types:
+            return jsonify({'error': f'Invalid types. Use: {", ".join(SEARCH_TYPES.keys())}'}), 400
+    
+    current_user_id = get_jwt_identity()
+    user_id = int(current_user_id) if current_user_id else None
+    
+    is_admin = False
+    if user_id:
+        user = User.query.get(user_id)
+        is_admin = user is not None and user.role in [UserRole.ADMIN, UserRole.MAIN_ADMIN]
+    
+    results = {}
+    for content_type in types:
+        model, columns, admin_only = SEARCH_TYPES[content_type]
+        if admin_only and not is_admin:
+            continue
+        
+        criterion, relevance = build_search(columns, term)
+        if criterion is None:
+            results[content_type] = []
+            continue
+        
+        items = model.query.filter(criterion)\
+            .order_by(relevance.desc(), model.id.desc())\
+            .limit(limit)\
+            .all()
+        
+        if model is Radio:
+            results[content_type] = Radio.to_dict_many(items, user_id=user_id)
+        elif model is Update:
+            results[content_type] = Update.to_dict_many(items, current_user_id=user_id)
+        else:
+            results[content_type] = [item.to_dict() for item in items]
+    
+    return jsonify({
+        'query': term,
+        'results': results
+    }), 200
@@ -6,8 +6,11 @@ from app.models.radio_suggestion import RadioSuggestion, SuggestionStatus
 from app.models.radio import Radio, RadioStatus
 from app.models.user import User
 from app.models.notification import Notification
+from app.models.notification_badge import NotificationBadge
+from app.utils.loaders import user_loader
 from app.middleware.auth import admin_required, student_required
 from app.utils.email import send_suggestion_approved_email
+from app.utils.events import publish_on_commit, NOTIFICATIONS_TOPIC
 from app.models.category import Category
 
 bp = Blueprint('suggestions', __name__, url_prefix='/api/suggestions')
@@ -31,10 +34,11 @@ def get_suggestions():
     suggestions = query.order_by(RadioSuggestion.created_at.desc()).all()
     
     # Include student details
+    loader = user_loader().prime(suggestion.suggested_by for suggestion in suggestions)
     result = []
     for suggestion in suggestions:
         data = suggestion.to_dict()
-        student = User.query.get(suggestion.suggested_by)
+        student = loader.get(suggestion.suggested_by)
         if student:
             data['student_name'] = student.name
             data['student_email'] = student.email
@@ -48,10 +52,11 @@ def get_pending_suggestions():
     """Get pending suggestions (admin only)"""
     suggestions = RadioSuggestion.query.filter_by(status=SuggestionStatus.PENDING).all()
     
+    loader = user_loader().prime(suggestion.suggested_by for suggestion in suggestions)
     result = []
     for suggestion in suggestions:
         data = suggestion.to_dict()
-        student = User.query.get(suggestion.suggested_by)
+        student = loader.get(suggestion.suggested_by)
         if student:
             data['student_name'] = student.name
             data['student_email'] = student.email
@@ -135,6 +140,10 @@ def approve_suggestion(suggestion_id):
         related_id=radio.id
     )
     db.session.add(notification)
+    NotificationBadge.add_personal([suggestion.suggested_by])
+    db.session.flush()
+    publish_on_commit(NOTIFICATIONS_TOPIC, 'notification.created', notification.to_dict(),
+                      user_ids=[suggestion.suggested_by])
     
     # Send email notification
     student = User.query.get(suggestion.suggested_by)
@@ -4,11 +4,14 @@ from app.extensions import db
 from app.models.update import Update, UpdateCategory, MediaType
 from app.models.update_comment import UpdateComment
 from app.models.update_like import UpdateLike
-from app.models.update_reaction import UpdateReaction, ALLOWED_EMOJIS
-from app.models.notification import Notification
+from app.models.update_reaction import UpdateReaction, UpdateReactionCount, ALLOWED_EMOJIS
+from app.models.notification_fanout import NotificationFanout
 from app.models.user import User, UserRole
 from app.middleware.auth import admin_required
 from app.utils.upload import save_upload, allowed_file
+from app.utils.pagination import keyset_paginate, InvalidCursor
+from app.utils.fanout import queue_fanout
+from app.utils.engagement import engagement
 
 bp = Blueprint('updates', __name__, url_prefix='/api/updates')
 
@@ -30,18 +33,41 @@ def get_updates():
         except KeyError:
             pass
     
+    # Get current user for like status
+    current_user_id = get_jwt_identity()
+    user_id = int(current_user_id) if current_user_id else None
+    
+    # Keyset pagination (opt-in with ?cursor=, empty for the first page)
+    cursor = request.args.get('cursor', type=str)
+    if cursor is not None:
+        try:
+            page_data = keyset_paginate(
+                query,
+                [
+                    (Update.is_pinned, True, None),
+                    (Update.created_at, True, None),
+                    (Update.id, True, None)
+                ],
+                cursor=cursor,
+                limit=limit,
+                with_total=request.args.get('include_total', 'false').lower() == 'true'
+            )
+        except InvalidCursor:
+            return jsonify({'error': 'Invalid cursor'}), 400
+        
+        return jsonify({
+            'updates': Update.to_dict_many(page_data.items, current_user_id=user_id),
+            **page_data.meta()
+        }), 200
+    
     # Sort by pinned status and then newest first
     query = query.order_by(Update.is_pinned.desc(), Update.created_at.desc())
     
     # Paginate
     pagination = query.paginate(page=page, per_page=limit, error_out=False)
     
-    # Get current user for like status
-    current_user_id = get_jwt_identity()
-    user_id = int(current_user_id) if current_user_id else None
-    
     return jsonify({
-        'updates': [update.to_dict(current_user_id=user_id) for update in pagination.items],
+        'updates': Update.to_dict_many(pagination.items, current_user_id=user_id),
         'total': pagination.total,
         'page': page,
         'pages': pagination.pages
@@ -89,23 +115,26 @@ def create_update():
     )
     
     db.session.add(update)
-    db.session.commit()
+    db.session.flush()
     
-    # Send notifications to all students if requested
+    # Send notifications to all students if requested (delivered in bulk after commit)
+    fanout = None
     if data.get('send_notification', True):
-        students = User.query.filter_by(role=UserRole.STUDENT).all()
-        for student in students:
-            notification = Notification(
-                user_id=student.id,
-                title="New Campus Update! 📢",
-                message=f"New {category.value.lower()} update: {data['title']}",
-                type="UPDATE",
-                related_id=update.id
-            )
-            db.session.add(notification)
-        db.session.commit()
+        fanout = queue_fanout(
+            NotificationFanout.STUDENTS,
+            title="New Campus Update! 📢",
+            message=f"New {category.value.lower()} update: {data['title']}",
+            type="UPDATE",
+            related_id=update.id
+        )
     
-    return jsonify(update.to_dict()), 201
+    db.session.commit()
+    
+    result = update.to_dict()
+    if fanout:
+        result['notification_fanout'] = fanout.to_dict()
+    
+    return jsonify(result), 201
 
 @bp.route('/<int:update_id>', methods=['PUT'])
 @admin_required
@@ -150,6 +179,11 @@ def delete_update(update_id):
     # Delete all related comments
     UpdateComment.query.filter_by(update_id=update_id).delete()
     
+    # Delete all related reactions and their counters
+    UpdateReaction.query.filter_by(update_id=update_id).delete()
+    UpdateReactionCount.query.filter_by(update_id=update_id).delete()
+    engagement.discard_update(update_id)
+    
     # Now delete the update itself
     db.session.delete(update)
     db.session.commit()
@@ -220,30 +254,10 @@ def add_or_change_reaction(update_id):
     if not update:
         return jsonify({'error': 'Update not found'}), 404
     
-    # Check if user already has a reaction
-    existing_reaction = UpdateReaction.query.filter_by(
-        update_id=update_id,
-        user_id=user_id
-    ).first()
-    
-    if existing_reaction:
-        # Change existing reaction
-        existing_reaction.emoji = emoji
-        message = 'Reaction changed successfully'
-    else:
-        # Add new reaction
-        new_reaction = UpdateReaction(
-            update_id=update_id,
-            user_id=user_id,
-            emoji=emoji
-        )
-        db.session.add(new_reaction)
-        message = 'Reaction added successfully'
-    
-    db.session.commit()
-    
-    # Get updated reaction counts
-    reaction_counts = UpdateReaction.get_reaction_counts(update_id)
+    # Buffered and written in batches; counts include the buffered change
+    previous = engagement.set_reaction(user_id, update_id, emoji)
+    message = 'Reaction changed successfully' if previous else 'Reaction added successfully'
+    reaction_counts = engagement.reaction_counts(update_id)
     
     return jsonify({
         'message': message,
@@ -258,19 +272,11 @@ def remove_reaction(update_id):
     """Remove user's reaction from an update"""
     user_id = int(get_jwt_identity())
     
-    reaction = UpdateReaction.query.filter_by(
-        update_id=update_id,
-        user_id=user_id
-    ).first()
-    
-    if not reaction:
+    if not engagement.user_reaction(user_id, update_id):
         return jsonify({'error': 'No reaction found to remove'}), 404
     
-    db.session.delete(reaction)
-    db.session.commit()
-    
-    # Get updated reaction counts
-    reaction_counts = UpdateReaction.get_reaction_counts(update_id)
+    engagement.set_reaction(user_id, update_id, None)
+    reaction_counts = engagement.reaction_counts(update_id)
     
     return jsonify({
         'message': 'Reaction removed successfully',
@@ -287,18 +293,13 @@ def get_reactions(update_id):
         return jsonify({'error': 'Update not found'}), 404
     
     # Get reaction counts
-    reaction_counts = UpdateReaction.get_reaction_counts(update_id)
+    reaction_counts = engagement.reaction_counts(update_id)
     
     # Get current user's reaction if logged in
     user_reaction = None
     current_user_id = get_jwt_identity()
     if current_user_id:
-        user_reaction_obj = UpdateReaction.query.filter_by(
-            update_id=update_id,
-            user_id=int(current_user_id)
-        ).first()
-        if user_reaction_obj:
-            user_reaction = user_reaction_obj.emoji
+        user_reaction = engagement.user_reaction(int(current_user_id), update_id)
     
     return jsonify({
         'reactions': reaction_counts,
@@ -308,26 +309,28 @@ def get_reactions(update_id):
 @bp.route('/<int:update_id>/like', methods=['POST'])
 @jwt_required()
 def toggle_like(update_id):
-    """Toggle like/unlike for an update"""
+    """Like or unlike an update
+
+    Body (optional): {"liked": true|false} sets that state, so retries and
+    requests served by different workers agree. Without it the like is
+    toggled (older clients).
+    """
     user_id = int(get_jwt_identity())
     update = Update.query.get(update_id)
     if not update:
         return jsonify({'error': 'Update not found'}), 404
     
-    like = UpdateLike.query.filter_by(user_id=user_id, update_id=update_id).first()
+    data = request.get_json(silent=True) or {}
+    liked = data.get('liked')
+    if liked is not None and not isinstance(liked, bool):
+        return jsonify({'error': 'liked must be true or false'}), 400
     
-    if like:
-        db.session.delete(like)
-        liked = False
+    # Buffered and written in batches; the count includes the buffered change
+    if liked is None:
+        liked = engagement.toggle_like(user_id, update_id)
     else:
-        like = UpdateLike(user_id=user_id, update_id=update_id)
-        db.session.add(like)
-        liked = True
-    
-    db.session.commit()
-    
-    # Get updated like count
-    like_count = UpdateLike.query.filter_by(update_id=update_id).count()
+        engagement.set_like(user_id, update_id, liked)
+    like_count = engagement.like_count(update_id)
     
     return jsonify({
         'liked': liked,
@@ -345,10 +348,9 @@ def get_likes(update_id):
     
     is_liked = False
     if current_user_id:
-        like = UpdateLike.query.filter_by(user_id=int(current_user_id), update_id=update_id).first()
-        is_liked = like is not None
+        is_liked = engagement.is_liked(int(current_user_id), update_id)
         
-    like_count = UpdateLike.query.filter_by(update_id=update_id).count()
+    like_count = engagement.like_count(update_id)
     
     return jsonify({
         'liked': is_liked,
@@ -10,6 +10,9 @@ import sys
 from dotenv import load_dotenv
 from app import create_app
 from app.utils.scheduler import start_background_scheduler
+from app.utils.outbox import start_outbox_worker
+from app.utils.engagement import start_engagement_flusher
+from app.utils.presence import start_presence_flusher
 
 # Load environment variables
 load_dotenv()
@@ -32,6 +35,9 @@ if __name__ == "__main__":
     
     # Initialize scheduler
     start_background_scheduler(app)
+    start_outbox_worker(app)
+    start_engagement_flusher(app)
+    start_presence_flusher(app)
     
     # Bind to 0.0.0.0 to allow connections from Android devices on the network
     # CRITICAL: Debug mode disabled for consistent scheduler execution
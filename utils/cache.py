@@ -0,0 +1,165 @@
+import json
+import threading
+import time
+
+# Keys for the shared (user-independent) radio list payloads
+LIVE_RADIOS_KEY = 'radios:live'
+UPCOMING_RADIOS_KEY = 'radios:upcoming'
+
+# ContentVersion key the radio list cache keys are versioned by
+RADIO_LISTS_VERSION = 'radio_lists'
+
+
+class MemoryBackend:
+    """Per-process cache backend. Invalidations only reach this worker."""
+
+    def __init__(self):
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            return value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + ttl)
+
+    def delete(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._data.pop(key, None)
+
+
+class RedisBackend:
+    """Shared cache backend so every gunicorn worker sees the same entries.
+
+    Requires the optional 'redis' package.
+    """
+
+    def __init__(self, url, prefix='campuswave:'):
+        import redis
+        self._client = redis.Redis.from_url(url)
+        self._prefix = prefix
+
+    @property
+    def client(self):
+        return self._client
+
+    def key(self, key):
+        return f'{self._prefix}{key}'
+
+    def get(self, key):
+        value = self._client.get(self.key(key))
+        return value.decode('utf-8') if value is not None else None
+
+    def set(self, key, value, ttl):
+        self._client.set(self.key(key), value, ex=max(int(ttl), 1))
+
+    def delete(self, *keys):
+        if keys:
+            self._client.delete(*[self.key(key) for key in keys])
+
+
+class Cache:
+    """JSON response cache with TTL and explicit invalidation.
+
+    Values are stored JSON-encoded so callers always get a fresh copy they
+    can safely add per-user fields to. Backend errors are logged and treated
+    as a cache miss; the cache must never take an endpoint down.
+    """
+
+    def __init__(self):
+        self.backend = MemoryBackend()
+        self.default_ttl = 30
+        self.logger = None
+
+    def init_app(self, app):
+        self.logger = app.logger
+        self.default_ttl = app.config.get('CACHE_DEFAULT_TTL', 30)
+
+        if app.config.get('CACHE_BACKEND', 'memory') == 'redis':
+            try:
+                self.backend = RedisBackend(app.config['CACHE_REDIS_URL'])
+            except Exception as e:
+                app.logger.warning(f"Redis cache unavailable, using in-memory cache: {e}")
+                self.backend = MemoryBackend()
+
+        app.extensions['campuswave_cache'] = self
+
+    @property
+    def is_shared(self):
+        return isinstance(self.backend, RedisBackend)
+
+    def _log_error(self, action, key, error):
+        if self.logger:
+            self.logger.warning(f"Cache {action} failed for '{key}': {error}")
+
+    def get(self, key):
+        try:
+            raw = self.backend.get(key)
+        except Exception as e:
+            self._log_error('get', key, e)
+            return None
+        return json.loads(raw) if raw is not None else None
+
+    def set(self, key, value, ttl=None):
+        try:
+            self.backend.set(key, json.dumps(value), ttl or self.default_ttl)
+        except Exception as e:
+            self._log_error('set', key, e)
+
+    def delete(self, *keys):
+        try:
+            self.backend.delete(*keys)
+        except Exception as e:
+            self._log_error('delete', ', '.join(keys), e)
+
+    def get_or_set(self, key, loader, ttl=None, version=None):
+        """Return the cached value, or call loader() and cache its result.
+
+        With version, the entry under key also records the version it was
+        built at, and an entry from any other version is a miss that gets
+        overwritten. Bumping a version therefore never leaves old keys
+        behind (and None can be cached).
+        """
+        if version is None:
+            value = self.get(key)
+            if value is None:
+                value = loader()
+                self.set(key, value, ttl)
+            return value
+
+        entry = self.get(key)
+        if entry is not None and entry.get('version') == version:
+            return entry['value']
+        value = loader()
+        self.set(key, {'version': version, 'value': value}, ttl)
+        return value
+
+
+cache = Cache()
+
+
+def radio_lists_version():
+    """Current radio_lists version, to pass to cache.get_or_set"""
+    from app.models.content_version import ContentVersion
+    version, _ = ContentVersion.get(RADIO_LISTS_VERSION)
+    return version
+
+
+def bump_radio_lists():
+    """Make every worker's cached radio lists stale.
+
+    Call before committing the radio change, so the bump is part of the same
+    transaction.
+    """
+    from app.models.content_version import ContentVersion
+    ContentVersion.bump(RADIO_LISTS_VERSION)
@@ -0,0 +1,75 @@
+import click
+from sqlalchemy import func, select
+from app.extensions import db
+
+
+def adjust_counter(model, row_id, column, delta):
+    """Atomically add delta to a denormalized counter column (never below 0).
+
+    Runs as a single UPDATE in the caller's transaction, so the counter
+    commits or rolls back together with the row change it mirrors.
+    updated_at is left untouched - engagement is not an edit of the row.
+    """
+    counter = getattr(model, column)
+    values = {counter: db.case((counter + delta < 0, 0), else_=counter + delta)}
+    if hasattr(model, 'updated_at'):
+        values[model.updated_at] = model.updated_at
+    model.query.filter_by(id=row_id).update(values, synchronize_session=False)
+
+
+def rebuild_engagement_counters():
+    """Recompute every denormalized engagement counter from the source tables"""
+    from app.models.radio import Radio, radio_participants
+    from app.models.favorite import Favorite
+    from app.models.comment import Comment
+    from app.models.update import Update
+    from app.models.update_like import UpdateLike
+    from app.models.update_reaction import UpdateReaction, UpdateReactionCount
+
+    def count_of(column, key):
+        return select(func.count()).where(column == key).scalar_subquery()
+
+    db.session.execute(db.update(Radio).values(
+        favorites_count=count_of(Favorite.radio_id, Radio.id),
+        participants_count=count_of(radio_participants.c.radio_id, Radio.id),
+        comments_count=count_of(Comment.radio_id, Radio.id),
+        updated_at=Radio.updated_at
+    ))
+
+    db.session.execute(db.update(Update).values(
+        likes_count=count_of(UpdateLike.update_id, Update.id),
+        updated_at=Update.updated_at
+    ))
+
+    db.session.execute(db.delete(UpdateReactionCount))
+    db.session.execute(db.insert(UpdateReactionCount).from_select(
+        ['update_id', 'emoji', 'count'],
+        select(UpdateReaction.update_id, UpdateReaction.emoji, func.count())
+        .group_by(UpdateReaction.update_id, UpdateReaction.emoji)
+    ))
+
+    db.session.commit()
+
+
+def register_commands(app):
+    """Register maintenance CLI commands"""
+
+    @app.cli.command('rebuild-counters')
+    def rebuild_counters_command():
+        """Rebuild radio/update engagement counters from source tables."""
+        rebuild_engagement_counters()
+        click.echo('Engagement counters rebuilt')
+
+    @app.cli.command('backfill-broadcast-read-state')
+    def backfill_broadcast_read_state_command():
+        """Convert per-user broadcast status rows into read watermarks."""
+        from app.models.global_notification import GlobalNotificationReadState
+        GlobalNotificationReadState.backfill()
+        click.echo('Broadcast read state backfilled')
+
+    @app.cli.command('reconcile-badges')
+    def reconcile_badges_command():
+        """Recompute every user's unread notification badge."""
+        from app.models.notification_badge import NotificationBadge
+        NotificationBadge.reconcile()
+        click.echo('Notification badges reconciled')
@@ -1,54 +1,61 @@
-from threading import Thread
 from flask_mail import Message
 from app.extensions import mail
-from flask import current_app
+from app.utils.outbox import enqueue, handler
 from datetime import datetime
 
-def send_async_email(app, msg):
-    with app.app_context():
-        start_time = datetime.now()
-        try:
-            with open("email_log.txt", "a") as f:
-                f.write(f"[{start_time}] Starting to send email to {msg.recipients}...\n")
-            mail.send(msg)
-            end_time = datetime.now()
-            duration = (end_time - start_time).total_seconds()
-            with open("email_log.txt", "a") as f:
-                f.write(f"[{end_time}] Successfully sent email to {msg.recipients} (took {duration:.2f}s)\n")
-        except Exception as e:
-            end_time = datetime.now()
-            with open("email_log.txt", "a") as f:
-                f.write(f"[{end_time}] Error sending email to {msg.recipients}: {e}\n")
+def _log(line):
+    with open("email_log.txt", "a") as f:
+        f.write(f"[{datetime.now()}] {line}\n")
+
+@handler('email', batch=True)
+def send_queued_emails(payloads):
+    """Outbox handler: send a batch of emails over one SMTP connection"""
+    errors = []
+    with mail.connect() as conn:
+        for payload in payloads:
+            start_time = datetime.now()
+            try:
+                conn.send(Message(
+                    subject=payload['subject'],
+                    recipients=payload['recipients'],
+                    body=payload['body']
+                ))
+                duration = (datetime.now() - start_time).total_seconds()
+                _log(f"Successfully sent email to {payload['recipients']} (took {duration:.2f}s)")
+                errors.append(None)
+            except Exception as e:
+                _log(f"Error sending email to {payload['recipients']}: {e}")
+                errors.append(e)
+    return errors
+
+def queue_email(recipients, subject, body, sensitive=False):
+    """Queue an email in the outbox; it is sent once the caller commits"""
+    return enqueue('email', {'subject': subject, 'recipients': recipients, 'body': body}, sensitive=sensitive)
 
 def send_otp_email(email, otp):
-    """Send OTP to user email asynchronously"""
-    app = current_app._get_current_object()
-    msg = Message(
-        subject="CampusWave - Your Verification Code",
+    """Queue OTP email (sent after the caller commits)"""
+    queue_email(
         recipients=[email],
-        body=f"Your verification code is: {otp}\n\nThis code will expire in 10 minutes."
+        subject="CampusWave - Your Verification Code",
+        body=f"Your verification code is: {otp}\n\nThis code will expire in 10 minutes.",
+        sensitive=True  # OTPs are only stored hashed; do not keep the code in the outbox
     )
-    Thread(target=send_async_email, args=(app, msg)).start()
     return True
 
 def send_suggestion_approved_email(email, student_name, radio_title):
-    """Send suggestion approval email asynchronously"""
-    app = current_app._get_current_object()
-    msg = Message(
-        subject="CampusWave - Suggestion Accepted! 🎉",
+    """Queue suggestion approval email (sent after the caller commits)"""
+    queue_email(
         recipients=[email],
+        subject="CampusWave - Suggestion Accepted! 🎉",
         body=f"Hi {student_name},\n\nGreat news! Your suggestion '{radio_title}' has been reviewed and accepted by the admin.\n\nThank you for your valuable feedback regarding this radio show!\n\nBest regards,\nCampusWave Team"
     )
-    Thread(target=send_async_email, args=(app, msg)).start()
     return True
 
 def send_admin_approval_email(email, name):
-    """Send admin approval notification email asynchronously"""
-    app = current_app._get_current_object()
-    msg = Message(
-        subject="Admin Request Approved - CampusWave",
+    """Queue admin approval notification email (sent after the caller commits)"""
+    queue_email(
         recipients=[email],
+        subject="Admin Request Approved - CampusWave",
         body=f"Hello {name},\n\nYour request to register as an Admin has been accepted by the Main Admin.\n\nYou can now log in to the Admin Dashboard using your registered email and password.\n\nThank you.\nCampusWave Team"
     )
-    Thread(target=send_async_email, args=(app, msg)).start()
     return True
@@ -0,0 +1,358 @@
+import atexit
+import threading
+import time
+import traceback
+from datetime import datetime
+from sqlalchemy import select, insert, delete, tuple_
+from app.extensions import db
+from app.utils.metrics import registry
+
+FLUSH_SECONDS = registry.histogram(
+    'campuswave_engagement_flush_seconds', 'Duration of a like/reaction buffer flush')
+BUFFERED_WRITES = registry.counter(
+    'campuswave_engagement_buffered_writes_total', 'Like/reaction toggles accepted into the buffer')
+FLUSHED_ROWS = registry.counter(
+    'campuswave_engagement_flushed_rows_total', 'Like/reaction rows written by buffer flushes')
+
+
+class EngagementBuffer:
+    """Coalesces like and reaction toggles and writes them in batches.
+
+    A toggle is acknowledged as soon as it is recorded here. Every
+    ENGAGEMENT_FLUSH_INTERVAL_MS a background thread writes all buffered
+    intents in one transaction: rows are inserted/deleted only where they
+    differ from the table (so replaying a batch is harmless) and each
+    update's counters get one UPDATE per flush instead of one per toggle.
+
+    Buffered state is overlaid on reads, so the acting user sees their own
+    toggles immediately. The buffer is per process: other workers see a
+    toggle once it is flushed, so clients should send the state they want
+    (set_like) rather than a server-side flip, which reads state that may
+    still be buffered in another worker. A hard crash loses at most one
+    interval of toggles. Without a running flusher (CLI, tests, interval 0)
+    every toggle is written synchronously.
+    """
+
+    def __init__(self):
+        self.app = None
+        self.interval = 0
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        # (user_id, update_id) -> [state before buffering, desired state]
+        self._likes = {}
+        self._reactions = {}
+        # Batch currently being written; still authoritative until it commits
+        self._flushing_likes = {}
+        self._flushing_reactions = {}
+        # Completed flushes; tells _record that a committed read may be stale
+        self._flushes = 0
+
+    @property
+    def running(self):
+        return self.app is not None
+
+    def start(self, app):
+        """Start this process's flusher thread"""
+        self.interval = app.config.get('ENGAGEMENT_FLUSH_INTERVAL_MS', 250) / 1000
+        if self.interval <= 0:
+            return
+        self.app = app
+        threading.Thread(target=self._run, daemon=True, name="EngagementFlusher").start()
+        atexit.register(self.flush)
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.flush()
+            except Exception:
+                traceback.print_exc()
+
+    def _lookup(self, buffered, flushing, key):
+        entry = buffered.get(key) or flushing.get(key)
+        return (True, entry[1]) if entry else (False, None)
+
+    def _read(self, statement):
+        """Read committed state on a fresh connection, not the request's snapshot"""
+        with db.engine.connect() as connection:
+            return connection.execute(statement).scalar()
+
+    def _committed_like(self, user_id, update_id):
+        from app.models.update_like import UpdateLike
+
+        return self._read(select(select(UpdateLike.user_id).where(
+            UpdateLike.user_id == user_id, UpdateLike.update_id == update_id
+        ).exists()))
+
+    def _committed_reaction(self, user_id, update_id):
+        from app.models.update_reaction import UpdateReaction
+
+        return self._read(select(UpdateReaction.emoji).where(
+            UpdateReaction.user_id == user_id, UpdateReaction.update_id == update_id
+        ).limit(1))
+
+    def is_liked(self, user_id, update_id):
+        with self._lock:
+            found, liked = self._lookup(self._likes, self._flushing_likes, (user_id, update_id))
+        if found:
+            return liked
+        return self._committed_like(user_id, update_id)
+
+    def user_reaction(self, user_id, update_id):
+        with self._lock:
+            found, emoji = self._lookup(self._reactions, self._flushing_reactions, (user_id, update_id))
+        if found:
+            return emoji
+        return self._committed_reaction(user_id, update_id)
+
+    def _record(self, buffered, flushing, key, committed, desired):
+        """Buffer a new state for key; returns (previous, new).
+
+        desired may be a function of the previous state (a toggle). Reading
+        the previous state and recording the new one happen under one lock
+        hold, so concurrent toggles in this process cannot both read the same
+        state and cancel out. When nothing is buffered for key, committed()
+        reads the table outside the lock; the lookup is then repeated, and
+        the read is redone if a flush finished in between.
+        """
+        read = None  # (flush count when read, committed state)
+        while True:
+            with self._lock:
+                found, previous = self._lookup(buffered, flushing, key)
+                if found or (read is not None and read[0] == self._flushes):
+                    if not found:
+                        previous = read[1]
+                    new = desired(previous) if callable(desired) else desired
+                    entry = buffered.get(key)
+                    if entry:
+                        entry[1] = new
+                    else:
+                        buffered[key] = [previous, new]
+                    break
+                flushes = self._flushes
+            read = (flushes, committed())
+        BUFFERED_WRITES.inc()
+        if not self.running:
+            self.flush()
+        return previous, new
+
+    def set_like(self, user_id, update_id, liked):
+        """Like or unlike; returns the previous state"""
+        previous, _ = self._record(self._likes, self._flushing_likes, (user_id, update_id),
+                                   lambda: self._committed_like(user_id, update_id), bool(liked))
+        return previous
+
+    def toggle_like(self, user_id, update_id):
+        """Flip the user's like; returns the new state"""
+        _, liked = self._record(self._likes, self._flushing_likes, (user_id, update_id),
+                                lambda: self._committed_like(user_id, update_id), lambda liked: not liked)
+        return liked
+
+    def set_reaction(self, user_id, update_id, emoji):
+        """Set (or with None, remove) the user's reaction; returns the previous emoji"""
+        previous, _ = self._record(self._reactions, self._flushing_reactions, (user_id, update_id),
+                                   lambda: self._committed_reaction(user_id, update_id), emoji)
+        return previous
+
+    def pending(self, update_ids, user_id=None):
+        """Buffered changes for some updates, to overlay on committed state.
+
+        Returns (like_deltas, reaction_deltas, liked, reactions): count
+        deltas per update and per update/emoji, plus the user's own buffered
+        like states and reactions keyed by update id.
+        """
+        update_ids = set(update_ids)
+        like_deltas, reaction_deltas, liked, reactions = {}, {}, {}, {}
+        with self._lock:
+            for entries in (self._flushing_likes, self._likes):
+                for (entry_user, update_id), (before, desired) in entries.items():
+                    if update_id not in update_ids:
+                        continue
+                    like_deltas[update_id] = like_deltas.get(update_id, 0) + int(desired) - int(before)
+                    if entry_user == user_id:
+                        liked[update_id] = desired
+            for entries in (self._flushing_reactions, self._reactions):
+                for (entry_user, update_id), (before, desired) in entries.items():
+                    if update_id not in update_ids:
+                        continue
+                    deltas = reaction_deltas.setdefault(update_id, {})
+                    if before:
+                        deltas[before] = deltas.get(before, 0) - 1
+                    if desired:
+                        deltas[desired] = deltas.get(desired, 0) + 1
+                    if entry_user == user_id:
+                        reactions[update_id] = desired
+        return like_deltas, reaction_deltas, liked, reactions
+
+    def like_count(self, update_id):
+        """Committed likes_count plus buffered toggles"""
+        from app.models.update import Update
+
+        count = self._read(select(Update.likes_count).where(Update.id == update_id)) or 0
+        return max(count + self.pending([update_id])[0].get(update_id, 0), 0)
+
+    def reaction_counts(self, update_id):
+        """Committed per-emoji totals plus buffered reactions"""
+        from app.models.update_reaction import UpdateReactionCount, ALLOWED_EMOJIS
+
+        with db.engine.connect() as connection:
+            rows = connection.execute(select(UpdateReactionCount.emoji, UpdateReactionCount.count)
+                                      .where(UpdateReactionCount.update_id == update_id)).all()
+        counts = {emoji: 0 for emoji in ALLOWED_EMOJIS}
+        counts.update({emoji: count for emoji, count in rows if emoji in counts})
+        return apply_reaction_deltas(counts, self.pending([update_id])[1].get(update_id))
+
+    def discard_update(self, update_id):
+        """Drop buffered toggles for an update that is being deleted"""
+        with self._lock:
+            for entries in (self._likes, self._reactions):
+                for key in [key for key in entries if key[1] == update_id]:
+                    del entries[key]
+
+    def flush(self):
+        """Write every buffered toggle in one transaction; returns rows changed"""
+        from flask import current_app
+
+        with self._flush_lock:
+            with self._lock:
+                if not self._likes and not self._reactions:
+                    return 0
+                self._flushing_likes, self._likes = self._likes, {}
+                self._flushing_reactions, self._reactions = self._reactions, {}
+
+            app = self.app or current_app._get_current_object()
+            started = time.perf_counter()
+            try:
+                with app.app_context():
+                    try:
+                        changed = self._write(self._flushing_likes, self._flushing_reactions)
+                        db.session.commit()
+                    except Exception:
+                        db.session.rollback()
+                        raise
+                FLUSHED_ROWS.inc(changed)
+                return changed
+            except Exception as e:
+                print(f"[ENGAGEMENT] Flush failed, will retry: {str(e)}")
+                with self._lock:
+                    # Newer toggles win; keep the original 'before' for count overlays
+                    for flushing, buffered in ((self._flushing_likes, self._likes),
+                                               (self._flushing_reactions, self._reactions)):
+                        for key, entry in flushing.items():
+                            if key in buffered:
+                                buffered[key][0] = entry[0]
+                            else:
+                                buffered[key] = entry
+                if not self.running:
+                    raise
+                return 0
+            finally:
+                with self._lock:
+                    self._flushing_likes, self._flushing_reactions = {}, {}
+                    self._flushes += 1
+                FLUSH_SECONDS.observe(time.perf_counter() - started)
+
+    def _write(self, likes, reactions):
+        from app.models.update import Update
+        from app.models.update_like import UpdateLike
+        from app.models.update_reaction import UpdateReaction, UpdateReactionCount
+        from app.utils.counters import adjust_counter
+
+        # Toggles for updates deleted in the meantime are dropped
+        update_ids = {key[1] for key in likes} | {key[1] for key in reactions}
+        live_ids = set(db.session.scalars(select(Update.id).where(Update.id.in_(update_ids))).all())
+        now = datetime.now()
+        changed = 0
+
+        likes = {key: entry[1] for key, entry in likes.items() if key[1] in live_ids}
+        if likes:
+            existing = {tuple(row) for row in db.session.execute(
+                select(UpdateLike.user_id, UpdateLike.update_id)
+                .where(tuple_(UpdateLike.user_id, UpdateLike.update_id).in_(list(likes)))
+            ).all()}
+            to_add = [key for key, liked in likes.items() if liked and key not in existing]
+            to_remove = [key for key, liked in likes.items() if not liked and key in existing]
+
+            if to_add:
+                db.session.execute(insert(UpdateLike), [
+                    {'user_id': user_id, 'update_id': update_id, 'created_at': now}
+                    for user_id, update_id in to_add
+                ])
+            if to_remove:
+                db.session.execute(delete(UpdateLike).where(
+                    tuple_(UpdateLike.user_id, UpdateLike.update_id).in_(to_remove)
+                ))
+
+            deltas = {}
+            for _, update_id in to_add:
+                deltas[update_id] = deltas.get(update_id, 0) + 1
+            for _, update_id in to_remove:
+                deltas[update_id] = deltas.get(update_id, 0) - 1
+            for update_id, delta in deltas.items():
+                if delta:
+                    adjust_counter(Update, update_id, 'likes_count', delta)
+            changed += len(to_add) + len(to_remove)
+
+        reactions = {key: entry[1] for key, entry in reactions.items() if key[1] in live_ids}
+        if reactions:
+            existing = {}
+            for row_id, user_id, update_id, emoji in db.session.execute(
+                select(UpdateReaction.id, UpdateReaction.user_id, UpdateReaction.update_id, UpdateReaction.emoji)
+                .where(tuple_(UpdateReaction.user_id, UpdateReaction.update_id).in_(list(reactions)))
+            ).all():
+                existing[(user_id, update_id)] = (row_id, emoji)
+
+            to_add, to_remove, to_change = [], [], {}
+            deltas = {}
+            for key, emoji in reactions.items():
+                row_id, current = existing.get(key, (None, None))
+                if emoji == current:
+                    continue
+                if current:
+                    deltas[(key[1], current)] = deltas.get((key[1], current), 0) - 1
+                if emoji:
+                    deltas[(key[1], emoji)] = deltas.get((key[1], emoji), 0) + 1
+                if row_id is None:
+                    to_add.append((key, emoji))
+                elif emoji is None:
+                    to_remove.append(row_id)
+                else:
+                    to_change.setdefault(emoji, []).append(row_id)
+
+            if to_add:
+                db.session.execute(insert(UpdateReaction), [
+                    {'user_id': user_id, 'update_id': update_id, 'emoji': emoji,
+                     'created_at': now, 'updated_at': now}
+                    for (user_id, update_id), emoji in to_add
+                ])
+            if to_remove:
+                db.session.execute(delete(UpdateReaction).where(UpdateReaction.id.in_(to_remove)))
+            for emoji, row_ids in to_change.items():
+                UpdateReaction.query.filter(UpdateReaction.id.in_(row_ids)).update(
+                    {UpdateReaction.emoji: emoji, UpdateReaction.updated_at: now},
+                    synchronize_session=False
+                )
+
+            for (update_id, emoji), delta in deltas.items():
+                if delta:
+                    UpdateReactionCount.adjust(update_id, emoji, delta)
+            changed += len(to_add) + len(to_remove) + sum(len(ids) for ids in to_change.values())
+
+        return changed
+
+
+def apply_reaction_deltas(counts, deltas):
+    """Add buffered per-emoji deltas to a {emoji: count} map (never below 0)"""
+    for emoji, delta in (deltas or {}).items():
+        if emoji in counts:
+            counts[emoji] = max(counts[emoji] + delta, 0)
+    return counts
+
+
+engagement = EngagementBuffer()
+
+
+def start_engagement_flusher(app):
+    """Start buffering like/reaction toggles in this process"""
+    engagement.start(app)
+    return engagement
@@ -0,0 +1,218 @@
+import itertools
+import json
+import queue
+import threading
+import time
+from collections import deque
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+# Topics clients can subscribe to with /api/events?topics=...
+LIVE_TOPIC = 'live'                    # live stream, current podcast
+RADIOS_TOPIC = 'radios'                # radio status changes
+QUEUE_TOPIC = 'queue'                  # live stream queue changes
+NOTIFICATIONS_TOPIC = 'notifications'  # broadcasts + the caller's own notifications
+COMMENTS_TOPIC_PREFIX = 'comments:radio:'
+
+
+def comments_topic(radio_id):
+    return f'{COMMENTS_TOPIC_PREFIX}{radio_id}'
+
+
+class Subscription:
+    """One connected client: a bounded queue fed by the hub.
+
+    A client that stops reading loses its oldest events rather than growing
+    the queue without limit; EventSource reconnects replay from the hub's
+    recent-event buffer.
+    """
+
+    def __init__(self, topics, user_id=None, max_queue=100):
+        self.topics = set(topics)
+        self.user_id = user_id
+        self.queue = queue.Queue(maxsize=max_queue)
+
+    def wants(self, envelope):
+        if envelope['topic'] not in self.topics:
+            return False
+        user_ids = envelope.get('user_ids')
+        return user_ids is None or self.user_id in user_ids
+
+    def offer(self, envelope):
+        while True:
+            try:
+                self.queue.put_nowait(envelope)
+                return
+            except queue.Full:
+                try:
+                    self.queue.get_nowait()
+                except queue.Empty:
+                    pass
+
+
+class LocalTransport:
+    """Delivers published events to this process only"""
+
+    def __init__(self, hub):
+        self.hub = hub
+
+    def publish(self, envelope):
+        self.hub.deliver(envelope)
+
+
+class RedisTransport:
+    """Fans events out to every worker over Redis pub/sub.
+
+    Requires the optional 'redis' package. Each process runs one listener
+    thread that feeds received events into its local hub.
+    """
+
+    def __init__(self, hub, url, channel='campuswave:events'):
+        import redis
+        self.hub = hub
+        self.channel = channel
+        self._client = redis.Redis.from_url(url)
+        self._listener = threading.Thread(target=self._listen, daemon=True, name="EventsRedisListener")
+        self._listener.start()
+
+    def publish(self, envelope):
+        self._client.publish(self.channel, json.dumps(envelope))
+
+    def _listen(self):
+        while True:
+            try:
+                pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.channel)
+                for message in pubsub.listen():
+                    self.hub.deliver(json.loads(message['data']))
+            except Exception as e:
+                print(f"[EVENTS] Redis listener error, reconnecting: {str(e)}")
+                time.sleep(1)
+
+
+class EventHub:
+    """In-process pub/sub for the /api/events SSE stream.
+
+    publish() goes through the configured transport (local or Redis) and
+    every process's hub delivers matching events to its own subscribers.
+    Event ids are millisecond timestamps plus a sequence so reconnecting
+    clients can resume with Last-Event-ID from the recent-event buffer.
+    """
+
+    def __init__(self):
+        self.transport = LocalTransport(self)
+        self.logger = None
+        self._subscriptions = set()
+        self._recent = deque(maxlen=500)
+        self._lock = threading.Lock()
+        self._sequence = itertools.count()
+
+    def init_app(self, app):
+        self.logger = app.logger
+        self._recent = deque(maxlen=app.config.get('EVENTS_REPLAY_BUFFER', 500))
+
+        if app.config.get('EVENTS_TRANSPORT', 'local') == 'redis':
+            try:
+                self.transport = RedisTransport(self, app.config['EVENTS_REDIS_URL'])
+            except Exception as e:
+                app.logger.warning(f"Redis event transport unavailable, events stay in-process: {e}")
+                self.transport = LocalTransport(self)
+
+        app.extensions['campuswave_events'] = self
+
+    def _next_id(self):
+        return int(time.time() * 1000) * 1000 + next(self._sequence) % 1000
+
+    def publish(self, topic, name, data, user_ids=None):
+        """Publish now. user_ids limits delivery to those users' streams."""
+        envelope = {'id': self._next_id(), 'topic': topic, 'event': name, 'data': data}
+        if user_ids is not None:
+            envelope['user_ids'] = list(user_ids)
+        try:
+            self.transport.publish(envelope)
+        except Exception as e:
+            if self.logger:
+                self.logger.warning(f"Event publish failed for '{topic}': {e}")
+
+    def deliver(self, envelope):
+        with self._lock:
+            self._recent.append(envelope)
+            subscriptions = list(self._subscriptions)
+        for subscription in subscriptions:
+            if subscription.wants(envelope):
+                subscription.offer(envelope)
+
+    def subscribe(self, topics, user_id=None, last_event_id=None, max_queue=100, max_subscribers=None):
+        """Register a subscriber; None if max_subscribers are already connected"""
+        subscription = Subscription(topics, user_id, max_queue)
+        with self._lock:
+            if max_subscribers is not None and len(self._subscriptions) >= max_subscribers:
+                return None
+            self._subscriptions.add(subscription)
+            if last_event_id is not None:
+                for envelope in self._recent:
+                    if envelope['id'] > last_event_id and subscription.wants(envelope):
+                        subscription.offer(envelope)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+    @property
+    def subscriber_count(self):
+        return len(self._subscriptions)
+
+
+hub = EventHub()
+
+
+def publish_on_commit(topic, name, data, user_ids=None):
+    """Publish once the current transaction commits (dropped on rollback)"""
+    from app.extensions import db
+    db.session.info.setdefault('pending_events', []).append((topic, name, data, user_ids))
+
+
+@event.listens_for(Session, 'after_commit')
+def _publish_after_commit(session):
+    if session.in_nested_transaction():
+        return  # Savepoint released; wait for the real commit
+    for topic, name, data, user_ids in session.info.pop('pending_events', []):
+        hub.publish(topic, name, data, user_ids)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_after_rollback(session):
+    if not session.in_nested_transaction():
+        session.info.pop('pending_events', None)
+
+
+def publish_live_stream(stream):
+    """Queue a 'live_stream' event with the stream's playback state"""
+    publish_on_commit(LIVE_TOPIC, 'live_stream', {
+        'status': stream.status,
+        'title': stream.title,
+        'description': stream.description,
+        'current_audio_id': stream.current_audio_id,
+        'started_at': stream.started_at.isoformat() if stream.started_at else None
+    })
+
+
+def publish_radio_status(radio):
+    """Queue a 'radio.status' event for a radio's status/host status"""
+    publish_on_commit(RADIOS_TOPIC, 'radio.status', {
+        'id': radio.id,
+        'status': radio.status.value,
+        'host_status': radio.host_status.value if radio.host_status else None,
+        'end_time': radio.end_time.isoformat() if radio.end_time else None
+    })
+
+
+def publish_queue_changed():
+    """Queue a 'queue.changed' event; clients refetch /api/live-stream/queue"""
+    publish_on_commit(QUEUE_TOPIC, 'queue.changed', {})
+
+
+def format_sse(envelope):
+    """Serialize an event envelope in text/event-stream format"""
+    return f"id: {envelope['id']}\nevent: {envelope['event']}\ndata: {json.dumps(envelope['data'])}\n\n"
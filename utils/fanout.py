@@ -0,0 +1,145 @@
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import select, insert, func
+from app.extensions import db
+from app.models.notification import Notification
+from app.models.notification_fanout import NotificationFanout
+from app.models.notification_badge import NotificationBadge
+from app.utils.outbox import enqueue, handler
+from app.utils.events import publish_on_commit, NOTIFICATIONS_TOPIC
+
+
+def _recipients(fanout):
+    """Return (select of recipient user ids, id column) for a fan-out audience"""
+    if fanout.audience == NotificationFanout.STUDENTS:
+        from app.models.user import User, UserRole
+        return select(User.id).where(User.role == UserRole.STUDENT), User.id
+
+    if fanout.audience == NotificationFanout.RADIO_SUBSCRIBERS:
+        from app.models.radio_subscription import RadioSubscription
+        return (select(RadioSubscription.user_id)
+                .where(RadioSubscription.radio_id == fanout.audience_id)), RadioSubscription.user_id
+
+    raise ValueError(f"Unknown fan-out audience: {fanout.audience}")
+
+
+def queue_fanout(audience, title, message, type, related_id=None, audience_id=None):
+    """Record a bulk notification job in the caller's transaction.
+
+    The job is delivered through the outbox once the caller commits, so the
+    notification can never go out for a change that rolled back.
+    """
+    fanout = NotificationFanout(
+        audience=audience,
+        audience_id=audience_id,
+        title=title,
+        message=message,
+        type=type,
+        related_id=related_id,
+        status=NotificationFanout.PENDING
+    )
+    db.session.add(fanout)
+    db.session.flush()
+    enqueue('notification_fanout', {'fanout_id': fanout.id})
+    return fanout
+
+
+@handler('notification_fanout')
+def deliver_fanout(payload):
+    """Outbox handler for queued fan-out jobs; raises so the outbox retries"""
+    run_fanout(current_app._get_current_object(), payload['fanout_id'])
+
+
+def run_fanout(app, fanout_id):
+    """Insert one notification row per recipient in chunked multi-row INSERTs.
+
+    Recipient ids are walked in id order with a keyset seek, so only one chunk
+    of ids is ever held in memory. Each chunk commits along with the job's
+    sent counter and last_user_id checkpoint, so a delivery that is retried
+    after an error, or reclaimed after the outbox visibility timeout, picks
+    up where the previous one stopped. Errors mark the job FAILED and are
+    re-raised for the outbox's backoff and retry.
+    """
+    with app.app_context():
+        chunk_size = app.config.get('FANOUT_CHUNK_SIZE', 1000)
+
+        # Completed jobs are never delivered twice; anything else resumes
+        claimed = NotificationFanout.query.filter(
+            NotificationFanout.id == fanout_id,
+            NotificationFanout.status != NotificationFanout.COMPLETED
+        ).update({
+            NotificationFanout.status: NotificationFanout.RUNNING,
+            NotificationFanout.started_at: db.func.coalesce(NotificationFanout.started_at, datetime.now()),
+            NotificationFanout.error: None
+        }, synchronize_session=False)
+        db.session.commit()
+        if not claimed:
+            return
+
+        fanout = db.session.get(NotificationFanout, fanout_id)
+        try:
+            recipients, user_id = _recipients(fanout)
+            recipients = recipients.distinct()
+            if fanout.total is None:
+                fanout.total = db.session.scalar(select(func.count()).select_from(recipients.subquery()))
+            db.session.commit()
+
+            row = {
+                'title': fanout.title,
+                'message': fanout.message,
+                'type': fanout.type,
+                'related_id': fanout.related_id,
+                'is_read': False
+            }
+            last_id = fanout.last_user_id
+            sent = fanout.sent
+            while True:
+                ids = db.session.scalars(
+                    recipients.where(user_id > last_id).order_by(user_id).limit(chunk_size)
+                ).all()
+                if not ids:
+                    break
+
+                now = datetime.now()
+                db.session.execute(insert(Notification), [
+                    dict(row, user_id=recipient_id, created_at=now) for recipient_id in ids
+                ])
+                NotificationBadge.add_personal(ids)
+                publish_on_commit(NOTIFICATIONS_TOPIC, 'notification.created', {
+                    'title': fanout.title,
+                    'message': fanout.message,
+                    'type': fanout.type,
+                    'related_id': fanout.related_id,
+                    'created_at': now.isoformat()
+                }, user_ids=ids)
+                # Checkpoint only if nobody else advanced it (a delivery that
+                # outlived its outbox claim); otherwise drop this chunk and stop
+                advanced = NotificationFanout.query.filter_by(id=fanout_id, last_user_id=last_id).update({
+                    NotificationFanout.sent: sent + len(ids),
+                    NotificationFanout.last_user_id: ids[-1]
+                }, synchronize_session=False)
+                if not advanced:
+                    db.session.rollback()
+                    print(f"[FANOUT] Job {fanout_id}: taken over by another delivery, stopping")
+                    return
+                db.session.commit()
+                sent += len(ids)
+                last_id = ids[-1]
+
+            fanout.status = NotificationFanout.COMPLETED
+            fanout.finished_at = datetime.now()
+            db.session.commit()
+            print(f"[FANOUT] Job {fanout_id}: delivered {sent} {fanout.type} notifications")
+
+        except Exception as e:
+            db.session.rollback()
+            print(f"[FANOUT] Job {fanout_id} failed, will resume from its checkpoint: {str(e)}")
+            try:
+                NotificationFanout.query.filter_by(id=fanout_id).update({
+                    NotificationFanout.status: NotificationFanout.FAILED,
+                    NotificationFanout.error: str(e)
+                }, synchronize_session=False)
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+            raise
@@ -0,0 +1,61 @@
+from flask import g, has_app_context
+from sqlalchemy.orm import joinedload
+from app.extensions import db
+
+
+class UserLoader:
+    """Batch loader for User rows used while serializing a response.
+
+    Call prime() with every user id a list response will need, then have
+    serializers call get(); all primed ids are fetched together with their
+    student/admin profiles in one query, and each user is loaded at most once
+    per request.
+    """
+
+    def __init__(self):
+        self._users = {}
+        self._pending = set()
+
+    def prime(self, user_ids):
+        """Queue user ids to be fetched in the next batch"""
+        for user_id in user_ids:
+            if user_id is not None and user_id not in self._users:
+                self._pending.add(user_id)
+        return self
+
+    def load(self):
+        """Fetch every queued user (and profile) in a single query"""
+        if not self._pending:
+            return
+        from app.models.user import User
+
+        ids = list(self._pending)
+        self._pending.clear()
+        users = User.query.options(
+            joinedload(User.student_profile),
+            joinedload(User.admin_profile)
+        ).filter(User.id.in_(ids)).all()
+
+        for user_id in ids:
+            self._users[user_id] = None
+        for user in users:
+            self._users[user.id] = user
+
+    def get(self, user_id):
+        """Return the User for user_id (or None), batching with any primed ids"""
+        if user_id is None:
+            return None
+        if user_id not in self._users:
+            self._pending.add(user_id)
+            self.load()
+        return self._users.get(user_id)
+
+
+def user_loader():
+    """The UserLoader for the current request (app context)"""
+    if not has_app_context():
+        return UserLoader()
+    loader = g.get('_user_loader')
+    if loader is None:
+        loader = g._user_loader = UserLoader()
+    return loader
@@ -0,0 +1,153 @@
+import math
+import threading
+
+# Seconds; suits both sub-second DB work and multi-second start lag
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+def _label_key(labels):
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _format_labels(label_key, extra=()):
+    pairs = list(label_key) + list(extra)
+    if not pairs:
+        return ''
+    escaped = []
+    for key, value in pairs:
+        value = value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        escaped.append(f'{key}="{value}"')
+    return '{' + ','.join(escaped) + '}'
+
+
+def _format_value(value):
+    if value == math.inf:
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Monotonically increasing value per label set"""
+    kind = 'counter'
+
+    def __init__(self, name, help, lock):
+        self.name = name
+        self.help = help
+        self._lock = lock
+        self._values = {}
+
+    def inc(self, amount=1, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def snapshot(self):
+        return [{'labels': dict(key), 'value': value} for key, value in self._values.items()]
+
+    def render(self):
+        return [f'{self.name}{_format_labels(key)} {_format_value(value)}'
+                for key, value in self._values.items()]
+
+
+class Gauge(Counter):
+    """Value that can go up and down per label set"""
+    kind = 'gauge'
+
+    def set(self, value, **labels):
+        with self._lock:
+            self._values[_label_key(labels)] = value
+
+
+class Histogram:
+    """Cumulative bucket counts plus sum/count per label set"""
+    kind = 'histogram'
+
+    def __init__(self, name, help, lock, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(buckets) + (math.inf,)
+        self._lock = lock
+        self._values = {}
+
+    def observe(self, value, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = {'buckets': [0] * len(self.buckets), 'sum': 0.0, 'count': 0}
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    entry['buckets'][i] += 1
+            entry['sum'] += value
+            entry['count'] += 1
+
+    def snapshot(self):
+        result = []
+        for key, entry in self._values.items():
+            count = entry['count']
+            result.append({
+                'labels': dict(key),
+                'count': count,
+                'sum': round(entry['sum'], 6),
+                'avg': round(entry['sum'] / count, 6) if count else None,
+                'buckets': {_format_value(bound): n for bound, n in zip(self.buckets, entry['buckets'])}
+            })
+        return result
+
+    def render(self):
+        lines = []
+        for key, entry in self._values.items():
+            for bound, n in zip(self.buckets, entry['buckets']):
+                lines.append(f'{self.name}_bucket{_format_labels(key, [("le", _format_value(bound))])} {n}')
+            lines.append(f'{self.name}_sum{_format_labels(key)} {_format_value(entry["sum"])}')
+            lines.append(f'{self.name}_count{_format_labels(key)} {entry["count"]}')
+        return lines
+
+
+class MetricsRegistry:
+    """In-process metrics store with JSON and Prometheus text exposition.
+
+    Values live in this worker only; with several gunicorn workers each
+    exposes its own series (scheduler metrics come from the leader).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics = {}
+
+    def _get_or_create(self, cls, name, help, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, help, self._lock, **kwargs)
+            return metric
+
+    def counter(self, name, help):
+        return self._get_or_create(Counter, name, help)
+
+    def gauge(self, name, help):
+        return self._get_or_create(Gauge, name, help)
+
+    def histogram(self, name, help, buckets=DEFAULT_BUCKETS):
+        return self._get_or_create(Histogram, name, help, buckets=buckets)
+
+    def snapshot(self, prefix=''):
+        """JSON-friendly view of every metric whose name starts with prefix"""
+        with self._lock:
+            return {
+                name: {'type': metric.kind, 'help': metric.help, 'values': metric.snapshot()}
+                for name, metric in sorted(self._metrics.items()) if name.startswith(prefix)
+            }
+
+    def render_prometheus(self):
+        """Prometheus text exposition format (version 0.0.4)"""
+        lines = []
+        with self._lock:
+            for name, metric in sorted(self._metrics.items()):
+                lines.append(f'# HELP {name} {metric.help}')
+                lines.append(f'# TYPE {name} {metric.kind}')
+                lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
@@ -1,5 +1,6 @@
 # Placeholder for Firebase Admin
 # Requires 'firebase-admin' pip package and serviceAccountKey.json
+from app.utils.outbox import enqueue, handler
 
 def send_topic_notification(topic, title, body):
     """Send FCM notification to a topic"""
@@ -22,3 +23,17 @@ def send_topic_notification(topic, title, body):
     except Exception as e:
         print('Error sending notification:', e)
         return False
+
+@handler('push')
+def send_queued_topic_notification(payload):
+    """Outbox handler: deliver a queued topic push (raises so it is retried)"""
+    if not send_topic_notification(payload['topic'], payload['title'], payload['body']):
+        raise RuntimeError(f"Push to topic '{payload['topic']}' failed")
+
+def radio_topic(radio_id):
+    """FCM topic the app subscribes to for one radio session"""
+    return f'radio_{radio_id}'
+
+def queue_topic_notification(topic, title, body):
+    """Queue an FCM topic notification; it is sent once the caller commits"""
+    return enqueue('push', {'topic': topic, 'title': title, 'body': body})
@@ -0,0 +1,235 @@
+import json
+import os
+import random
+import socket
+import threading
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+from app.extensions import db
+from app.models.outbox import OutboxMessage
+
+# kind -> (handler, takes_batch)
+_handlers = {}
+
+# Set after a commit that enqueued messages so local workers start at once
+_wake = threading.Event()
+
+
+def handler(kind, batch=False):
+    """Register the function that performs one kind of outbox message.
+
+    Single handlers take one payload dict and raise on failure. Batch
+    handlers take a list of payloads and return a list of the same length
+    holding None (delivered) or the exception for each one.
+    """
+    def decorator(fn):
+        _handlers[kind] = (fn, batch)
+        return fn
+    return decorator
+
+
+# Stored in place of a sensitive payload once its message has failed for good
+REDACTED_PAYLOAD = json.dumps({'redacted': True})
+
+
+def enqueue(kind, payload, delay=0, max_attempts=None, sensitive=False):
+    """Add a message to the outbox in the caller's transaction; caller commits.
+
+    Pass sensitive=True for payloads holding secrets such as verification
+    codes: they are never kept once the message is delivered or FAILED.
+    """
+    from flask import current_app
+
+    message = OutboxMessage(
+        kind=kind,
+        payload=json.dumps(payload),
+        sensitive=sensitive,
+        status=OutboxMessage.PENDING,
+        max_attempts=max_attempts or current_app.config.get('OUTBOX_MAX_ATTEMPTS', 5),
+        available_at=datetime.utcnow() + timedelta(seconds=delay)
+    )
+    db.session.add(message)
+    db.session.info['outbox_pending'] = True
+    return message
+
+
+@event.listens_for(Session, 'after_commit')
+def _wake_after_commit(session):
+    if session.in_nested_transaction():
+        return  # Savepoint released; wait for the real commit
+    if session.info.pop('outbox_pending', False):
+        _wake.set()
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_after_rollback(session):
+    if not session.in_nested_transaction():
+        session.info.pop('outbox_pending', None)
+
+
+class OutboxWorker:
+    """Drains the outbox with a bounded thread pool.
+
+    A dispatcher claims up to OUTBOX_BATCH_SIZE due messages at a time (a
+    conditional UPDATE stamps them with a claim token, so several processes
+    can share one table) and hands each batch to the pool only when one of
+    OUTBOX_CONCURRENCY slots is free; bursts queue up in the table instead of
+    spawning threads. Failures are retried with exponential backoff and
+    jitter. A claim that is not finished within OUTBOX_VISIBILITY_TIMEOUT
+    (worker crash) becomes claimable again.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.concurrency = app.config.get('OUTBOX_CONCURRENCY', 4)
+        self.batch_size = app.config.get('OUTBOX_BATCH_SIZE', 20)
+        self.poll_interval = app.config.get('OUTBOX_POLL_INTERVAL', 2)
+        self.visibility_timeout = app.config.get('OUTBOX_VISIBILITY_TIMEOUT', 300)
+        self.retry_base = app.config.get('OUTBOX_RETRY_BASE', 30)
+        self.retry_max = app.config.get('OUTBOX_RETRY_MAX', 3600)
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self._slots = threading.BoundedSemaphore(self.concurrency)
+        self._pool = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='OutboxWorker')
+
+    def _claimable(self, now):
+        return db.or_(
+            db.and_(OutboxMessage.status == OutboxMessage.PENDING, OutboxMessage.available_at <= now),
+            db.and_(OutboxMessage.status == OutboxMessage.PROCESSING, OutboxMessage.locked_until < now)
+        )
+
+    def claim(self):
+        """Claim a batch of due messages; returns [(id, kind, payload, attempts, max_attempts)]"""
+        with self.app.app_context():
+            now = datetime.utcnow()
+            ids = db.session.scalars(
+                select(OutboxMessage.id).where(self._claimable(now))
+                .order_by(OutboxMessage.id).limit(self.batch_size)
+            ).all()
+            if not ids:
+                db.session.rollback()
+                return []
+
+            token = f"{self.worker_id}:{uuid.uuid4().hex[:12]}"
+            OutboxMessage.query.filter(OutboxMessage.id.in_(ids), self._claimable(now)).update({
+                OutboxMessage.status: OutboxMessage.PROCESSING,
+                OutboxMessage.locked_by: token,
+                OutboxMessage.locked_until: now + timedelta(seconds=self.visibility_timeout),
+                OutboxMessage.attempts: OutboxMessage.attempts + 1
+            }, synchronize_session=False)
+            db.session.commit()
+
+            # Rows another process claimed in between are simply not ours
+            return [
+                (row.id, row.kind, json.loads(row.payload), row.attempts, row.max_attempts)
+                for row in db.session.query(
+                    OutboxMessage.id, OutboxMessage.kind, OutboxMessage.payload,
+                    OutboxMessage.attempts, OutboxMessage.max_attempts
+                ).filter(OutboxMessage.id.in_(ids), OutboxMessage.locked_by == token).all()
+            ]
+
+    def _run_handlers(self, messages):
+        """Run handlers grouped by kind; returns {message_id: exception or None}"""
+        results = {}
+        by_kind = {}
+        for message in messages:
+            by_kind.setdefault(message[1], []).append(message)
+
+        for kind, group in by_kind.items():
+            registered = _handlers.get(kind)
+            if registered is None:
+                for message in group:
+                    results[message[0]] = LookupError(f"No outbox handler for '{kind}'")
+                continue
+
+            fn, batch = registered
+            if batch:
+                try:
+                    errors = fn([message[2] for message in group])
+                except Exception as e:
+                    errors = [e] * len(group)
+                for message, error in zip(group, errors):
+                    results[message[0]] = error
+            else:
+                for message in group:
+                    try:
+                        fn(message[2])
+                        results[message[0]] = None
+                    except Exception as e:
+                        results[message[0]] = e
+        return results
+
+    def _backoff(self, attempts):
+        delay = min(self.retry_base * (2 ** (attempts - 1)), self.retry_max)
+        return delay * random.uniform(0.5, 1.0)
+
+    def process(self, messages):
+        """Deliver a claimed batch and record the outcome of every message"""
+        with self.app.app_context():
+            try:
+                results = self._run_handlers(messages)
+                now = datetime.utcnow()
+
+                delivered = [message[0] for message in messages if results.get(message[0]) is None]
+                if delivered:
+                    OutboxMessage.query.filter(OutboxMessage.id.in_(delivered))\
+                        .delete(synchronize_session=False)
+
+                for message_id, kind, _, attempts, max_attempts in messages:
+                    error = results.get(message_id)
+                    if error is None:
+                        continue
+                    print(f"[OUTBOX] {kind} message {message_id} failed (attempt {attempts}/{max_attempts}): {error}")
+                    values = {
+                        OutboxMessage.last_error: str(error)[:2000],
+                        OutboxMessage.locked_by: None,
+                        OutboxMessage.locked_until: None
+                    }
+                    if attempts >= max_attempts:
+                        values[OutboxMessage.status] = OutboxMessage.FAILED
+                        values[OutboxMessage.payload] = db.case(
+                            (OutboxMessage.sensitive, REDACTED_PAYLOAD), else_=OutboxMessage.payload
+                        )
+                    else:
+                        values[OutboxMessage.status] = OutboxMessage.PENDING
+                        values[OutboxMessage.available_at] = now + timedelta(seconds=self._backoff(attempts))
+                    OutboxMessage.query.filter_by(id=message_id).update(values, synchronize_session=False)
+
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                traceback.print_exc()
+            finally:
+                self._slots.release()
+
+    def run(self):
+        """Dispatcher loop"""
+        print(f"[OUTBOX] Worker pool started ({self.concurrency} threads)")
+        while True:
+            self._slots.acquire()
+            try:
+                messages = self.claim()
+            except Exception as e:
+                print(f"[OUTBOX] Claim failed: {str(e)}")
+                messages = []
+
+            if not messages:
+                self._slots.release()
+                _wake.wait(self.poll_interval)
+                _wake.clear()
+                continue
+
+            self._pool.submit(self.process, messages)
+
+
+def start_outbox_worker(app):
+    """Initialize and start this process's outbox dispatcher thread"""
+    # Handlers register themselves when their modules are imported
+    from app.utils import email, notifications, fanout  # noqa: F401
+
+    worker = OutboxWorker(app)
+    threading.Thread(target=worker.run, daemon=True, name="OutboxDispatcher").start()
+    return worker
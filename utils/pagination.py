@@ -0,0 +1,119 @@
+import base64
+import json
+from datetime import datetime
+from app.extensions import db
+
+
+class InvalidCursor(ValueError):
+    """Raised when a client sends a cursor we cannot decode"""
+    pass
+
+
+def encode_cursor(values):
+    """Encode the sort key of the last row into an opaque URL-safe token"""
+    encoded = []
+    for value in values:
+        if isinstance(value, datetime):
+            encoded.append({'dt': value.isoformat()})
+        else:
+            encoded.append(value)
+    raw = json.dumps(encoded, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token, expected_length):
+    """Decode a token produced by encode_cursor back into sort key values"""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (ValueError, TypeError):
+        raise InvalidCursor('Invalid cursor')
+
+    if not isinstance(values, list) or len(values) != expected_length:
+        raise InvalidCursor('Invalid cursor')
+
+    decoded = []
+    for value in values:
+        if isinstance(value, dict):
+            try:
+                value = datetime.fromisoformat(value['dt'])
+            except (KeyError, TypeError, ValueError):
+                raise InvalidCursor('Invalid cursor')
+        decoded.append(value)
+    return decoded
+
+
+class KeysetPage:
+    """One page of keyset pagination results"""
+
+    def __init__(self, items, next_cursor, limit, total=None):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.limit = limit
+        self.total = total
+
+    @property
+    def has_more(self):
+        return self.next_cursor is not None
+
+    def meta(self):
+        """Pagination fields to merge into the JSON response"""
+        data = {
+            'next_cursor': self.next_cursor,
+            'has_more': self.has_more,
+            'limit': self.limit
+        }
+        if self.total is not None:
+            data['total'] = self.total
+        return data
+
+
+def keyset_paginate(query, order, cursor=None, limit=20, with_total=False):
+    """Paginate a query by seeking past the last seen sort key.
+
+    Args:
+        query: Base query with all filters applied and no ORDER BY
+        order: List of (expression, descending, value_fn) tuples. The last
+            entry must be unique (normally the primary key). value_fn reads
+            the key from a result row; pass None to use the column attribute.
+        cursor: Token from a previous page's next_cursor, or empty/None for
+            the first page
+        limit: Page size
+        with_total: Also run a COUNT(*) over the filtered query
+
+    Returns:
+        KeysetPage
+    """
+    limit = max(limit, 1)
+    total = query.order_by(None).count() if with_total else None
+
+    if cursor:
+        values = decode_cursor(cursor, len(order))
+
+        # (a, b, c) past (x, y, z)  =>  a > x OR (a = x AND b > y) OR ...
+        # Bind as typed literals so booleans (e.g. is_pinned) compare with < / >
+        bound = [db.literal(value, type_=expression.type) for value, (expression, _, _) in zip(values, order)]
+        clauses = []
+        for i, (expression, descending, _) in enumerate(order):
+            equal_prefix = [order[j][0] == bound[j] for j in range(i)]
+            step = expression < bound[i] if descending else expression > bound[i]
+            clauses.append(db.and_(*equal_prefix, step))
+        query = query.filter(db.or_(*clauses))
+
+    query = query.order_by(*[
+        expression.desc() if descending else expression.asc()
+        for expression, descending, _ in order
+    ])
+
+    rows = query.limit(limit + 1).all()
+    items = rows[:limit]
+
+    next_cursor = None
+    if len(rows) > limit:
+        last = items[-1]
+        next_cursor = encode_cursor([
+            value_fn(last) if value_fn else getattr(last, expression.key)
+            for expression, descending, value_fn in order
+        ])
+
+    return KeysetPage(items, next_cursor, limit, total)
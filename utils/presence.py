@@ -0,0 +1,494 @@
+import atexit
+import threading
+import time
+import traceback
+from collections import deque
+from datetime import datetime, timedelta
+from sqlalchemy import select, insert, update
+from sqlalchemy.exc import IntegrityError
+from app.extensions import db
+from app.models.listener_stats import RingSeries
+from app.utils.hyperloglog import HyperLogLog
+from app.utils.metrics import registry
+
+HEARTBEATS = registry.counter(
+    'campuswave_presence_heartbeats_total', 'Listener heartbeats received')
+PERSISTED = registry.counter(
+    'campuswave_presence_persisted_total', 'Listener sessions written to radio_listeners by flushes')
+REAPED = registry.counter(
+    'campuswave_presence_reaped_total', 'Stale radio_listeners rows deleted')
+REAP_SECONDS = registry.histogram(
+    'campuswave_presence_reap_seconds', 'Duration of one stale listener reap')
+
+# Presence channels: the 24/7 stream and one per live podcast
+STREAM_CHANNEL = 'stream'
+
+
+def podcast_channel(podcast_id):
+    return f'podcast:{podcast_id}'
+
+
+class MemoryPresenceBackend:
+    """Per-process presence: sessions grouped into time buckets.
+
+    A heartbeat moves its session into the current bucket; buckets that
+    fall out of the timeout window are dropped whole, so the active count is
+    simply the number of tracked sessions. Only heartbeats received by this
+    worker are counted.
+    """
+
+    def __init__(self, timeout, bucket_seconds):
+        self.timeout = timeout
+        self.bucket_seconds = bucket_seconds
+        self._sessions = {}     # session_id -> bucket
+        self._buckets = {}      # bucket -> {session_id}
+        self._order = deque()   # buckets, oldest first
+        self._lock = threading.Lock()
+
+    def _bucket(self, timestamp):
+        return int(timestamp // self.bucket_seconds)
+
+    def _expire(self, now):
+        horizon = self._bucket(now - self.timeout)
+        while self._order and self._order[0] < horizon:
+            for session_id in self._buckets.pop(self._order.popleft()):
+                del self._sessions[session_id]
+
+    def touch(self, session_id, now):
+        bucket = self._bucket(now)
+        with self._lock:
+            self._expire(now)
+            previous = self._sessions.get(session_id)
+            if previous is not None and previous >= bucket:
+                return
+            if previous is not None:
+                self._buckets[previous].discard(session_id)
+            self._sessions[session_id] = bucket
+            if bucket not in self._buckets:
+                self._buckets[bucket] = set()
+                self._order.append(bucket)
+            self._buckets[bucket].add(session_id)
+
+    def count(self, now):
+        with self._lock:
+            self._expire(now)
+            return len(self._sessions)
+
+
+class RedisPresenceBackend:
+    """Presence shared by every worker: per channel, one sorted set of
+    session -> last heartbeat.
+
+    Requires the optional 'redis' package.
+    """
+
+    def __init__(self, url, timeout, prefix='campuswave:presence:'):
+        import redis
+        self.timeout = timeout
+        self.prefix = prefix
+        self._client = redis.Redis.from_url(url)
+
+    def touch(self, channel, session_id, now):
+        self._client.zadd(f'{self.prefix}{channel}', {session_id: now})
+
+    def count(self, channel, now):
+        key = f'{self.prefix}{channel}'
+        pipe = self._client.pipeline()
+        pipe.zremrangebyscore(key, '-inf', now - self.timeout)
+        pipe.zcard(key)
+        return pipe.execute()[1]
+
+    def clear(self, channel):
+        self._client.delete(f'{self.prefix}{channel}')
+
+
+class PresenceRegistry:
+    """Live listener presence for the 24/7 stream and live podcasts.
+
+    Heartbeats are queued for the database (stream sessions for
+    radio_listeners, podcast sessions for channel_presence) and added to
+    this worker's unique-listener sketch for the channel and day; periodic
+    batched flushes (PRESENCE_FLUSH_INTERVAL) write both. Without a running
+    flusher (CLI, tests) each heartbeat is written at once.
+
+    listener_count() depends on PRESENCE_BACKEND:
+        database: active rows in those tables, shared by every worker but up
+            to one flush interval behind (the default)
+        redis: one sorted set per channel, shared and current. If Redis is
+            down the database count is used, never a per-worker one
+        memory: heartbeats seen by this worker only; single-worker setups
+    """
+
+    BACKENDS = ('database', 'redis', 'memory')
+
+    def __init__(self):
+        self.timeout = 300
+        self.bucket_seconds = 10
+        self.backend = 'database'
+        self.redis = None
+        self.logger = None
+        self.app = None
+        self._local = {}
+        self._pending = {}
+        self._channel_pending = {}  # (channel, session_id) -> last heartbeat
+        self._sketches = {}     # (channel, day) -> HyperLogLog
+        self._db_counts = {}    # channel -> (expires, count)
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+
+    def init_app(self, app):
+        self.logger = app.logger
+        self.timeout = app.config.get('PRESENCE_TIMEOUT_SECONDS', 300)
+        self.bucket_seconds = app.config.get('PRESENCE_BUCKET_SECONDS', 10)
+        self._local = {}
+        self._db_counts = {}
+        self.redis = None
+
+        self.backend = app.config.get('PRESENCE_BACKEND', 'database')
+        if self.backend not in self.BACKENDS:
+            raise ValueError(f"PRESENCE_BACKEND must be one of {', '.join(self.BACKENDS)}, not {self.backend!r}")
+        if self.backend == 'redis':
+            try:
+                self.redis = RedisPresenceBackend(app.config['PRESENCE_REDIS_URL'], self.timeout)
+            except Exception as e:
+                app.logger.error(f"Redis presence unavailable, counting from the database: {e}")
+        elif self.backend == 'memory':
+            app.logger.warning("PRESENCE_BACKEND=memory counts listeners per worker; use it with one worker only")
+
+        app.extensions['campuswave_presence'] = self
+
+    @property
+    def shared(self):
+        """True when every worker sees the same listener counts"""
+        return self.backend != 'memory'
+
+    @property
+    def running(self):
+        return self.app is not None
+
+    @property
+    def timeout_minutes(self):
+        return self.timeout // 60
+
+    def _log_error(self, action, error):
+        if self.logger:
+            self.logger.error(f"Presence {action} failed: {error}")
+
+    def _local_for(self, channel):
+        backend = self._local.get(channel)
+        if backend is None:
+            with self._lock:
+                backend = self._local.setdefault(
+                    channel, MemoryPresenceBackend(self.timeout, self.bucket_seconds)
+                )
+        return backend
+
+    def heartbeat(self, session_id, user_id=None, ip_address=None, device_info=None, channel=STREAM_CHANNEL):
+        """Record a heartbeat for session_id on a channel"""
+        now = time.time()
+        if self.backend == 'memory':
+            self._local_for(channel).touch(session_id, now)
+        elif self.redis is not None:
+            try:
+                self.redis.touch(channel, session_id, now)
+            except Exception as e:
+                self._log_error('touch', e)
+        HEARTBEATS.inc(channel='stream' if channel == STREAM_CHANNEL else 'podcast')
+
+        # Signed-in users count once across devices
+        listener = f'user:{user_id}' if user_id else f'session:{session_id}'
+        key = (channel, datetime.utcnow().date())
+        with self._lock:
+            sketch = self._sketches.get(key)
+            if sketch is None:
+                sketch = self._sketches[key] = HyperLogLog()
+            sketch.add(listener)
+
+            # radio_listeners only records the 24/7 stream
+            if channel == STREAM_CHANNEL:
+                entry = self._pending.get(session_id)
+                if entry:
+                    entry['last_heartbeat'] = datetime.utcnow()
+                    entry['user_id'] = entry['user_id'] or user_id
+                else:
+                    self._pending[session_id] = {
+                        'user_id': user_id,
+                        'ip_address': ip_address,
+                        'device_info': device_info,
+                        'last_heartbeat': datetime.utcnow()
+                    }
+            else:
+                self._channel_pending[(channel, session_id)] = datetime.utcnow()
+        if not self.running:
+            self.flush()
+
+    def listener_count(self, channel=STREAM_CHANNEL):
+        """Sessions with a heartbeat on channel inside the timeout window"""
+        now = time.time()
+        if self.backend == 'memory':
+            return self._local_for(channel).count(now)
+        if self.redis is not None:
+            try:
+                return self.redis.count(channel, now)
+            except Exception as e:
+                self._log_error('count', e)
+        return self._db_count(channel)
+
+    def _db_count(self, channel):
+        """Active sessions from the flushed tables, memoized for one bucket"""
+        from app.models.listener_stats import ChannelPresence
+        from app.models.radio_listener import RadioListener
+
+        expires, count = self._db_counts.get(channel, (0, 0))
+        if time.monotonic() < expires:
+            return count
+        cutoff = datetime.utcnow() - timedelta(seconds=self.timeout)
+        if channel == STREAM_CHANNEL:
+            count = db.session.scalar(
+                select(db.func.count()).select_from(RadioListener).where(RadioListener.last_heartbeat >= cutoff)
+            )
+        else:
+            count = ChannelPresence.active_count(channel, cutoff)
+        self._db_counts[channel] = (time.monotonic() + self.bucket_seconds, count)
+        return count
+
+    def end_channel(self, channel):
+        """Forget a podcast channel once the podcast has ended; the caller commits.
+
+        Drops this worker's in-memory state and queued heartbeats for it and
+        its channel_presence rows. Other workers drop their idle channels on
+        their next flush.
+        """
+        from app.models.listener_stats import ChannelPresence
+
+        with self._lock:
+            self._local.pop(channel, None)
+            self._db_counts.pop(channel, None)
+            for key in [key for key in self._channel_pending if key[0] == channel]:
+                del self._channel_pending[key]
+        ChannelPresence.clear(channel)
+        if self.redis is not None:
+            try:
+                self.redis.clear(channel)
+            except Exception as e:
+                self._log_error('clear', e)
+
+    def _drop_idle_channels(self, now):
+        """Remove podcast channels with no active sessions from _local"""
+        with self._lock:
+            for channel in [channel for channel in self._local if channel != STREAM_CHANNEL]:
+                if self._local[channel].count(now) == 0:
+                    del self._local[channel]
+
+    def start(self, app):
+        """Start the flusher (the memory backend is first seeded from recent radio_listeners rows)"""
+        from app.models.radio_listener import RadioListener
+
+        if self.backend == 'memory':
+            with app.app_context():
+                cutoff = datetime.utcnow() - timedelta(seconds=self.timeout)
+                offset = time.time() - datetime.utcnow().timestamp()
+                for session_id, last_heartbeat in db.session.query(
+                    RadioListener.session_id, RadioListener.last_heartbeat
+                ).filter(RadioListener.last_heartbeat >= cutoff).order_by(RadioListener.last_heartbeat).all():
+                    self._local_for(STREAM_CHANNEL).touch(session_id, last_heartbeat.timestamp() + offset)
+
+        self.app = app
+        interval = app.config.get('PRESENCE_FLUSH_INTERVAL', 30)
+        threading.Thread(target=self._run, args=(interval,), daemon=True, name="PresenceFlusher").start()
+        atexit.register(self.flush)
+
+    def _run(self, interval):
+        while True:
+            time.sleep(interval)
+            try:
+                self.flush()
+            except Exception:
+                traceback.print_exc()
+
+    def flush(self):
+        """Upsert queued heartbeats into radio_listeners and channel_presence
+        and merge the unique-listener sketches; returns sessions written"""
+        from flask import current_app
+
+        with self._flush_lock:
+            self._drop_idle_channels(time.time())
+            with self._lock:
+                batch, self._pending = self._pending, {}
+                channel_batch, self._channel_pending = self._channel_pending, {}
+                sketches, self._sketches = self._sketches, {}
+            if not batch and not channel_batch and not sketches:
+                return 0
+
+            app = self.app or current_app._get_current_object()
+            try:
+                with app.app_context():
+                    try:
+                        self._write(batch, channel_batch, sketches)
+                    except IntegrityError:
+                        # Another worker inserted one of these rows first
+                        self._write(batch, channel_batch, sketches)
+                # This worker's counts include what it just wrote
+                self._db_counts = {}
+                PERSISTED.inc(len(batch) + len(channel_batch))
+                return len(batch) + len(channel_batch)
+            except Exception as e:
+                print(f"[PRESENCE] Flush failed, will retry: {str(e)}")
+                with self._lock:
+                    for session_id, entry in batch.items():
+                        self._pending.setdefault(session_id, entry)
+                    for key, last_heartbeat in channel_batch.items():
+                        self._channel_pending.setdefault(key, last_heartbeat)
+                    # Merging is idempotent, so a partly applied batch can be retried as is
+                    for key, sketch in sketches.items():
+                        if key in self._sketches:
+                            self._sketches[key].merge(sketch)
+                        else:
+                            self._sketches[key] = sketch
+                if not self.running:
+                    raise
+                return 0
+
+    def _write(self, batch, channel_batch, sketches):
+        from app.models.listener_stats import ListenerSketch, ChannelPresence
+        from app.models.radio_listener import RadioListener
+
+        try:
+            for (channel, day), sketch in sketches.items():
+                ListenerSketch.merge(channel, day, sketch)
+
+            if channel_batch:
+                keys = list(channel_batch)
+                existing = set()
+                for start in range(0, len(keys), 500):
+                    existing.update(tuple(row) for row in db.session.execute(
+                        select(ChannelPresence.channel, ChannelPresence.session_id)
+                        .where(db.tuple_(ChannelPresence.channel, ChannelPresence.session_id).in_(keys[start:start + 500]))
+                    ).all())
+                rows = [
+                    {'channel': channel, 'session_id': session_id, 'last_heartbeat': last_heartbeat}
+                    for (channel, session_id), last_heartbeat in channel_batch.items()
+                ]
+                new_rows = [row for row in rows if (row['channel'], row['session_id']) not in existing]
+                changed_rows = [row for row in rows if (row['channel'], row['session_id']) in existing]
+                if new_rows:
+                    db.session.execute(insert(ChannelPresence), new_rows)
+                if changed_rows:
+                    db.session.execute(update(ChannelPresence), changed_rows)
+
+            session_ids = list(batch)
+            existing = {}
+            for start in range(0, len(session_ids), 500):
+                for row_id, session_id, user_id in db.session.execute(
+                    select(RadioListener.id, RadioListener.session_id, RadioListener.user_id)
+                    .where(RadioListener.session_id.in_(session_ids[start:start + 500]))
+                ).all():
+                    existing[session_id] = (row_id, user_id)
+
+            new_rows = [
+                dict(entry, session_id=session_id, joined_at=entry['last_heartbeat'])
+                for session_id, entry in batch.items() if session_id not in existing
+            ]
+            if new_rows:
+                db.session.execute(insert(RadioListener), new_rows)
+
+            changed_rows = []
+            for session_id, (row_id, user_id) in existing.items():
+                entry = batch[session_id]
+                changed_rows.append({
+                    'id': row_id,
+                    'last_heartbeat': entry['last_heartbeat'],
+                    'user_id': user_id or entry['user_id']
+                })
+            if changed_rows:
+                db.session.execute(update(RadioListener), changed_rows)
+
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+
+presence = PresenceRegistry()
+
+
+def sample_listener_counts(capacity=1440):
+    """Record this minute's listener count for the stream and each live podcast.
+
+    Appends to each channel's per-minute ring series, folds the sample into
+    the hourly/daily rollups and raises LivePodcast.listener_peak_count.
+    Run once a minute by the scheduler leader inside an app context, and
+    only when presence is shared (a per-worker count is not a sample); a
+    minute that already has a sample is skipped, so a leader change cannot
+    count it twice.
+    """
+    from app.models.listener_stats import ListenerSeries, ListenerRollup
+    from app.models.live_podcast import LivePodcast, PodcastStatus
+
+    now = datetime.utcnow()
+    minute = int(time.time() // 60)
+    podcast_ids = db.session.scalars(
+        select(LivePodcast.id).where(LivePodcast.status == PodcastStatus.LIVE)
+    ).all()
+    channels = [(STREAM_CHANNEL, None)] + [(podcast_channel(podcast_id), podcast_id) for podcast_id in podcast_ids]
+
+    try:
+        for channel, podcast_id in channels:
+            count = presence.listener_count(channel)
+
+            series = db.session.get(ListenerSeries, channel)
+            if series is None:
+                series = ListenerSeries(channel=channel, capacity=capacity)
+                ring = RingSeries(capacity)
+                db.session.add(series)
+            else:
+                ring = series.ring() if series.capacity == capacity else RingSeries(capacity)
+            if ring.get(minute) is not None:
+                continue
+            ring.record(minute, count)
+            series.store(ring)
+            ListenerRollup.add_sample(channel, now, count)
+
+            if podcast_id is not None:
+                LivePodcast.query.filter(
+                    LivePodcast.id == podcast_id,
+                    db.or_(LivePodcast.listener_peak_count.is_(None), LivePodcast.listener_peak_count < count)
+                ).update({LivePodcast.listener_peak_count: count}, synchronize_session=False)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+
+def reap_stale_listeners(batch_size=1000, max_batches=None, archive=False):
+    """Delete radio_listeners and channel_presence rows idle for longer than
+    the presence timeout.
+    
+    Call inside an app context; returns the number of rows removed.
+    """
+    from app.models.listener_stats import ChannelPresence
+    from app.models.radio_listener import RadioListener
+    
+    started = time.perf_counter()
+    try:
+        removed = RadioListener.cleanup_stale(
+            timeout_minutes=max(presence.timeout_minutes, 1),
+            batch_size=batch_size,
+            max_batches=max_batches,
+            archive=archive
+        )
+        removed += ChannelPresence.cleanup_stale(
+            datetime.utcnow() - timedelta(seconds=max(presence.timeout, 60)),
+            batch_size=batch_size,
+            max_batches=max_batches
+        )
+    finally:
+        REAP_SECONDS.observe(time.perf_counter() - started)
+    REAPED.inc(removed)
+    return removed
+
+
+def start_presence_flusher(app):
+    """Start batching listener heartbeats in this process"""
+    presence.start(app)
+    return presence
@@ -1,17 +1,46 @@
+import atexit
+import heapq
+import os
+import socket
 import threading
 import time
+import uuid
 from datetime import datetime
 from flask import current_app
+from app.utils.metrics import registry
 
-def check_and_update_radio_statuses(app):
+TICK_SECONDS = registry.histogram(
+    'campuswave_scheduler_tick_seconds', 'Duration of a scheduler status pass')
+TICKS = registry.counter(
+    'campuswave_scheduler_ticks_total', 'Scheduler status passes by trigger and outcome')
+ROWS_EXAMINED = registry.counter(
+    'campuswave_scheduler_rows_examined_total', 'Radio rows loaded by scheduler queries')
+TRANSITIONS = registry.counter(
+    'campuswave_scheduler_transitions_total', 'Radio status transitions made by the scheduler')
+START_LAG = registry.histogram(
+    'campuswave_scheduler_start_lag_seconds', 'Delay between a radio start_time and its auto-start')
+LEADER = registry.gauge(
+    'campuswave_scheduler_leader', '1 if this worker holds the scheduler lease')
+PENDING_DEADLINES = registry.gauge(
+    'campuswave_scheduler_pending_deadlines', 'Start/end deadlines queued in the scheduler heap')
+LAST_TICK = registry.gauge(
+    'campuswave_scheduler_last_tick_timestamp_seconds', 'Unix time of the last completed status pass')
+
+def check_and_update_radio_statuses(app, trigger='manual'):
     """Check and update radio statuses based on current time"""
+    started = time.perf_counter()
+    outcome = 'ok'
     with app.app_context():
         try:
             from app.extensions import db
             from app.models.radio import Radio, RadioStatus, HostStatus, MediaType
-            from app.models.radio_subscription import RadioSubscription
-            from app.models.notification import Notification
             from app.models.live_stream import LiveStream
+            from app.models.notification_fanout import NotificationFanout
+            from app.utils.cache import bump_radio_lists
+            from app.utils.fanout import queue_fanout
+            from app.utils.notifications import queue_topic_notification, radio_topic
+            from app.utils.events import publish_live_stream, publish_radio_status
+            from app.utils.stream_state import bump_live_stream_version
             
             # Use server local time for comparisons since DB stores naive datetimes
             # IMPORTANT: All comparisons must be consistent with how radios are saved
@@ -23,6 +52,8 @@ def check_and_update_radio_statuses(app):
                 Radio.start_time <= now,
                 Radio.end_time > now
             ).all()
+            ROWS_EXAMINED.inc(len(radios_to_start), query='start')
+            started_count = 0
             
             for radio in radios_to_start:
                 # CRITICAL: Logic Ownership - Cannot go LIVE without media
@@ -39,18 +70,24 @@ def check_and_update_radio_statuses(app):
                     radio.media_type = MediaType.AUDIO
                 
                 radio.stream_started_at = now
+                publish_radio_status(radio)
+                START_LAG.observe(max((now - radio.start_time).total_seconds(), 0))
                 
-                # Notify subscribers
-                subscribers = RadioSubscription.query.filter_by(radio_id=radio.id).all()
-                for sub in subscribers:
-                    notification = Notification(
-                        user_id=sub.user_id,
-                        title=f"📻 {radio.title} is Now Live!",
-                        message=f"{radio.title} has started. Join now to listen!",
-                        type="RADIO_LIVE",
-                        related_id=radio.id
-                    )
-                    db.session.add(notification)
+                # Notify subscribers (delivered in bulk once this commits)
+                started_count += 1
+                queue_fanout(
+                    NotificationFanout.RADIO_SUBSCRIBERS,
+                    title=f"📻 {radio.title} is Now Live!",
+                    message=f"{radio.title} has started. Join now to listen!",
+                    type="RADIO_LIVE",
+                    related_id=radio.id,
+                    audience_id=radio.id
+                )
+                queue_topic_notification(
+                    radio_topic(radio.id),
+                    title=f"📻 {radio.title} is Now Live!",
+                    body=f"{radio.title} has started. Join now to listen!"
+                )
                 
                 # CRITICAL: Update Global LiveStream for Student Player
                 stream = LiveStream.query.first()
@@ -63,6 +100,8 @@ def check_and_update_radio_statuses(app):
                 stream.started_at = now
                 stream.title = radio.title
                 stream.description = radio.description
+                bump_live_stream_version()
+                publish_live_stream(stream)
                 
                 print(f"[SCHEDULER] Auto-started radio: {radio.title} and synced to Global Stream")
             
@@ -71,18 +110,21 @@ def check_and_update_radio_statuses(app):
                 Radio.status == RadioStatus.LIVE,
                 Radio.end_time <= now
             ).all()
+            ROWS_EXAMINED.inc(len(radios_to_end), query='end')
             
             for radio in radios_to_end:
                 print(f"[SCHEDULER] Found radio to end: {radio.title} (ID: {radio.id}, End: {radio.end_time}, Now: {now})")
                 radio.status = RadioStatus.COMPLETED
                 radio.host_status = HostStatus.ENDED
-
+                publish_radio_status(radio)
 
                 # CRITICAL: Clear Global LiveStream if this radio was playing
                 stream = LiveStream.query.first()
                 if stream and stream.current_audio_id == radio.id:
                     stream.status = 'OFFLINE'
                     stream.current_audio_id = None
+                    bump_live_stream_version()
+                    publish_live_stream(stream)
                     print(f"[SCHEDULER] Cleared Global Stream for ended radio: {radio.title}")
 
                 print(f"[SCHEDULER] Auto-ended radio: {radio.title}")
@@ -92,18 +134,26 @@ def check_and_update_radio_statuses(app):
                 Radio.status == RadioStatus.UPCOMING,
                 Radio.end_time <= now
             ).all()
+            ROWS_EXAMINED.inc(len(radios_missed), query='missed')
             
             for radio in radios_missed:
                 print(f"[SCHEDULER] Found missed radio: {radio.title} (ID: {radio.id})")
                 radio.status = RadioStatus.COMPLETED
                 radio.host_status = HostStatus.ENDED
+                publish_radio_status(radio)
             
             # Commit all changes
             if radios_to_start or radios_to_end or radios_missed:
+                bump_radio_lists()
                 db.session.commit()
+                
+                TRANSITIONS.inc(started_count, kind='started')
+                TRANSITIONS.inc(len(radios_to_end), kind='ended')
+                TRANSITIONS.inc(len(radios_missed), kind='missed')
                 print(f"[SCHEDULER] Updated: {len(radios_to_start)} started, {len(radios_to_end)} ended, {len(radios_missed)} missed")
             
         except Exception as e:
+            outcome = 'error'
             print(f"[SCHEDULER] Error updating statuses: {str(e)}")
             import traceback
             traceback.print_exc()
@@ -111,27 +161,265 @@ def check_and_update_radio_statuses(app):
                 db.session.rollback()
             except:
                 pass
+        
+        TICK_SECONDS.observe(time.perf_counter() - started, trigger=trigger)
+        TICKS.inc(trigger=trigger, outcome=outcome)
+        LAST_TICK.set(time.time())
 
-def run_scheduler(app):
-    """Background thread that runs the scheduler"""
-    print("[SCHEDULER] Background scheduler started")
+class RadioScheduler:
+    """Runs radio lifecycle transitions at their start/end deadlines.
     
-    while True:
-        try:
-            check_and_update_radio_statuses(app)
-        except Exception as e:
-            print(f"[SCHEDULER] Error in scheduler loop: {str(e)}")
+    Keeps a min-heap of upcoming start_time/end_time deadlines and sleeps until
+    the next one instead of polling every few seconds. Radio writes in this
+    process wake it immediately through wake(); writes in other workers bump
+    the 'radio_schedule' content version, which is probed with a single
+    primary-key lookup. A full reconcile pass still runs periodically as a
+    safety net.
+    
+    Every gunicorn worker starts one of these, but only the worker holding the
+    'radio_scheduler' lease runs transitions; the rest stay on standby and
+    retry the lease each heartbeat, taking over if the leader stops renewing.
+    The leader renews between the phases of a tick as well, so a slow phase
+    cannot outlive the lease, and drops the rest of the tick once renewal fails.
+    """
+    
+    LEASE_NAME = 'radio_scheduler'
+    
+    def __init__(self, app):
+        self.app = app
+        self.reconcile_interval = app.config.get('SCHEDULER_RECONCILE_INTERVAL', 300)
+        self.probe_interval = app.config.get('SCHEDULER_PROBE_INTERVAL', 5)
+        self._deadlines = []
+        self._schedule_version = None
+        self._reload = True
+        self._wake = threading.Event()
+        self.lease_ttl = app.config.get('SCHEDULER_LEASE_TTL', 30)
+        self.heartbeat_interval = max(self.lease_ttl / 3, 1)
+        self.holder = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.is_leader = False
+        self._next_heartbeat = 0
+        self.badge_reconcile_interval = app.config.get('NOTIFICATION_BADGE_RECONCILE_INTERVAL', 3600)
+        self._next_badge_reconcile = time.monotonic() + self.badge_reconcile_interval
+        self.listener_sample_interval = app.config.get('LISTENER_SAMPLE_INTERVAL', 60)
+        self.listener_series_minutes = app.config.get('LISTENER_SERIES_MINUTES', 1440)
+        self._next_listener_sample = 0
+        self._listener_sampling_skipped = False
+        self.listener_reap_interval = app.config.get('LISTENER_REAP_INTERVAL', 300)
+        self._next_listener_reap = time.monotonic() + self.listener_reap_interval
+    
+    def wake(self):
+        """Reload deadlines now (a radio was created, changed or deleted)"""
+        self._reload = True
+        self._wake.set()
+    
+    def _heartbeat(self):
+        """Acquire or renew the leader lease when due; returns is_leader"""
+        if time.monotonic() < self._next_heartbeat:
+            return self.is_leader
+        
+        with self.app.app_context():
+            from app.models.scheduler_lease import SchedulerLease
+            try:
+                leader = SchedulerLease.acquire(self.LEASE_NAME, self.holder, self.lease_ttl)
+            except Exception as e:
+                print(f"[SCHEDULER] Lease heartbeat failed: {str(e)}")
+                leader = False
         
-        # Wait 10 seconds before next check (reduced from 30 for faster updates)
-        time.sleep(10)
+        self._next_heartbeat = time.monotonic() + self.heartbeat_interval
+        if leader and not self.is_leader:
+            print(f"[SCHEDULER] {self.holder} became scheduler leader")
+            self._reload = True
+        elif self.is_leader and not leader:
+            print(f"[SCHEDULER] {self.holder} lost scheduler leadership, standing by")
+            self._deadlines = []
+        self.is_leader = leader
+        LEADER.set(1 if leader else 0)
+        return leader
+    
+    def release(self):
+        """Hand the lease back on shutdown so a standby takes over right away"""
+        if not self.is_leader:
+            return
+        self.is_leader = False
+        LEADER.set(0)
+        with self.app.app_context():
+            from app.models.scheduler_lease import SchedulerLease
+            try:
+                SchedulerLease.release(self.LEASE_NAME, self.holder)
+            except Exception as e:
+                print(f"[SCHEDULER] Could not release lease: {str(e)}")
+    
+    def _reconcile_badges(self):
+        """Periodic repair of unread badge counters (leader only)"""
+        with self.app.app_context():
+            from app.extensions import db
+            from app.models.notification_badge import NotificationBadge
+            try:
+                NotificationBadge.reconcile()
+                print("[SCHEDULER] Notification badges reconciled")
+            except Exception as e:
+                db.session.rollback()
+                print(f"[SCHEDULER] Badge reconcile failed: {str(e)}")
+        self._next_badge_reconcile = time.monotonic() + self.badge_reconcile_interval
+    
+    def _sample_listeners(self):
+        """Per-minute listener samples and rollups (leader only)"""
+        from app.utils.presence import presence, sample_listener_counts
+        if not presence.shared:
+            # The leader would record only the listeners of its own worker
+            if not self._listener_sampling_skipped:
+                print("[SCHEDULER] Listener sampling skipped: PRESENCE_BACKEND=memory counts per worker")
+                self._listener_sampling_skipped = True
+        else:
+            with self.app.app_context():
+                try:
+                    sample_listener_counts(self.listener_series_minutes)
+                except Exception as e:
+                    print(f"[SCHEDULER] Listener sampling failed: {str(e)}")
+        self._next_listener_sample = time.monotonic() + self.listener_sample_interval
+    
+    def _reap_listeners(self):
+        """Delete idle radio_listeners rows in bounded batches (leader only)"""
+        with self.app.app_context():
+            from app.utils.presence import reap_stale_listeners
+            try:
+                removed = reap_stale_listeners(
+                    batch_size=self.app.config.get('LISTENER_REAP_BATCH_SIZE', 1000),
+                    max_batches=self.app.config.get('LISTENER_REAP_MAX_BATCHES', 20),
+                    archive=self.app.config.get('LISTENER_ARCHIVE_SESSIONS', True)
+                )
+                if removed:
+                    print(f"[SCHEDULER] Reaped {removed} stale listeners")
+            except Exception as e:
+                print(f"[SCHEDULER] Listener reap failed: {str(e)}")
+        self._next_listener_reap = time.monotonic() + self.listener_reap_interval
+    
+    def _load_deadlines(self):
+        """Rebuild the deadline heap from UPCOMING and LIVE radios"""
+        with self.app.app_context():
+            from app.extensions import db
+            from app.models.radio import Radio, RadioStatus
+            from app.models.content_version import ContentVersion
+            
+            rows = db.session.query(Radio.id, Radio.status, Radio.start_time, Radio.end_time).filter(
+                Radio.status.in_([RadioStatus.UPCOMING, RadioStatus.LIVE])
+            ).all()
+            self._schedule_version = ContentVersion.get('radio_schedule')[0]
+        ROWS_EXAMINED.inc(len(rows), query='deadlines')
+        
+        deadlines = []
+        for radio_id, status, start_time, end_time in rows:
+            if status == RadioStatus.UPCOMING:
+                deadlines.append((start_time, radio_id))
+            deadlines.append((end_time, radio_id))
+        heapq.heapify(deadlines)
+        self._deadlines = deadlines
+        PENDING_DEADLINES.set(len(deadlines))
+    
+    def _schedule_changed(self):
+        """Cheap probe for radio writes made by other worker processes"""
+        with self.app.app_context():
+            from app.models.content_version import ContentVersion
+            return ContentVersion.get('radio_schedule')[0] != self._schedule_version
+    
+    def _pop_due(self, now):
+        """Drop every deadline that has passed; True if any did"""
+        due = False
+        while self._deadlines and self._deadlines[0][0] <= now:
+            heapq.heappop(self._deadlines)
+            due = True
+        PENDING_DEADLINES.set(len(self._deadlines))
+        return due
+    
+    def _next_timeout(self, next_reconcile):
+        now = time.monotonic()
+        timeout = min(self.probe_interval, max(next_reconcile - now, 0),
+                      max(self._next_heartbeat - now, 0), max(self._next_badge_reconcile - now, 0),
+                      max(self._next_listener_sample - now, 0), max(self._next_listener_reap - now, 0))
+        if self._deadlines:
+            until_deadline = (self._deadlines[0][0] - datetime.now()).total_seconds()
+            timeout = min(timeout, max(until_deadline, 0))
+        return timeout
+    
+    def run(self):
+        """Background thread loop"""
+        print("[SCHEDULER] Background scheduler started")
+        next_reconcile = 0
+        
+        while True:
+            timeout = self.probe_interval
+            try:
+                if not self._heartbeat():
+                    # Standby: another worker owns the lifecycle loop
+                    next_reconcile = 0
+                    self._wake.wait(max(self._next_heartbeat - time.monotonic(), 0))
+                    self._wake.clear()
+                    continue
+                
+                if time.monotonic() >= next_reconcile:
+                    # Safety net: full status pass, then rebuild the heap
+                    check_and_update_radio_statuses(self.app, trigger='reconcile')
+                    next_reconcile = time.monotonic() + self.reconcile_interval
+                    self._reload = True
+                elif not self._reload and self._schedule_changed():
+                    self._reload = True
+                
+                # Each phase below re-checks the lease (renewing it when due), so
+                # a lost lease skips the rest of the tick
+                if self._reload and self._heartbeat():
+                    self._reload = False
+                    self._load_deadlines()
+                
+                if time.monotonic() >= self._next_badge_reconcile and self._heartbeat():
+                    self._reconcile_badges()
+                
+                if time.monotonic() >= self._next_listener_sample and self._heartbeat():
+                    self._sample_listeners()
+                
+                if time.monotonic() >= self._next_listener_reap and self._heartbeat():
+                    self._reap_listeners()
+                
+                if self._heartbeat() and self._pop_due(datetime.now()):
+                    check_and_update_radio_statuses(self.app, trigger='deadline')
+                
+                timeout = self._next_timeout(next_reconcile)
+            except Exception as e:
+                print(f"[SCHEDULER] Error in scheduler loop: {str(e)}")
+            
+            self._wake.wait(timeout)
+            self._wake.clear()
+
+
+_scheduler = None
+
+def wake_scheduler():
+    """Tell every worker's scheduler that radio start/end times or statuses changed.
+    
+    Call after committing a radio change, inside an app context.
+    """
+    from app.extensions import db
+    from app.models.content_version import ContentVersion
+    
+    try:
+        ContentVersion.bump('radio_schedule')
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        print(f"[SCHEDULER] Could not bump schedule version: {str(e)}")
+    
+    if _scheduler is not None:
+        _scheduler.wake()
 
 def start_background_scheduler(app):
     """Initialize and start the background scheduler thread"""
+    global _scheduler
+    _scheduler = RadioScheduler(app)
+    
     scheduler_thread = threading.Thread(
-        target=run_scheduler,
-        args=(app,),
+        target=_scheduler.run,
         daemon=True,  # Thread will exit when main program exits
         name="RadioScheduler"
     )
     scheduler_thread.start()
+    atexit.register(_scheduler.release)
     print("[SCHEDULER] Background scheduler thread initialized")
@@ -0,0 +1,53 @@
+import re
+from app.extensions import db
+
+# InnoDB ignores FULLTEXT tokens shorter than innodb_ft_min_token_size (default 3)
+MIN_FULLTEXT_TOKEN = 3
+
+
+def tokenize(term):
+    """Split a search string into lowercase word tokens"""
+    return [token.lower() for token in re.findall(r'\w+', term or '')]
+
+
+def _escape_like(token):
+    return token.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+def build_search(columns, term):
+    """Build a WHERE criterion and a relevance expression for a text search.
+
+    On MySQL this uses MATCH ... AGAINST in boolean mode against the FULLTEXT
+    index covering exactly these columns, with every word required and
+    prefix-matched (``+word*``). Other dialects (the SQLite testing config)
+    fall back to LIKE with a simple score that favours the first column.
+
+    Args:
+        columns: Columns covered by the model's FULLTEXT index, in index order
+        term: Raw search string from the client
+
+    Returns:
+        (criterion, relevance) tuple, or (None, None) if the term has no words
+    """
+    tokens = tokenize(term)
+    if not tokens:
+        return None, None
+
+    fulltext_tokens = [token for token in tokens if len(token) >= MIN_FULLTEXT_TOKEN]
+    if db.engine.dialect.name == 'mysql' and fulltext_tokens:
+        from sqlalchemy.dialects.mysql import match
+
+        against = ' '.join(f'+{token}*' for token in fulltext_tokens)
+        relevance = match(*columns, against=against).in_boolean_mode()
+        return relevance > 0, relevance
+
+    criteria = []
+    scores = []
+    for token in tokens:
+        pattern = f'%{_escape_like(token)}%'
+        criteria.append(db.or_(*[column.ilike(pattern, escape='\\') for column in columns]))
+        for position, column in enumerate(columns):
+            weight = 2 if position == 0 else 1
+            scores.append(db.case((column.ilike(pattern, escape='\\'), weight), else_=0))
+
+    return db.and_(*criteria), sum(scores[1:], scores[0])
@@ -0,0 +1,77 @@
+import threading
+from app.extensions import db
+from app.utils.metrics import registry
+
+# ContentVersion key bumped by every write to the LiveStream row or to the radio it plays
+LIVE_STREAM_VERSION = 'live_stream'
+
+SNAPSHOT_LOOKUPS = registry.counter(
+    'campuswave_live_stream_snapshot_total', 'Live stream snapshot reads by cache result')
+
+
+def bump_live_stream_version():
+    """Mark every worker's live stream snapshot stale; the caller commits"""
+    from app.models.content_version import ContentVersion
+    ContentVersion.bump(LIVE_STREAM_VERSION)
+
+
+def bump_if_playing(radio_id):
+    """bump_live_stream_version() if radio_id is the stream's current track"""
+    from app.models.live_stream import LiveStream
+
+    if db.session.query(LiveStream.id).filter(LiveStream.current_audio_id == radio_id).first():
+        bump_live_stream_version()
+
+
+class LiveStreamState:
+    """Per-process snapshot of the LiveStream row and its current track.
+
+    Each read probes the live_stream ContentVersion (one primary-key
+    lookup) and reloads only when it moved, so every worker picks up a
+    change as soon as it commits. The listener count is not part of the
+    snapshot; it comes from presence on every call.
+    """
+
+    def __init__(self):
+        self._version = None
+        self._snapshot = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        """Return (version, snapshot); snapshot is None if there is no stream row"""
+        from app.models.content_version import ContentVersion
+        from app.models.live_stream import LiveStream
+
+        version, _ = ContentVersion.get(LIVE_STREAM_VERSION)
+        with self._lock:
+            if self._version == version:
+                SNAPSHOT_LOOKUPS.inc(result='hit')
+                return version, self._snapshot
+
+        # Loaded after the probe, so it is at least as new as version
+        stream = LiveStream.query.first()
+        snapshot = stream.snapshot() if stream else None
+        with self._lock:
+            if self._version is None or version >= self._version:
+                self._version, self._snapshot = version, snapshot
+        SNAPSHOT_LOOKUPS.inc(result='miss')
+        return version, snapshot
+
+    def payload(self, snapshot=None):
+        """LiveStream.to_dict() from a snapshot (default: get()), or None if there is no stream row"""
+        from app.utils.presence import presence
+
+        if snapshot is None:
+            _, snapshot = self.get()
+        if snapshot is None:
+            return None
+        data = dict(snapshot)
+        data['listener_count'] = presence.listener_count() if data['status'] == 'ONLINE' else 0
+        return data
+
+    def clear(self):
+        with self._lock:
+            self._version, self._snapshot = None, None
+
+
+stream_state = LiveStreamState()
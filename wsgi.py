@@ -10,6 +10,9 @@ import os
 from dotenv import load_dotenv
 from app import create_app
 from app.utils.scheduler import start_background_scheduler
+from app.utils.outbox import start_outbox_worker
+from app.utils.engagement import start_engagement_flusher
+from app.utils.presence import start_presence_flusher
 
 # Load environment variables
 load_dotenv()
@@ -20,5 +23,14 @@ application = create_app(os.getenv('FLASK_ENV', 'production'))
 # Start background scheduler for radio status updates
 start_background_scheduler(application)
 
+# Start outbox workers (emails, push, notification fan-out)
+start_outbox_worker(application)
+
+# Batch like/reaction writes
+start_engagement_flusher(application)
+
+# Batch listener heartbeats into radio_listeners
+start_presence_flusher(application)
+
 # Gunicorn compatibility - 'app' alias
 app = application